@@ -1,26 +1,70 @@
 import time
 import json
+import logging
 import hashlib
 import base64
 import pandas as pd
 import requests
 import math
+import uuid
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from Crypto.Cipher import AES
 from dataoperator import DataOperator  # 修改导入
 from config import  load_config_from_env
+from token_manager import TokenManager
+from http_session import get_session
+from rate_limiter import RateLimiter, get_rate_limiter
+from retry_policy import ApiError, RetryPolicy, NETWORK
+from json_stream import decode_response
+from log_utils import get_logger, configure_logging, PageSummary
+from response_cache import get_response_cache
+from page_archive import get_page_archive
+from paginator import (Paginator, DataOperatorSink, ListSink, SyncCheckpoint, ORDER_PAGE_SPEC, STORE_PAGE_SPEC,
+                       INVENTORY_PAGE_SPEC, SALES_PAGE_SPEC)
 
-
-
+logger = get_logger(__name__)
 
 
 class LingXingAPI:
     """零星开放平台API客户端"""
 
-    def __init__(self, app_id: str, app_secret: str, base_url: str = "https://openapi.lingxing.com"):
+    def __init__(self, app_id: str, app_secret: str, base_url: str = "https://openapi.lingxing.com",
+                 token_cache_dir: str = None):
         self.APP_ID = app_id
         self.APP_SECRET = app_secret
         self.BASE_URL = base_url
+        # access_token 缓存到过期前复用，跨进程共享磁盘缓存
+        self.token_manager = TokenManager(app_id, app_secret, base_url, cache_dir=token_cache_dir)
+        # 共享连接池会话，分页请求复用 keep-alive 连接
+        self.session = get_session("lingxing")
+        # 进程内共享的按接口令牌桶限流器（跨进程通过锁文件协调）
+        self.rate_limiter = get_rate_limiter()
+        # 仓库、店铺等参考数据的本地响应缓存（TTL 内不重复拉取，数据未变化时不重复写库）
+        self.response_cache = get_response_cache()
+        # 原始响应归档（未开启归档时为 None），分页接口由 Paginator 归档，这里用于仓库列表和异步分页
+        self.page_archive = get_page_archive()
+
+    def _archive_response(self, api_path, biz_body, index, result):
+        """归档一个接口响应，归档失败只记录日志，不影响同步"""
+        if self.page_archive is None:
+            return
+        try:
+            self.page_archive.append(api_path, biz_body, index, result)
+        except Exception as e:
+            logger.sampled("archive_failed", logging.WARNING, "原始响应归档失败", api=api_path, error=e)
+
+    def _post_checked(self, api_path, biz_body):
+        """
+        非分页接口的单次请求：限流、token 失效时抛出 ApiError 交给 RetryPolicy 重试，其他响应原样返回
+        """
+        result = self.api_post(api_path, biz_body)
+        if result is None:
+            raise ApiError("API返回空响应", category=NETWORK)
+        code = str(result.get("code"))
+        if code in RateLimiter.RATE_LIMIT_CODES or code in TokenManager.TOKEN_INVALID_CODES:
+            raise ApiError(f"API返回错误: {result.get('msg') or result.get('message')} (代码: {code})", code=code)
+        return result
 
     # ========= AES 工具 =========
     @staticmethod
@@ -44,30 +88,19 @@ class LingXingAPI:
 
     # ========= 获取 access_token =========
     def get_access_token(self) -> str:
-        url = f"{self.BASE_URL}/api/auth-server/oauth/access-token"
-        data = {
-            "appId": self.APP_ID,
-            "appSecret": self.APP_SECRET
-        }
+        """获取 access_token（优先使用缓存，临近过期时自动刷新）"""
+        return self.token_manager.get_token()
 
-        try:
-            resp = requests.post(url, data=data, timeout=10)
-            resp.raise_for_status()
-            result = resp.json()
-
-            if (result.get("code") in [200, '200']) and "data" in result:
-                return result["data"]["access_token"]
-            else:
-                raise RuntimeError(f"获取token失败: {result}")
-
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"网络请求失败: {e}")
-        except (KeyError, ValueError) as e:
-            raise RuntimeError(f"响应数据解析失败: {e}")
-
-    # ========= 业务 POST 请求 =========
-    def api_post(self, api_path: str, biz_body: dict) -> dict:
-        access_token = self.get_access_token()
+    # ========= 签名公共参数 =========
+    def build_signed_query(self, biz_body: dict, access_token: str) -> dict:
+        """
+        生成业务请求的 query 公共参数（同步、异步客户端共用同一套签名规则）
+        Args:
+            biz_body: 业务请求体
+            access_token: 当前 access_token
+        Returns:
+            dict: access_token/app_key/timestamp/sign
+        """
         timestamp = str(int(time.time()))
 
         biz_for_sign = {}
@@ -86,470 +119,190 @@ class LingXingAPI:
 
         sign = self.generate_sign(sign_params)
 
-        query = {
+        return {
             "access_token": access_token,
             "app_key": self.APP_ID,
             "timestamp": timestamp,
             "sign": sign,
         }
 
+    # ========= 业务 POST 请求 =========
+    def api_post(self, api_path: str, biz_body: dict, stream_list_path=None) -> dict:
+        """
+        发送业务请求（只发一次：限流、token 失效时更新限流器/清除 token 缓存后原样返回响应，
+        由调用方的 RetryPolicy 按错误类别退避重试）
+        Args:
+            api_path: API路径
+            biz_body: 业务请求体
+            stream_list_path: 需要流式解码的数据列表路径（如 ("data", "list")），
+                              指定时列表保留为原始字节、迭代时逐条解码，见 json_stream
+        Returns:
+            dict: 接口响应，请求失败时返回None
+        """
+        self.rate_limiter.acquire(api_path, self.BASE_URL)
+        access_token = self.get_access_token()
+        query = self.build_signed_query(biz_body, access_token)
+
         headers = {"Content-Type": "application/json"}
         url = self.BASE_URL + api_path
 
         try:
-            resp = requests.post(url, params=query, json=biz_body, headers=headers, timeout=30)
-            resp.raise_for_status()
-            result = resp.json()
+            resp = self.session.post(url, params=query, json=biz_body, headers=headers, timeout=30)
+            if resp.status_code == 429:
+                result = {"code": "3001008", "msg": "HTTP 429 Too Many Requests"}
+            else:
+                resp.raise_for_status()
+                result = decode_response(resp.content, stream_list_path)
 
-            # 添加调试信息
-            print(f"API请求: {url}")
-            print(f"请求参数: {biz_body}")
-            print(f"响应状态码: {resp.status_code}")
-            print(f"响应内容: {result}")
+            # 触发限流：降低该接口速率，重试由调用方按 RATE_LIMIT 类别退避
+            if self.rate_limiter.is_rate_limited(result):
+                self.rate_limiter.on_rate_limited(api_path, self.BASE_URL)
+                return result
+            self.rate_limiter.on_success(api_path, self.BASE_URL)
+
+            # 完整请求/响应内容只在 DEBUG 级别输出（大分页响应格式化和写出本身就很耗时）
+            if logger.is_debug():
+                logger.debug("API请求", url=url, status=resp.status_code, body=biz_body, response=result)
+
+            # token 被服务端判定失效（如被其他进程重新申请）：清除缓存，调用方按 AUTH 类别重试时重新获取
+            if str(result.get("code")) in TokenManager.TOKEN_INVALID_CODES:
+                logger.warning("access_token 已失效，清除缓存", api=api_path)
+                self.token_manager.invalidate(access_token)
 
             return result
         except requests.exceptions.RequestException as e:
-            print(f"API请求失败: {e}")
+            logger.warning("API请求失败", api=api_path, error=e)
             return None
-        except json.JSONDecodeError as e:
-            print(f"响应JSON解析失败: {e}")
+        except ValueError as e:
+            logger.warning("响应JSON解析失败", api=api_path, error=e)
             return None
 
 
-    def fetch_and_process_order_data_batch(self, api_path, base_biz_body, db_config, max_retries=3, delay=1):
+    def fetch_and_process_order_data_batch(self, api_path, base_biz_body, db_config, max_retries=3, delay=1,
+                                           concurrency=1, writers=0, queue_size=None, resume=False, stream=False):
         """
-        从分页API获取数据并实时分批处理
+        从分页API获取订单数据并实时分批处理
         Args:
             api_path: API路径
             base_biz_body: 基础请求体参数
             db_config: 数据库配置
             max_retries: 最大重试次数
-            delay: 请求延迟
+            delay: 失败重试等待基数（正常翻页节奏由共享限流器控制）
+            concurrency: 并发拉取的页数，大于1时在获取total后按offset并发请求各页
+            writers: 写库线程数，大于0时拉取与写库流水线并行（各写库线程独立连接）
+            queue_size: 流水线模式下待写入页队列容量
+            resume: 是否启用断点续传（sync_checkpoint 表），相同参数的任务中断后从已提交的页继续
+            stream: 是否流式解码订单页，在途页只保留原始响应，写库时逐条解码
         Returns:
             int: 成功处理的总记录数
         """
-        total_processed = 0
-        current_offset = 0
-        page_size = 500
-        request_attempt = 0
-        # 初始化数据处理器
-        data_operator = DataOperator(db_config)
-
-        try:
-            # 连接数据库（在整个处理过程中保持连接）
-            data_operator.connect_db()
-            print("数据库连接成功，开始分批处理数据...")
-
-            # 1. 首先获取数据总量
-            print("正在获取数据总量...")
-            biz_body = base_biz_body.copy()
-            biz_body.update({"offset": 0, "length": 20})
-
-            try:
-                initial_result = self.api_post(api_path, biz_body)
-                total_expected = int(initial_result["data"]["total"])
-                print(f"数据总量为: {total_expected}")
-            except Exception as e:
-                print(f"获取数据总量失败: {e}")
-                return total_processed
-
-            # 2. 计算总页数
-            total_pages = math.ceil(total_expected / page_size)
-            print(f"开始分页请求，共需处理 {total_pages} 页数据...")
-
-            # 3. 分批获取和处理数据
-            while current_offset < total_expected and request_attempt < max_retries:
-                current_page = (current_offset // page_size) + 1
-                print(f"正在处理第 {current_page}/{total_pages} 页, Offset: {current_offset}")
-
-                try:
-                    # 构建当前页的请求参数
-                    biz_body = base_biz_body.copy()
-                    biz_body.update({
-                        "offset": current_offset,
-                        "length": page_size,
-                    })
-
-                    # 获取当前批次数据
-                    result = self.api_post(api_path, biz_body)
-                    current_batch = result["data"]["list"]
-                    batch_size = len(current_batch)
-
-                    if batch_size == 0:
-                        print("当前页未返回数据，退出循环。")
-                        break
-
-                    # 实时处理当前批次数据
-                    print(f"  第 {current_page} 页获取成功，本页 {batch_size} 条数据，开始插入数据库...")
-
-                    try:
-                        # 使用数据处理器插入当前批次
-                        data_operator.insert_orders(current_batch)
-                        print(f"  ✓ 第 {current_page} 页数据插入成功")
-                        total_processed += batch_size
-                    except Exception as e:
-                        print(f"  ✗ 第 {current_page} 页数据插入失败: {e}")
-                        # 插入失败时回滚事务
-                        data_operator.conn.rollback()
-
-                    # 更新偏移量
-                    current_offset += batch_size
-
-                    # 重置连续失败计数
-                    request_attempt = 0
-
-                    # 请求间隔，避免给API造成压力
-                    time.sleep(delay)
-
-                except Exception as e:
-                    request_attempt += 1
-                    print(f"  第 {current_page} 页请求失败，正在进行第 {request_attempt} 次重试。错误信息: {e}")
-                    if request_attempt >= max_retries:
-                        print("重试次数已达上限，停止处理。")
-                        break
-                    time.sleep(delay * 2)
-
-            print(f"所有数据处理完成。预期数据量: {total_expected}，实际成功处理: {total_processed}")
-            return total_processed
-
-        except Exception as e:
-            print(f"处理过程中发生错误: {e}")
-            return total_processed
-        finally:
-            # 确保数据库连接被关闭
-            data_operator.disconnect_db()
+        return self.fetch_order_pages(api_path, base_biz_body, db_config, max_retries=max_retries, delay=delay,
+                                      concurrency=concurrency, writers=writers, queue_size=queue_size,
+                                      resume=resume, stream=stream)["processed"]
 
-    def fetch_and_process_store_data_batch(self, api_path, base_biz_body, db_config, max_retries=3, delay=1):
+    def fetch_order_pages(self, api_path, base_biz_body, db_config, max_retries=3, delay=1, concurrency=1,
+                          writers=0, queue_size=None, resume=False, stream=False):
+        """
+        分页拉取订单并写库，参数同 fetch_and_process_order_data_batch
+        Returns:
+            dict: 分页统计（processed/expected/completed 等），completed 为 True 表示所有页都已提交
+        """
+        sink = DataOperatorSink(db_config, lambda data_operator, batch: data_operator.insert_orders(batch))
+        paginator = Paginator(self, ORDER_PAGE_SPEC, max_retries=max_retries, delay=delay, concurrency=concurrency,
+                              writers=writers, queue_size=queue_size, stream=stream)
+        checkpoint = SyncCheckpoint(db_config) if resume else None
+        return paginator.run(api_path, base_biz_body, sink, checkpoint=checkpoint)
+
+    def fetch_and_process_store_data_batch(self, api_path, base_biz_body, db_config, max_retries=3, delay=1,
+                                           concurrency=1):
         """
         从分页API获取store数据并实时分批处理
+        Returns:
+            int: 成功处理的总记录数
         """
-        total_processed = 0
-        current_offset = 0
-        page_size = 50  # 调整为大于20的值，避免API限制
-        request_attempt = 0
-        data_operator = DataOperator(db_config)
-        try:
-            data_operator.connect_db()
-            print("数据库连接成功，开始分批处理数据...")
-            # 1. 首先获取数据总量
-            print("正在获取数据总量...")
-            biz_body = base_biz_body.copy()
-            # 验证并设置初始参数
-            try:
-                biz_body.update({"offset": 0, "length": 20})
-            except ValueError as e:
-                print(f"参数验证失败: {e}")
-                # 使用API允许的最小值
-                biz_body.update({"offset": 0, "length": 20})
-                print("已自动调整参数为允许的最小值")
-
-            try:
-                initial_result = self.api_post(api_path, biz_body)
-                # 增强响应结构检查
-                if not initial_result:
-                    print("API返回空响应")
-                    return total_processed
-                # 检查API返回的code字段
-                api_code = initial_result.get("code")
-                if api_code is None:
-                    print("API响应缺少code字段")
-                    # 尝试检查其他可能的成功标识
-                    if initial_result.get("status") == "success" or initial_result.get("success"):
-                        print("检测到其他成功标识，继续处理")
-                    else:
-                        return total_processed
-                elif str(api_code) not in ['0', '200', '1000']:  # 根据实际API调整成功码
-                    error_msg = initial_result.get("msg", "未知错误")
-                    print(f"API返回错误: {error_msg} (代码: {api_code})")
-
-                if "data" not in initial_result or initial_result["data"] is None:
-                    print("API返回数据为空")
-                    return total_processed
-
-                # 安全地获取total值
-                data = initial_result["data"]
-                total_str = data.get("total")
-                if total_str is None:
-                    print("API返回数据缺少total字段")
-                    # 尝试从其他字段获取总数
-                    total_str = data.get("count", data.get("size", "0"))
-                try:
-                    total_expected = int(total_str)
-                    print(f"数据总量为: {total_expected}")
-                except (ValueError, TypeError) as e:
-                    print(f"转换total为整数失败: {e}, 原始值: {total_str}")
-                    total_expected = 0
-
-            except Exception as e:
-                print(f"获取数据总量失败: {e}")
-                return total_processed
-
-            # 2. 计算总页数（确保page_size不小于20）
-            page_size = max(page_size, 20)  # 确保不小于API最小值
-            total_pages = math.ceil(total_expected / page_size) if total_expected > 0 else 0
-            print(f"开始分页请求，共需处理 {total_pages} 页数据，每页 {page_size} 条...")
-            # 3. 分批获取和处理数据
-            while current_offset < total_expected and request_attempt < max_retries:
-                current_page = (current_offset // page_size) + 1
-                print(f"正在处理第 {current_page}/{total_pages} 页, Offset: {current_offset}")
-                try:
-                    # 构建当前页的请求参数
-                    biz_body = base_biz_body.copy()
-                    biz_body.update({
-                        "offset": current_offset,
-                        "length": page_size,
-                    })
-                    # 获取当前批次数据
-                    result = self.api_post(api_path, biz_body)
-                    # 调试信息
-                    print(f"API请求参数: offset={current_offset}, length={page_size}")
-                    print(f"API响应: {result}")
-                    # 增强响应检查
-                    if not result:
-                        print("API返回空响应，跳过本页")
-                        request_attempt += 1
-                        time.sleep(delay * 2)
-                        continue
-                    # 检查API响应码
-                    result_code = result.get("code")
-                    if result_code is None:
-                        print("API响应缺少code字段，尝试检查数据...")
-                        # 如果数据存在，尝试继续处理
-                        if "data" in result and result["data"]:
-                            print("尽管缺少code字段，但存在数据，继续处理")
-                        else:
-                            request_attempt += 1
-                            continue
-                    elif str(result_code) not in ['0', '200', '1000']:
-                        error_msg = result.get("msg", "未知错误")
-                        print(f"API返回错误: {error_msg} (代码: {result_code})")
-
-                    if "data" not in result or result["data"] is None:
-                        print("API返回数据为空，跳过本页")
-                        request_attempt += 1
-                        continue
-
-                    current_batch = result["data"]["list"]
-
-                    batch_size = len(current_batch) if current_batch else 0
-
-                    if batch_size == 0:
-                        print("当前页未返回数据，退出循环。")
-                        break
-                    # 实时处理当前批次数据
-                    print(f"  第 {current_page} 页获取成功，本页 {batch_size} 条数据，开始插入数据库...")
-                    try:
-
-                        data_operator.insert_stores_table(current_batch)
-                        print(f"  ✓ 第 {current_page} 页数据插入成功")
-                        total_processed += batch_size
-                    except Exception as e:
-                        print(f"  ✗✗ 第 {current_page} 页数据插入失败: {e}")
-                        data_operator.conn.rollback()
-                        request_attempt += 1
-                        continue
-
-                    # 更新偏移量
-                    current_offset += batch_size
-                    request_attempt = 0  # 重置重试计数
-                    time.sleep(delay)
-
-                except ValueError as e:
-                    # 参数验证错误
-                    print(f"参数错误: {e}")
-                    request_attempt += 1
-                    if request_attempt >= max_retries:
-                        print("参数错误重试次数已达上限，停止处理。")
-                        break
-                    time.sleep(delay * 2)
-
-                except Exception as e:
-                    request_attempt += 1
-                    print(f"  第 {current_page} 页请求失败，正在进行第 {request_attempt} 次重试。错误信息: {e}")
-                    if request_attempt >= max_retries:
-                        print("重试次数已达上限，停止处理。")
-                        break
-                    time.sleep(delay * 2)
+        return self.fetch_store_pages(api_path, base_biz_body, db_config, max_retries=max_retries, delay=delay,
+                                      concurrency=concurrency)["processed"]
 
-            print(f"所有数据处理完成。预期数据量: {total_expected}，实际成功处理: {total_processed}")
-            return total_processed
+    def fetch_store_pages(self, api_path, base_biz_body, db_config, max_retries=3, delay=1, concurrency=1):
+        """
+        分页拉取店铺并写库
+        Returns:
+            dict: 分页统计（processed/expected/completed 等）
+        """
+        sink = DataOperatorSink(db_config, lambda data_operator, batch: data_operator.insert_stores_table(batch))
+        paginator = Paginator(self, STORE_PAGE_SPEC, max_retries=max_retries, delay=delay, concurrency=concurrency)
+        return paginator.run(api_path, base_biz_body, sink)
 
-        except Exception as e:
-            print(f"处理过程中发生错误: {e}")
+    def fetch_and_process_invetory_data_batch(self, api_path, base_biz_body, db_config, max_retries=3, delay=1,
+                                              concurrency=1, page_size=None):
+        """
+        从分页API获取库存数据并实时分批处理
+        Returns:
+            int: 成功处理的总记录数
+        """
+        return self.fetch_inventory_pages(api_path, base_biz_body, db_config, max_retries=max_retries, delay=delay,
+                                          concurrency=concurrency, page_size=page_size)["processed"]
 
-            traceback.print_exc()
-            return total_processed
-        finally:
-            data_operator.disconnect_db()
+    def fetch_inventory_pages(self, api_path, base_biz_body, db_config, max_retries=3, delay=1, concurrency=1,
+                              page_size=None):
+        """
+        分页拉取库存并写库（每页独立提交）
+        Args:
+            page_size: 每页条数，为空时使用默认分页描述的条数
+        Returns:
+            dict: 分页统计（processed/expected/completed 等）
+        """
+        spec = INVENTORY_PAGE_SPEC.with_page_size(page_size) if page_size else INVENTORY_PAGE_SPEC
+        sink = DataOperatorSink(db_config, lambda data_operator, batch: data_operator.insert_inventory_table(batch))
+        paginator = Paginator(self, spec, max_retries=max_retries, delay=delay, concurrency=concurrency)
+        return paginator.run(api_path, base_biz_body, sink)
 
-    def fetch_and_process_invetory_data_batch(self, api_path, base_biz_body, db_config, max_retries=3, delay=1):
+    def split_order_time_windows(self, api_path, base_biz_body, start_time, end_time, max_total=10000,
+                                 min_window=3600):
         """
-        从分页API获取invetory数据并实时分批处理
+        按数据量把订单查询时间范围二分拆成若干子窗口，让每个窗口的 offset 翻页都保持较浅
+        Args:
+            api_path: API路径
+            base_biz_body: 基础请求体参数（start_time/end_time 会被替换）
+            start_time: 开始时间戳
+            end_time: 结束时间戳
+            max_total: 单个窗口允许的最大数据量，超过则继续二分
+            min_window: 最小窗口秒数，窗口小于该值时不再拆分
+        Returns:
+            list: [(start_time, end_time, total), ...]，按时间排序，不含无数据的窗口
         """
-        total_processed = 0
-        current_offset = 0
-        page_size = 50  # 调整为大于20的值，避免API限制
-        request_attempt = 0
-        data_operator = DataOperator(db_config)
-        try:
-            data_operator.connect_db()
-            print("数据库连接成功，开始分批处理数据...")
-            # 1. 首先获取数据总量
-            print("正在获取数据总量...")
+        paginator = Paginator(self, ORDER_PAGE_SPEC)
+        windows = []
+        stack = [(start_time, end_time)]
+        while stack:
+            window_start, window_end = stack.pop()
             biz_body = base_biz_body.copy()
-            # 验证并设置初始参数
-            try:
-                biz_body.update({"offset": 0, "length": 20})
-            except ValueError as e:
-                print(f"参数验证失败: {e}")
-                # 使用API允许的最小值
-                biz_body.update({"offset": 0, "length": 20})
-                print("已自动调整参数为允许的最小值")
-
+            biz_body.update({"start_time": window_start, "end_time": window_end})
             try:
-                initial_result = self.api_post(api_path, biz_body)
-                # 增强响应结构检查
-                if not initial_result:
-                    print("API返回空响应")
-                    return total_processed
-                # 检查API返回的code字段
-                api_code = initial_result.get("code")
-                if api_code is None:
-                    print("API响应缺少code字段")
-                    # 尝试检查其他可能的成功标识
-                    if initial_result.get("status") == "success" or initial_result.get("success"):
-                        print("检测到其他成功标识，继续处理")
-                    else:
-                        return total_processed
-                elif str(api_code) not in ['0', '200', '1000']:  # 根据实际API调整成功码
-                    error_msg = initial_result.get("msg", "未知错误")
-                    print(f"API返回错误: {error_msg} (代码: {api_code})")
-
-                if "data" not in initial_result or initial_result["data"] is None:
-                    print("API返回数据为空")
-                    return total_processed
-
-                # 安全地获取total值
-                data = initial_result
-                total_str = data.get("total")
-                if total_str is None:
-                    print("API返回数据缺少total字段")
-                    # 尝试从其他字段获取总数
-                    total_str = data.get("count", data.get("size", "0"))
-                try:
-                    total_expected = int(total_str)
-                    print(f"数据总量为: {total_expected}")
-                except (ValueError, TypeError) as e:
-                    print(f"转换total为整数失败: {e}, 原始值: {total_str}")
-                    total_expected = 0
-
+                total = paginator.probe_total(api_path, biz_body)
             except Exception as e:
-                print(f"获取数据总量失败: {e}")
-                return total_processed
-
-            # 2. 计算总页数（确保page_size不小于20）
-            page_size = max(page_size, 20)  # 确保不小于API最小值
-            total_pages = math.ceil(total_expected / page_size) if total_expected > 0 else 0
-            print(f"开始分页请求，共需处理 {total_pages} 页数据，每页 {page_size} 条...")
-            # 3. 分批获取和处理数据
-            while current_offset < total_expected and request_attempt < max_retries:
-                current_page = (current_offset // page_size) + 1
-                print(f"正在处理第 {current_page}/{total_pages} 页, Offset: {current_offset}")
-                try:
-                    # 构建当前页的请求参数
-                    biz_body = base_biz_body.copy()
-                    biz_body.update({
-                        "offset": current_offset,
-                        "length": page_size,
-                    })
-                    # 获取当前批次数据
-                    result = self.api_post(api_path, biz_body)
-                    # 调试信息
-                    print(f"API请求参数: offset={current_offset}, length={page_size}")
-                    print(f"API响应: {result}")
-                    # 增强响应检查
-                    if not result:
-                        print("API返回空响应，跳过本页")
-                        request_attempt += 1
-                        time.sleep(delay * 2)
-                        continue
-                    # 检查API响应码
-                    result_code = result.get("code")
-                    if result_code is None:
-                        print("API响应缺少code字段，尝试检查数据...")
-                        # 如果数据存在，尝试继续处理
-                        if "data" in result and result["data"]:
-                            print("尽管缺少code字段，但存在数据，继续处理")
-                        else:
-                            request_attempt += 1
-                            continue
-                    elif str(result_code) not in ['0', '200', '1000']:
-                        error_msg = result.get("msg", "未知错误")
-                        print(f"API返回错误: {error_msg} (代码: {result_code})")
-
-                    if "data" not in result or result["data"] is None:
-                        print("API返回数据为空，跳过本页")
-                        request_attempt += 1
-                        continue
-
-                    current_batch = result["data"]
-
-                    batch_size = len(current_batch) if current_batch else 0
-
-                    if batch_size == 0:
-                        print("当前页未返回数据，退出循环。")
-                        break
-                    # 实时处理当前批次数据
-                    print(f"  第 {current_page} 页获取成功，本页 {batch_size} 条数据，开始插入数据库...")
-                    try:
-
-                        data_operator.insert_inventory_table(current_batch)
-                        print(f"  ✓ 第 {current_page} 页数据插入成功")
-                        total_processed += batch_size
-                    except Exception as e:
-                        print(f"  ✗✗ 第 {current_page} 页数据插入失败: {e}")
-                        data_operator.conn.rollback()
-                        request_attempt += 1
-                        continue
-
-                    # 更新偏移量
-                    current_offset += batch_size
-                    request_attempt = 0  # 重置重试计数
-                    time.sleep(delay)
-
-                except ValueError as e:
-                    # 参数验证错误
-                    print(f"参数错误: {e}")
-                    request_attempt += 1
-                    if request_attempt >= max_retries:
-                        print("参数错误重试次数已达上限，停止处理。")
-                        break
-                    time.sleep(delay * 2)
-
-                except Exception as e:
-                    request_attempt += 1
-                    print(f"  第 {current_page} 页请求失败，正在进行第 {request_attempt} 次重试。错误信息: {e}")
-                    if request_attempt >= max_retries:
-                        print("重试次数已达上限，停止处理。")
-                        break
-                    time.sleep(delay * 2)
-
-            print(f"所有数据处理完成。预期数据量: {total_expected}，实际成功处理: {total_processed}")
-            return total_processed
-
-        except Exception as e:
-            print(f"处理过程中发生错误: {e}")
-
-            traceback.print_exc()
-            return total_processed
-        finally:
-            data_operator.disconnect_db()
+                # 探测失败时不再拆分，交给分页拉取自身的重试处理
+                logger.warning(f"窗口 {window_start}-{window_end} 数据总量探测失败，不再拆分: {e}")
+                windows.append((window_start, window_end, None))
+                continue
 
+            if total == 0:
+                continue
+            if total <= max_total or window_end - window_start <= min_window:
+                windows.append((window_start, window_end, total))
+                continue
 
+            # 相邻窗口在中点重叠1秒：接口是否包含边界时刻未明确，重叠只会重复 upsert，不会漏单
+            mid = (window_start + window_end) // 2
+            stack.append((mid, window_end))
+            stack.append((window_start, mid))
 
+        windows.sort(key=lambda w: w[0])
+        return windows
 
     def get_orders_by_time_range(self, db_config, start_time, end_time, date_type="update_time",
-                                 platform_codes=[10024]):
+                                 platform_codes=[10024], concurrency=1, writers=0, resume=True,
+                                 shard_threshold=10000, shard_workers=1, stream=False):
         """
         获取指定时间范围内的订单数据并存入数据库
 
@@ -559,6 +312,12 @@ class LingXingAPI:
             end_time: 结束时间（时间戳或可转换为时间戳的字符串）
             date_type: 时间类型，默认为"update_time"
             platform_codes: 平台代码列表，默认为[10024]
+            concurrency: 并发拉取的页数，1为串行
+            writers: 写库线程数，大于0时启用拉取/写库流水线
+            resume: 是否从上次中断处续传（相同时间范围与参数时生效）
+            shard_threshold: 单个时间窗口的最大订单量，超过时二分拆分时间范围，0为不拆分
+            shard_workers: 并行拉取的时间窗口数，1为逐个窗口拉取
+            stream: 是否流式解码订单页（逐条解码入库，降低多页在途时的内存峰值）
         Returns:
             bool: 处理成功返回True，否则False
         """
@@ -569,8 +328,8 @@ class LingXingAPI:
             if isinstance(end_time, str):
                 end_time = int(pd.to_datetime(end_time, format='%Y%m%d %H:%M:%S').timestamp())
 
-            print(f"获取订单数据，时间范围: {start_time} 到 {end_time}")
-            print(f"时间类型: {date_type}, 平台代码: {platform_codes}")
+            logger.info(f"获取订单数据，时间范围: {start_time} 到 {end_time}")
+            logger.info(f"时间类型: {date_type}, 平台代码: {platform_codes}")
 
             # API路径和请求参数
             api_path = "/pb/mp/order/v2/list"
@@ -581,20 +340,38 @@ class LingXingAPI:
                 "platform_code": platform_codes,
             }
 
-            # 使用分批处理方式
-            total_processed = self.fetch_and_process_order_data_batch(
-                api_path, base_biz_body, db_config, delay=1
-            )
+            # 按数据量拆分时间窗口，避免深 offset 翻页（翻页越深越慢，扫描期间订单变动还会导致漏单/重复）
+            if shard_threshold:
+                windows = self.split_order_time_windows(api_path, base_biz_body, start_time, end_time,
+                                                        max_total=shard_threshold)
+            else:
+                windows = [(start_time, end_time, None)]
+            logger.info(f"查询范围拆分为 {len(windows)} 个时间窗口: {windows}")
+
+            def fetch_window(window):
+                window_body = base_biz_body.copy()
+                window_body.update({"start_time": window[0], "end_time": window[1]})
+                # 每个窗口各自记录断点，中断后只需重拉未完成的窗口
+                return self.fetch_and_process_order_data_batch(
+                    api_path, window_body, db_config, delay=1, concurrency=concurrency, writers=writers,
+                    resume=resume, stream=stream
+                )
+
+            if shard_workers > 1 and len(windows) > 1:
+                with ThreadPoolExecutor(max_workers=shard_workers) as executor:
+                    total_processed = sum(executor.map(fetch_window, windows))
+            else:
+                total_processed = sum(fetch_window(window) for window in windows)
 
             if total_processed > 0:
-                print(f"成功处理 {total_processed} 条订单数据")
+                logger.info(f"成功处理 {total_processed} 条订单数据")
                 return True
             else:
-                print("未处理任何数据，请检查网络连接或API参数。")
+                logger.warning("未处理任何数据，请检查网络连接或API参数。")
                 return False
 
         except Exception as e:
-            print(f"处理订单数据失败: {e}")
+            logger.error(f"处理订单数据失败: {e}")
             return False
 
     def getstoreList(self, db_config,  platform_codes=[10024]):
@@ -621,22 +398,81 @@ class LingXingAPI:
                 )
 
                 if total_processed > 0:
-                    print(f"成功处理 {total_processed} 条店铺数据")
+                    logger.info(f"成功处理 {total_processed} 条店铺数据")
                     return True
                 else:
-                    print("未处理任何数据，请检查网络连接或API参数。")
+                    logger.warning("未处理任何数据，请检查网络连接或API参数。")
                     return False
 
             except Exception as e:
-                print(f"处理订单数据失败: {e}")
+                logger.error(f"处理订单数据失败: {e}")
                 return False
 
-    def getwarehouseList(self, db_config, type=3):
+    def get_stores_by_platforms(self, db_config, platform_codes, workers=4, force_refresh=False):
+        """
+        按平台分片并行拉取店铺数据，每个平台独立分页、独立连接
+        店铺数据很少变化：TTL 内直接使用本地缓存，数据与上次入库时一致时跳过写库
+        Args:
+            db_config: 数据库配置字典
+            platform_codes: 平台代码列表
+            workers: 并行拉取的平台数
+            force_refresh: 忽略本地缓存，强制拉取并写库
+        Returns:
+            dict: {平台代码: {processed, expected, completed, skipped, elapsed}}，skipped 表示数据未变化未写库
+        """
+        api_path = "/pb/mp/shop/v2/getSellerList"
+
+        def fetch_platform(platform_code):
+            start = time.time()
+            metrics = {"processed": 0, "expected": 0, "completed": False, "skipped": False}
+            biz_body = {"platform_code": [platform_code], "is_sync": 1, "status": 1}
+            try:
+                store_list = None if force_refresh else self.response_cache.get(api_path, biz_body)
+                if store_list is None:
+                    sink = ListSink()
+                    stats = Paginator(self, STORE_PAGE_SPEC, delay=1).run(api_path, biz_body, sink)
+                    if not stats["completed"]:
+                        # 不完整的数据不缓存也不写库，下次重新拉取
+                        metrics["expected"] = stats["expected"]
+                        raise RuntimeError(f"店铺分页未完整拉取（失败页: {stats['failed_pages']}）")
+                    store_list = sink.rows
+                    self.response_cache.put(api_path, biz_body, store_list)
+                else:
+                    logger.info(f"平台 {platform_code} 店铺数据命中本地缓存")
+                metrics["expected"] = len(store_list)
+                payload_hash = self.response_cache.payload_hash(store_list)
+                if not force_refresh and self.response_cache.is_applied(api_path, biz_body, db_config, payload_hash):
+                    logger.info(f"平台 {platform_code} 店铺数据与上次入库时一致，跳过写库")
+                    metrics.update(completed=True, skipped=True)
+                else:
+                    data_operator = DataOperator(db_config)
+                    try:
+                        data_operator.connect_db()
+                        written = data_operator.insert_stores_table(store_list)
+                    finally:
+                        data_operator.disconnect_db()
+                    metrics["processed"] = written
+                    if written < len(store_list):
+                        # 有行写入失败时不记为已入库，下次即使数据未变化也重新写入
+                        raise RuntimeError(f"{len(store_list) - written} 个店铺写入失败")
+                    self.response_cache.mark_applied(api_path, biz_body, db_config, payload_hash)
+                    metrics["completed"] = True
+            except Exception as e:
+                logger.error(f"平台 {platform_code} 店铺拉取失败: {e}")
+            metrics["elapsed"] = time.time() - start
+            return str(platform_code), metrics
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(platform_codes)))) as executor:
+            return dict(executor.map(fetch_platform, platform_codes))
+
+    def getwarehouseList(self, db_config, type=3, force_refresh=False):
         """
         获取指定平台的仓库数据并存入数据库
+        仓库数据很少变化：TTL 内直接使用本地缓存，数据与上次入库时一致时跳过写库
         Args:
             db_config: 数据库配置字典
             type: 仓库类型
+            force_refresh: 忽略本地缓存，强制拉取并写库
         Returns:
             bool: 处理成功返回True，否则False
         """
@@ -649,39 +485,59 @@ class LingXingAPI:
             biz_body = {
                 "type": type
             }
-            try:
-                result = self.api_post(api_path, biz_body)
-                # 增强响应结构检查
-                if not result:
-                    print("API返回空响应")
-                    return warehouselist
-                # 检查API返回的code字段
-                api_code = result.get("code")
-                if api_code is None:
-                    print("API响应缺少code字段")
-                    # 尝试检查其他可能的成功标识
-                    if result.get("status") == "success" or result.get("success"):
-                        print("检测到其他成功标识，继续处理")
-                    else:
+            current_datas = None if force_refresh else self.response_cache.get(api_path, biz_body)
+            if current_datas is not None:
+                logger.info(f"仓库数据命中本地缓存，共 {len(current_datas)} 个仓库")
+            else:
+                try:
+                    # 限流、token 失效、网络错误按 RetryPolicy 退避重试
+                    result = RetryPolicy().call(api_path, lambda: self._post_checked(api_path, biz_body))
+                    # 增强响应结构检查
+                    if not result:
+                        logger.warning("API返回空响应")
                         return warehouselist
-                elif str(api_code) not in ['0', '200', '1000']:  # 根据实际API调整成功码
-                    error_msg = result.get("msg", "未知错误")
-                    print(f"API返回错误: {error_msg} (代码: {api_code})")
+                    # 检查API返回的code字段
+                    api_code = result.get("code")
+                    if api_code is None:
+                        logger.warning("API响应缺少code字段")
+                        # 尝试检查其他可能的成功标识
+                        if result.get("status") == "success" or result.get("success"):
+                            logger.info("检测到其他成功标识，继续处理")
+                        else:
+                            return warehouselist
+                    elif str(api_code) not in ['0', '200', '1000']:  # 根据实际API调整成功码
+                        error_msg = result.get("msg", "未知错误")
+                        logger.warning(f"API返回错误: {error_msg} (代码: {api_code})")
 
-                if "data" not in result or result["data"] is None:
-                    print("API返回数据为空")
-                    return warehouselist
+                    if "data" not in result or result["data"] is None:
+                        logger.warning("API返回数据为空")
+                        return warehouselist
 
-            except Exception as e:
-                # 参数验证错误
-                print(f"api连接错误: {e}")
+                except Exception as e:
+                    # 参数验证错误
+                    logger.error(f"api连接错误: {e}")
+                    return warehouselist
+                current_datas = result["data"]
+                # 只缓存、归档成功响应（命中本地缓存时不重复归档）
+                if str(result.get("code")) in ['0', '200', '1000']:
+                    self.response_cache.put(api_path, biz_body, current_datas)
+                    self._archive_response(api_path, biz_body, 0, result)
+            payload_hash = self.response_cache.payload_hash(current_datas)
+            if not force_refresh and self.response_cache.is_applied(api_path, biz_body, db_config, payload_hash):
+                logger.info("仓库数据与上次入库时一致，跳过写库")
+                return True
             data_operator.connect_db()
-            print("数据库连接成功，开始处理数据...")
-            current_datas = result["data"]
-            print(f"仓库数组长度为：{len(current_datas)}")
-            data_operator.insert_warehouse_table(current_datas)
+            logger.info("数据库连接成功，开始处理数据...")
+            logger.info(f"仓库数组长度为：{len(current_datas)}")
+            written = data_operator.insert_warehouse_table(current_datas)
+            if written < len(current_datas):
+                # 有行写入失败时不记为已入库，下次即使数据未变化也重新写入
+                logger.warning(f"{len(current_datas) - written} 个仓库写入失败，不记录入库状态")
+                return False
+            self.response_cache.mark_applied(api_path, biz_body, db_config, payload_hash)
+            return True
         except Exception as e:
-            print(f"处理仓库数据失败: {e}")
+            logger.error(f"处理仓库数据失败: {e}")
             return False
         finally:
             data_operator.disconnect_db()
@@ -701,7 +557,7 @@ class LingXingAPI:
         try:
             warehouseids = data_operator.get_warehouse_ids()
         except Exception as e:
-            print("获取仓库id数组失败")
+            logger.error("获取仓库id数组失败")
         data_operator.disconnect_db()
         return  warehouseids
 
@@ -727,18 +583,82 @@ class LingXingAPI:
                 )
 
                 if total_processed > 0:
-                    print(f"成功处理 {total_processed} 条库存数据")
+                    logger.info(f"成功处理 {total_processed} 条库存数据")
                     return True
                 else:
-                    print("未处理任何数据，请检查网络连接或API参数。")
+                    logger.warning("未处理任何数据，请检查网络连接或API参数。")
                     return False
 
             except Exception as e:
-                print(f"处理订单数据失败: {e}")
+                logger.error(f"处理订单数据失败: {e}")
                 return False
 
+    def get_inventory_by_warehouses(self, db_config, warehouse_ids, group_size=1, workers=4, page_size=400):
+        """
+        按仓库（或仓库分组）并行拉取库存数据
+        每个分组独立分页、独立连接、逐页提交，某个仓库变慢或失败不会阻塞或回滚其他仓库
+        Args:
+            db_config: 数据库配置字典
+            warehouse_ids: 仓库id列表
+            group_size: 每组仓库数，1为逐仓库拉取
+            workers: 并行拉取的分组数
+            page_size: 每页条数
+        Returns:
+            dict: processed 成功条数, groups 分组数, failed 失败的仓库分组（wid字符串）列表
+        """
+        api_path = "/erp/sc/routing/data/local_inventory/inventoryDetails"
+        groups = [",".join(str(wid) for wid in warehouse_ids[i:i + group_size])
+                  for i in range(0, len(warehouse_ids), group_size)]
+        summary = {"processed": 0, "groups": len(groups), "failed": []}
+        logger.info(f"库存按仓库并行拉取: {len(warehouse_ids)} 个仓库，{len(groups)} 组，{workers} 个并行，每页 {page_size} 条")
+
+        def fetch_group(wid_str):
+            start = time.time()
+            try:
+                stats = self.fetch_inventory_pages(api_path, {"wid": wid_str}, db_config, delay=1,
+                                                   page_size=page_size)
+            except Exception as e:
+                logger.error(f"仓库 {wid_str} 库存拉取失败: {e}")
+                return wid_str, 0, False
+            logger.info(f"仓库 {wid_str} 库存拉取完成: {stats['processed']}/{stats['expected']} 条，"
+                        f"耗时 {time.time() - start:.1f}s")
+            return wid_str, stats["processed"], stats["completed"]
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for wid_str, processed, completed in executor.map(fetch_group, groups):
+                summary["processed"] += processed
+                if not completed:
+                    summary["failed"].append(wid_str)
+
+        if summary["failed"]:
+            logger.warning(f"以下仓库库存拉取未完成: {summary['failed']}")
+        return summary
+
+    @staticmethod
+    def split_date_range(start_date, end_date, chunk_days=90):
+        """
+        把日期范围拆成若干首尾相接、每段不超过 chunk_days 天的区间（首尾日期都包含在内）
+        Args:
+            start_date: 开始日期（格式：YYYY-MM-DD）
+            end_date: 结束日期（格式：YYYY-MM-DD）
+            chunk_days: 每段最多包含的天数
+        Returns:
+            list: [(start_date, end_date), ...]
+        """
+        from datetime import datetime, timedelta
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+        chunks = []
+        chunk_start = start_dt
+        while chunk_start <= end_dt:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_dt)
+            chunks.append((chunk_start.strftime("%Y-%m-%d"), chunk_end.strftime("%Y-%m-%d")))
+            chunk_start = chunk_end + timedelta(days=1)
+        return chunks
+
     def get_sales_by_date_range(self, db_config, start_date, end_date, result_type="1", date_unit="4",
-                                data_type="4", sids=None, max_retries=3, delay=1):
+                                data_type="4", sids=None, max_retries=3, delay=1, chunk_days=90, workers=4,
+                                pool=None):
         """
         获取指定时间范围内的销量数据并存入数据库
 
@@ -751,27 +671,26 @@ class LingXingAPI:
             data_type: 统计数据维度 1ASIN 2父体 3MSKU 4SKU 5SPU 6店铺
             sids: 店铺ID列表，多个使用英文逗号分隔
             max_retries: 最大重试次数
-            delay: 请求延迟
+            delay: 失败重试等待基数（正常翻页节奏由共享限流器控制）
+            chunk_days: 接口单次查询允许的最大天数，超过时自动分段
+            workers: 分段并发拉取数
+            pool: 可选的数据库连接池，多个任务并发时共用一组连接
 
         Returns:
             bool: 处理成功返回True，否则False
         """
         try:
-            # 验证日期范围不超过90天
-            from datetime import datetime
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-            days_diff = (end_dt - start_dt).days
-
-            if days_diff > 90:
-                print(f"错误: 时间范围超过90天限制: {days_diff}天")
+            # 接口单次查询不能超过90天，超出时拆成多段
+            chunks = self.split_date_range(start_date, end_date, chunk_days)
+            if not chunks:
+                logger.error(f"错误: 开始日期晚于结束日期: {start_date} > {end_date}")
                 return False
 
-            print(f"获取销量数据，时间范围: {start_date} 到 {end_date}")
-            print(f"统计参数 - 汇总类型: {result_type}, 时间单位: {date_unit}, 数据维度: {data_type}")
+            logger.info(f"获取销量数据，时间范围: {start_date} 到 {end_date}")
+            logger.info(f"统计参数 - 汇总类型: {result_type}, 时间单位: {date_unit}, 数据维度: {data_type}")
 
             if sids:
-                print(f"指定店铺ID: {sids}")
+                logger.info(f"指定店铺ID: {sids}")
 
             # API路径和请求参数
             api_path = "/basicOpen/platformStatisticsV2/saleStat/pageList"
@@ -787,25 +706,99 @@ class LingXingAPI:
             if sids:
                 base_biz_body["sids"] = sids
 
-            # 使用分批处理方式
-            total_processed = self.fetch_and_process_sales_data_batch(
-                api_path, base_biz_body, db_config, max_retries, delay
-            )
+            if len(chunks) == 1:
+                # 使用分批处理方式
+                total_processed = self.fetch_and_process_sales_data_batch(
+                    api_path, base_biz_body, db_config, max_retries, delay, pool=pool
+                )
+            else:
+                total_processed = self._fetch_sales_chunks(api_path, base_biz_body, db_config, chunks,
+                                                           workers=workers, max_retries=max_retries, delay=delay,
+                                                           pool=pool)
 
             if total_processed > 0:
-                print(f"成功处理 {total_processed} 条销量数据")
+                logger.info(f"成功处理 {total_processed} 条销量数据")
                 return True
             else:
-                print("警告: 未处理任何销量数据")
+                logger.warning("警告: 未处理任何销量数据")
                 return False
 
         except Exception as e:
-            print(f"处理销量数据失败: {e}")
-            import traceback
-            print(f"详细错误: {traceback.format_exc()}")
+            logger.error(f"处理销量数据失败: {e}")
+            logger.error(f"详细错误: {traceback.format_exc()}")
             return False
 
-    def fetch_and_process_sales_data_batch(self, api_path, base_biz_body, db_config, max_retries=3, delay=1):
+    def _fetch_sales_chunks(self, api_path, base_biz_body, db_config, chunks, workers=4, max_retries=3, delay=1,
+                            pool=None):
+        """
+        并发拉取多个日期分段的销量数据，按 sales_code 合并 date_collect 后统一写库
+        同一 sales_code 在数据库中只有一行，分段直接写入会互相覆盖 date_collect，所以先在内存中合并；
+        任一分段未完整拉取时放弃写库，避免用残缺数据覆盖已有记录
+        Returns:
+            int: 成功写入的记录数
+        """
+        logger.info(f"时间范围超过单次查询限制，拆分为 {len(chunks)} 段并发拉取: {chunks}")
+        # 各分段归档到同一组，重放时同样先合并再写库
+        archive_group = f"{chunks[0][0]}~{chunks[-1][1]}/{uuid.uuid4().hex[:12]}"
+
+        def fetch_chunk(chunk):
+            chunk_body = base_biz_body.copy()
+            chunk_body.update({"start_date": chunk[0], "end_date": chunk[1]})
+            sink = ListSink()
+            stats = Paginator(self, SALES_PAGE_SPEC, max_retries=max_retries, delay=delay,
+                              archive_group=archive_group).run(api_path, chunk_body, sink)
+            return chunk, sink.rows, stats["completed"]
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = list(executor.map(fetch_chunk, chunks))
+
+        incomplete = [chunk for chunk, _, completed in results if not completed]
+        if incomplete:
+            logger.error(f"错误: 以下分段销量数据未完整拉取，本次不写库: {incomplete}")
+            return 0
+
+        merged_rows = self._merge_sales_chunks([rows for _, rows, _ in results])
+        logger.info(f"分段数据合并完成: {sum(len(rows) for _, rows, _ in results)} 条 -> {len(merged_rows)} 条，开始写库...")
+
+        sink = DataOperatorSink(db_config, self._process_sales_batch_data, pool=pool)
+        total_processed = 0
+        sink.open()
+        try:
+            for i in range(0, len(merged_rows), SALES_PAGE_SPEC.page_size):
+                total_processed += sink.write(merged_rows[i:i + SALES_PAGE_SPEC.page_size])
+        finally:
+            sink.close()
+        return total_processed
+
+    def _merge_sales_chunks(self, chunk_rows):
+        """
+        合并各日期分段的销量数据：同一 sales_code 的 date_collect 取并集，volumeTotal 累加
+        分段内部重复的 sales_code 保持原有行为（后出现的覆盖先出现的）
+        Args:
+            chunk_rows: 各分段的原始数据列表
+        Returns:
+            list: 合并后的销量数据（已预处理）
+        """
+        merged = {}
+        for rows in chunk_rows:
+            chunk_merged = {}
+            for data in rows:
+                processed_data = self._preprocess_sales_data(data)
+                chunk_merged[processed_data['sales_code']] = processed_data
+
+            for sales_code, processed_data in chunk_merged.items():
+                current = merged.get(sales_code)
+                if current is None:
+                    merged[sales_code] = processed_data
+                    continue
+                date_collect = dict(current.get('date_collect') or {})
+                date_collect.update(processed_data.get('date_collect') or {})
+                current['date_collect'] = date_collect
+                current['volumeTotal'] = current.get('volumeTotal', 0) + processed_data.get('volumeTotal', 0)
+        return list(merged.values())
+
+    def fetch_and_process_sales_data_batch(self, api_path, base_biz_body, db_config, max_retries=3, delay=1,
+                                           concurrency=1, pool=None):
         """
         从分页API获取销量数据并实时分批处理
 
@@ -814,119 +807,16 @@ class LingXingAPI:
             base_biz_body: 基础请求体参数
             db_config: 数据库配置
             max_retries: 最大重试次数
-            delay: 请求延迟
+            delay: 失败重试等待基数（正常翻页节奏由共享限流器控制）
+            concurrency: 并发拉取的页数
+            pool: 可选的数据库连接池
 
         Returns:
             int: 成功处理的总记录数
         """
-        total_processed = 0
-        current_page = 1
-        page_size = 100  # 每页大小，可根据API限制调整
-        request_attempt = 0
-
-        # 初始化数据处理器
-        data_operator = DataOperator(db_config)
-
-        try:
-            # 连接数据库
-            data_operator.connect_db()
-            print("数据库连接成功，开始分批处理销量数据...")
-
-            # 1. 首先获取数据总量
-            print("正在获取销量数据总量...")
-            biz_body = base_biz_body.copy()
-            biz_body.update({
-                "page": 1,
-                "length": 20  # 初始请求获取少量数据以获取总数
-            })
-
-            try:
-                initial_result = self.api_post(api_path, biz_body)
-
-                if not initial_result or initial_result.get("code") != 0:
-                    print(f"获取数据总量失败: {initial_result}")
-                    return total_processed
-
-                total_expected = initial_result.get("total", 0)
-                print(f"销量数据总量为: {total_expected}")
-
-            except Exception as e:
-                print(f"获取数据总量失败: {e}")
-                return total_processed
-
-            # 2. 计算总页数
-            total_pages = (total_expected + page_size - 1) // page_size if total_expected > 0 else 0
-            print(f"开始分页请求，共需处理 {total_pages} 页数据，每页 {page_size} 条...")
-
-            # 3. 分批获取和处理数据
-            while current_page <= total_pages and request_attempt < max_retries:
-                print(f"正在处理第 {current_page}/{total_pages} 页")
-
-                try:
-                    # 构建当前页的请求参数
-                    biz_body = base_biz_body.copy()
-                    biz_body.update({
-                        "page": current_page,
-                        "length": page_size
-                    })
-
-                    # 获取当前批次数据
-                    result = self.api_post(api_path, biz_body)
-
-                    # 检查API响应
-                    if not result or result.get("code") != 0:
-                        error_msg = result.get("message", "未知错误") if result else "空响应"
-                        print(f"警告: 第 {current_page} 页API请求失败: {error_msg}")
-                        request_attempt += 1
-                        time.sleep(delay * 2)
-                        continue
-
-                    data_list = result.get("data", [])
-                    batch_size = len(data_list)
-
-                    if batch_size == 0:
-                        print("当前页未返回数据，退出循环")
-                        break
-
-                    # 处理当前批次数据
-                    print(f"第 {current_page} 页获取成功，本页 {batch_size} 条数据，开始插入数据库...")
-
-                    batch_success_count = self._process_sales_batch_data(data_operator, data_list)
-                    total_processed += batch_success_count
-
-                    if batch_success_count == batch_size:
-                        print(f"第 {current_page} 页数据插入成功 ({batch_success_count}/{batch_size})")
-                        request_attempt = 0  # 重置重试计数
-                        current_page += 1  # 处理下一页
-                    else:
-                        print(f"警告: 第 {current_page} 页数据部分插入失败 ({batch_success_count}/{batch_size})")
-                        request_attempt += 1
-
-                    # 请求间隔，避免API限流
-                    time.sleep(delay)
-
-                except Exception as e:
-                    request_attempt += 1
-                    print(f"错误: 第 {current_page} 页处理失败，正在进行第 {request_attempt} 次重试。错误: {e}")
-
-                    if request_attempt >= max_retries:
-                        print("错误: 重试次数已达上限，停止处理")
-                        break
-
-                    time.sleep(delay * 2)
-
-            print(f"销量数据处理完成。预期数据量: {total_expected}，实际成功处理: {total_processed}")
-            return total_processed
-
-        except Exception as e:
-            print(f"处理销量数据过程中发生错误: {e}")
-            import traceback
-            print(f"详细错误: {traceback.format_exc()}")
-            return total_processed
-
-        finally:
-            # 确保数据库连接被关闭
-            data_operator.disconnect_db()
+        sink = DataOperatorSink(db_config, self._process_sales_batch_data, pool=pool)
+        paginator = Paginator(self, SALES_PAGE_SPEC, max_retries=max_retries, delay=delay, concurrency=concurrency)
+        return paginator.run(api_path, base_biz_body, sink)["processed"]
 
     def _process_sales_batch_data(self, data_operator, data_list):
         """
@@ -939,24 +829,24 @@ class LingXingAPI:
         Returns:
             int: 成功处理的数据条数
         """
-        success_count = 0
+        # 逐行结果汇总为一条日志，单行失败只采样输出
+        summary = PageSummary("销量")
 
         for data in data_list:
             try:
                 # 预处理数据，处理JSON字符串字段
                 processed_data = self._preprocess_sales_data(data)
 
-                # 插入数据库
-                if data_operator.insert_sales_info(processed_data):
-                    success_count += 1
-                else:
-                    print("警告: 单条销量数据插入失败")
+                # 插入数据库（失败原因由 insert_sales_info 采样输出）
+                summary.add(data_operator.insert_sales_info(processed_data), data.get('sku'))
 
             except Exception as e:
-                print(f"错误: 处理单条销量数据失败: {e}")
-                continue
+                logger.sampled("sales_preprocess_failed", logging.WARNING, "处理单条销量数据失败",
+                               sku=data.get('sku'), error=e)
+                summary.add(False, data.get('sku'), e)
 
-        return success_count
+        summary.log(logger)
+        return summary.succeeded
 
     def _preprocess_sales_data(self, data):
         """
@@ -1018,9 +908,11 @@ if __name__ == "__main__":
     # 创建API客户端实例
     # 加载配置
     config = load_config_from_env()
+    configure_logging()
     client = LingXingAPI(
         app_id=config['app_id'],
-        app_secret=config['app_secret'])
+        app_secret=config['app_secret'],
+        token_cache_dir=config['token_cache_dir'])
     db_config = config['db_config']
     #设置时间
     start_time = "2025-11-22"
@@ -1036,7 +928,7 @@ if __name__ == "__main__":
     # print(wid_str)
     # res4 = client.getinvetoryList(db_config=db_config, str=wid_str)
     res5 = client.get_sales_by_date_range(start_date=start_time,end_date=end_time,db_config = db_config)
-    print(res5)
+    logger.info(res5)
 
 
 
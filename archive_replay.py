@@ -0,0 +1,239 @@
+"""
+归档重放脚本
+功能：从 page_archive 的原始分页归档重建 MySQL 数据表，完全不调用零星接口（不受接口限流约束）；
+主进程按拉取时间顺序把归档解码一遍，每页数据按主键哈希拆到各分片的临时文件，
+再由多个进程各自读取自己的分片文件并行写库，同一条数据总是由同一个进程按先后顺序写入，保证最后留下的是最新版本
+用法: python archive_replay.py [开始日期YYYY-MM-DD] [结束日期YYYY-MM-DD] [接口路径 ...]
+支持的接口：订单、店铺、库存、销量分页接口（同步与异步客户端拉取的页都会归档）和仓库列表
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from config import load_config_from_env
+from dataoperator import DataOperator
+from json_stream import loads
+from page_archive import iter_archived_pages
+from paginator import PageSpec, ORDER_PAGE_SPEC, STORE_PAGE_SPEC, INVENTORY_PAGE_SPEC, SALES_PAGE_SPEC
+
+ORDER_ENDPOINT = "/pb/mp/order/v2/list"
+STORE_ENDPOINT = "/pb/mp/shop/v2/getSellerList"
+INVENTORY_ENDPOINT = "/erp/sc/routing/data/local_inventory/inventoryDetails"
+SALES_ENDPOINT = "/basicOpen/platformStatisticsV2/saleStat/pageList"
+WAREHOUSE_ENDPOINT = "/erp/sc/data/local_inventory/warehouse"
+
+# 仓库列表不分页，整个响应归档为一页，data 本身就是列表
+WAREHOUSE_SPEC = PageSpec("仓库", list_path=("data",), total_path=("total",))
+
+# 各接口的分页描述与分片键（同一主键的数据必须落在同一分片）
+REPLAY_TARGETS = {
+    ORDER_ENDPOINT: (ORDER_PAGE_SPEC, lambda row: row.get('global_order_no')),
+    STORE_ENDPOINT: (STORE_PAGE_SPEC, lambda row: row.get('store_id')),
+    INVENTORY_ENDPOINT: (INVENTORY_PAGE_SPEC, lambda row: f"{row.get('wid')}/{row.get('sku')}"),
+    SALES_ENDPOINT: (SALES_PAGE_SPEC, lambda row: json.dumps(row.get('sku'), sort_keys=True)),
+    WAREHOUSE_ENDPOINT: (WAREHOUSE_SPEC, lambda row: row.get('wid')),
+}
+
+_sales_client = None
+
+
+def _get_sales_client():
+    # 销量数据需要经过 LingXingAPI 的预处理（解析 JSON 字段、计算 sales_code），构造客户端不会发起请求
+    global _sales_client
+    if _sales_client is None:
+        from api_use import LingXingAPI
+        config = load_config_from_env()
+        _sales_client = LingXingAPI(config['app_id'], config['app_secret'],
+                                    token_cache_dir=config['token_cache_dir'])
+    return _sales_client
+
+
+def _write_sales(data_operator, rows):
+    return _get_sales_client()._process_sales_batch_data(data_operator, rows)
+
+
+def _replay_sales(data_operator, pages):
+    """
+    重放销量分片
+    超过单次查询天数被拆成多段拉取的销量（归档中带 group），与同步时一样先按 sales_code 合并各段的
+    date_collect 再写库，逐页写入会让后面的分段覆盖前面分段的 date_collect；
+    未分段的页按原样写入。各写入单元按其最后一页的拉取时间排序，保证最后留下的是最新版本。
+    分组要等所有分段读完才能合并，整个分片的销量数据会先读入内存
+    """
+    units = []
+    groups = {}
+    for page in pages:
+        group = page.get("group")
+        if group is None:
+            units.append([page.get("fetched_at") or 0, None, page["rows"]])
+            continue
+        unit = groups.get(group)
+        if unit is None:
+            unit = groups[group] = [0, group, {}]
+            units.append(unit)
+        unit[0] = max(unit[0], page.get("fetched_at") or 0)
+        body = page.get("body") or {}
+        unit[2].setdefault((body.get("start_date"), body.get("end_date")), []).extend(page["rows"])
+
+    client = _get_sales_client()
+    page_size = SALES_PAGE_SPEC.page_size
+    for _, group, rows in sorted(units, key=lambda unit: unit[0]):
+        if group is None:
+            _write_sales(data_operator, rows)
+            continue
+        # 分段内重复拉取的页由 _merge_sales_chunks 按 sales_code 去重
+        merged_rows = client._merge_sales_chunks([rows[chunk] for chunk in sorted(rows, key=str)])
+        for i in range(0, len(merged_rows), page_size):
+            _write_sales(data_operator, merged_rows[i:i + page_size])
+
+
+def _get_writer(endpoint):
+    if endpoint == STORE_ENDPOINT:
+        return lambda data_operator, rows: data_operator.insert_stores_table(rows)
+    if endpoint == WAREHOUSE_ENDPOINT:
+        return lambda data_operator, rows: data_operator.insert_warehouse_table(rows)
+    return lambda data_operator, rows: data_operator.insert_inventory_table(rows)
+
+
+def _shard_of(key, shards):
+    # 不能用内置 hash()：各进程的字符串哈希种子不同
+    return zlib.crc32(str(key).encode("utf-8")) % shards
+
+
+def _split_archive(root_dir, endpoint, start_date, end_date, shards, work_dir):
+    """
+    按拉取时间顺序读一遍归档，每页数据按分片键拆到各分片的临时文件（每行一页，只含该分片的数据）
+    Returns:
+        list: 各分片的文件路径
+    """
+    spec, key_func = REPLAY_TARGETS[endpoint]
+    paths = [os.path.join(work_dir, f"shard-{shard}.ndjson") for shard in range(shards)]
+    files = [open(path, "w", encoding="utf-8") for path in paths]
+    try:
+        for record in iter_archived_pages(root_dir, endpoint, start_date, end_date):
+            shard_rows = [[] for _ in range(shards)]
+            for row in spec.extract_list(record.get("response") or {}):
+                shard_rows[_shard_of(key_func(row), shards)].append(row)
+            for shard, rows in enumerate(shard_rows):
+                if rows:
+                    page = {"fetched_at": record.get("fetched_at"), "body": record.get("body"), "rows": rows}
+                    if record.get("group") is not None:
+                        page["group"] = record["group"]
+                    files[shard].write(json.dumps(page, ensure_ascii=False, default=str) + "\n")
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def _read_shard(path):
+    with open(path, "rb") as f:
+        for line in f:
+            yield loads(line)
+
+
+def _replay_shard(task):
+    """
+    在子进程中重放一个分片
+    Args:
+        task: (db_config, 接口路径, 分片文件路径)
+    Returns:
+        dict: pages 写入页数, rows 写入条数
+    """
+    db_config, endpoint, path = task
+    stats = {"pages": 0, "rows": 0}
+
+    def shard_pages():
+        for page in _read_shard(path):
+            stats["pages"] += 1
+            stats["rows"] += len(page["rows"])
+            yield page
+
+    data_operator = DataOperator(db_config)
+    data_operator.connect_db()
+    try:
+        if endpoint == ORDER_ENDPOINT:
+            config = load_config_from_env()
+            if config['archive_config']['replay_bulk']:
+                # 批量导入（LOAD DATA 临时表合并），每 chunk_orders 条一个事务，多个分片进程不会长时间锁住订单各表
+                bulk_config = config['bulk_load_config']
+                data_operator.insert_orders_bulk((order for page in shard_pages() for order in page["rows"]),
+                                                 tmp_dir=bulk_config['tmp_dir'],
+                                                 fallback_batch=bulk_config['fallback_batch'],
+                                                 chunk_size=bulk_config['chunk_orders'])
+            else:
+                # 逐页多行 upsert，每页一个事务；重建数据时不比对指纹，全部重写
+                for page in shard_pages():
+                    data_operator.insert_orders(page["rows"], skip_unchanged=False)
+        elif endpoint == SALES_ENDPOINT:
+            _replay_sales(data_operator, shard_pages())
+        else:
+            write = _get_writer(endpoint)
+            for page in shard_pages():
+                write(data_operator, page["rows"])
+    finally:
+        data_operator.disconnect_db()
+    return stats
+
+
+def reprocess_archive(db_config, root_dir, endpoints=None, start_date=None, end_date=None, workers=4):
+    """
+    从归档重建数据表
+    Args:
+        db_config: 数据库配置
+        root_dir: 归档根目录
+        endpoints: 要重放的接口路径列表，默认全部支持的接口
+        start_date / end_date: 归档日期范围（YYYY-MM-DD，闭区间），为空表示不限
+        workers: 并行写库的进程数（即分片数）
+    Returns:
+        dict: {接口路径: {pages, rows, elapsed}}
+    """
+    workers = max(1, workers)
+    summary = {}
+    for endpoint in endpoints or list(REPLAY_TARGETS):
+        if endpoint not in REPLAY_TARGETS:
+            print(f"不支持重放的接口，跳过: {endpoint}")
+            continue
+        start = time.time()
+        work_dir = tempfile.mkdtemp(prefix="archive-replay-")
+        try:
+            # 归档只解压解析一遍，各分片进程只读取属于自己的数据
+            paths = _split_archive(root_dir, endpoint, start_date, end_date, workers, work_dir)
+            print(f"{endpoint} 归档已拆分为 {workers} 个分片，耗时 {time.time() - start:.1f}s")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                shard_stats = list(executor.map(_replay_shard, [(db_config, endpoint, path) for path in paths]))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        summary[endpoint] = {
+            "pages": sum(stats["pages"] for stats in shard_stats),
+            "rows": sum(stats["rows"] for stats in shard_stats),
+            "elapsed": time.time() - start,
+        }
+        print(f"{endpoint} 重放完成: {summary[endpoint]['rows']} 条，耗时 {summary[endpoint]['elapsed']:.1f}s")
+    return summary
+
+
+def main():
+    config = load_config_from_env()
+    args = sys.argv[1:]
+    start_date = args[0] if len(args) > 0 else None
+    end_date = args[1] if len(args) > 1 else None
+    endpoints = args[2:] or None
+    print(f"开始从归档重建数据: 目录 {config['archive_config']['dir']}，日期 {start_date or '不限'} ~ {end_date or '不限'}")
+    try:
+        reprocess_archive(config['db_config'], config['archive_config']['dir'], endpoints=endpoints,
+                          start_date=start_date, end_date=end_date,
+                          workers=config['archive_config']['replay_workers'])
+    except Exception as e:
+        print(f"归档重放失败: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
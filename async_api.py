@@ -0,0 +1,240 @@
+"""
+零星开放平台异步客户端
+功能：基于 aiohttp 的 LingXingAPI 异步版本，签名规则、token 缓存与同步客户端完全一致，
+以异步生成器的形式逐页产出订单、店铺、库存、销量数据，
+便于在同一个事件循环中并发驱动多个接口的拉取任务
+"""
+import asyncio
+import logging
+import math
+import time
+
+import aiohttp
+
+from api_use import LingXingAPI
+from config import load_config_from_env
+from dataoperator import DataOperator
+from log_utils import configure_logging, get_logger
+from paginator import ORDER_PAGE_SPEC, STORE_PAGE_SPEC, INVENTORY_PAGE_SPEC, SALES_PAGE_SPEC
+from retry_policy import RetryPolicy, classify_error
+from token_manager import TokenManager
+
+logger = get_logger(__name__)
+
+
+class AsyncLingXingAPI(LingXingAPI):
+    """零星开放平台异步API客户端（需在 async with 中使用）"""
+
+    def __init__(self, app_id: str, app_secret: str, base_url: str = "https://openapi.lingxing.com",
+                 token_cache_dir: str = None, http_config: dict = None):
+        super().__init__(app_id, app_secret, base_url, token_cache_dir=token_cache_dir)
+        self.http_config = http_config or load_config_from_env()['http_config']
+        self.aio_session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.http_config.get('pool_maxsize', 20),
+                                         keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(connect=self.http_config.get('connect_timeout', 5),
+                                        sock_read=self.http_config.get('read_timeout', 30))
+        # aiohttp 默认声明并自动解压 gzip/deflate 响应
+        self.aio_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self.aio_session is not None:
+            await self.aio_session.close()
+            self.aio_session = None
+
+    # ========= 业务 POST 请求 =========
+    async def async_api_post(self, api_path: str, biz_body: dict) -> dict:
+        """
+        异步发送业务请求（只发一次，限流、token 失效由调用方的 RetryPolicy 重试，与同步 api_post 一致）
+        Returns:
+            dict: 接口响应，请求失败时返回None（与同步 api_post 保持一致）
+        """
+        loop = asyncio.get_event_loop()
+        # 与同步客户端共用令牌桶，等待令牌时不阻塞事件循环
+        await loop.run_in_executor(None, self.rate_limiter.acquire, api_path, self.BASE_URL)
+        # token 命中缓存时几乎不耗时；需要刷新时会发起同步请求，放到线程池避免阻塞事件循环
+        access_token = await loop.run_in_executor(None, self.get_access_token)
+        query = self.build_signed_query(biz_body, access_token)
+        url = self.BASE_URL + api_path
+
+        try:
+            async with self.aio_session.post(url, params=query, json=biz_body) as resp:
+                if resp.status == 429:
+                    result = {"code": "3001008", "msg": "HTTP 429 Too Many Requests"}
+                else:
+                    resp.raise_for_status()
+                    result = await resp.json(content_type=None)
+
+            if self.rate_limiter.is_rate_limited(result):
+                self.rate_limiter.on_rate_limited(api_path, self.BASE_URL)
+                return result
+            self.rate_limiter.on_success(api_path, self.BASE_URL)
+
+            if str(result.get("code")) in TokenManager.TOKEN_INVALID_CODES:
+                logger.warning("access_token 已失效，清除缓存", api=api_path)
+                await loop.run_in_executor(None, self.token_manager.invalidate, access_token)
+
+            return result
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning("API请求失败", api=api_path, error=e)
+            return None
+        except ValueError as e:
+            logger.warning("响应JSON解析失败", api=api_path, error=e)
+            return None
+
+    # ========= 通用分页 =========
+    async def _fetch_page(self, api_path, spec, biz_body, index, max_retries=3, delay=1):
+        """
+        请求单页并按分页描述校验、取出数据列表，失败时按重试策略退避重试（与同步 Paginator 共用熔断器）；
+        开启归档时与同步 Paginator 一样归档每一页原始响应
+        """
+        policy = RetryPolicy(max_attempts=max_retries, base_delay=delay)
+
+        async def request():
+            result = await self.async_api_post(api_path, biz_body)
+            spec.check(result)
+            return result
+
+        def on_retry(error, attempt, wait):
+            # 与同步 Paginator 一致，接口故障时按接口采样输出
+            logger.sampled(f"{spec.name}_page_retry", logging.WARNING, f"{spec.name}页请求失败，准备重试",
+                           api=api_path, attempt=attempt, category=classify_error(error),
+                           wait=f"{wait:.1f}s", error=error)
+
+        result = await policy.acall(api_path, request, on_retry)
+        if self.page_archive is not None:
+            # 归档是阻塞的文件写入，放到线程池执行
+            await asyncio.get_running_loop().run_in_executor(None, self._archive_response, api_path, biz_body,
+                                                             index, result)
+        return result, spec.extract_list(result)
+
+    async def _iter_pages(self, api_path, spec, base_biz_body, concurrency=1, max_retries=3, delay=1):
+        """
+        通用异步分页生成器（分页方式、列表/total位置由 PageSpec 描述，与同步 Paginator 共用）
+        先请求首页得到 total，再按 concurrency 个一组并发请求后续页，按页序逐页产出；
+        请求节奏由共享限流器控制，delay 仅作为失败重试的等待基数
+        """
+        first_result, first_list = await self._fetch_page(api_path, spec, spec.page_body(base_biz_body, 0), 0,
+                                                          max_retries, delay)
+        total_expected = spec.extract_total(first_result)
+        total_pages = math.ceil(total_expected / spec.page_size) if total_expected > 0 else 0
+        logger.info(f"{spec.name}数据总量", api=api_path, total=total_expected, pages=total_pages)
+        if not first_list:
+            return
+        yield first_list
+
+        for start in range(1, total_pages, concurrency):
+            indexes = range(start, min(start + concurrency, total_pages))
+            results = await asyncio.gather(*[
+                self._fetch_page(api_path, spec, spec.page_body(base_biz_body, i), i, max_retries, delay)
+                for i in indexes
+            ])
+            for _, current_list in results:
+                if not current_list:
+                    return
+                yield current_list
+
+    # ========= 各业务数据分页 =========
+    def iter_order_pages(self, start_time, end_time, date_type="update_time", platform_codes=[10024],
+                         concurrency=1, delay=1):
+        """异步逐页产出订单列表"""
+        base_biz_body = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "date_type": date_type,
+            "platform_code": platform_codes,
+        }
+        return self._iter_pages("/pb/mp/order/v2/list", ORDER_PAGE_SPEC, base_biz_body,
+                                concurrency=concurrency, delay=delay)
+
+    def iter_store_pages(self, platform_codes=[10024], concurrency=1, delay=1):
+        """异步逐页产出店铺列表"""
+        base_biz_body = {
+            "platform_code": platform_codes,
+            "is_sync": 1,
+            "status": 1
+        }
+        return self._iter_pages("/pb/mp/shop/v2/getSellerList", STORE_PAGE_SPEC, base_biz_body,
+                                concurrency=concurrency, delay=delay)
+
+    def iter_inventory_pages(self, wid='', concurrency=1, delay=1):
+        """异步逐页产出库存列表"""
+        return self._iter_pages("/erp/sc/routing/data/local_inventory/inventoryDetails", INVENTORY_PAGE_SPEC,
+                                {"wid": wid}, concurrency=concurrency, delay=delay)
+
+    def iter_sales_pages(self, start_date, end_date, result_type="1", date_unit="4", data_type="4", sids=None,
+                         concurrency=1, delay=1):
+        """异步逐页产出销量统计列表"""
+        base_biz_body = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "result_type": result_type,
+            "date_unit": date_unit,
+            "data_type": data_type
+        }
+        if sids:
+            base_biz_body["sids"] = sids
+        return self._iter_pages("/basicOpen/platformStatisticsV2/saleStat/pageList", SALES_PAGE_SPEC, base_biz_body,
+                                concurrency=concurrency, delay=delay)
+
+
+async def _consume_pages(page_iter, db_config, write):
+    """
+    消费异步分页数据并写入数据库
+    数据库写入是阻塞操作，放到线程池执行；每个消费者独占一个数据库连接
+    """
+    loop = asyncio.get_event_loop()
+    data_operator = DataOperator(db_config)
+    await loop.run_in_executor(None, data_operator.connect_db)
+    total_processed = 0
+    try:
+        async for current_batch in page_iter:
+            await loop.run_in_executor(None, write, data_operator, current_batch)
+            total_processed += len(current_batch)
+    finally:
+        await loop.run_in_executor(None, data_operator.disconnect_db)
+    return total_processed
+
+
+async def run_concurrent_sync(config, start_time, end_time, start_date, end_date, wid=''):
+    """
+    在同一事件循环中并发拉取订单、库存、销量数据
+    Returns:
+        dict: 各任务处理条数（失败的任务为异常对象）
+    """
+    db_config = config['db_config']
+    async with AsyncLingXingAPI(config['app_id'], config['app_secret'],
+                                token_cache_dir=config['token_cache_dir']) as client:
+        def write_sales(data_operator, batch):
+            client._process_sales_batch_data(data_operator, batch)
+
+        results = await asyncio.gather(
+            _consume_pages(client.iter_order_pages(start_time, end_time), db_config,
+                           lambda data_operator, batch: data_operator.insert_orders(batch)),
+            _consume_pages(client.iter_inventory_pages(wid), db_config,
+                           lambda data_operator, batch: data_operator.insert_inventory_table(batch)),
+            _consume_pages(client.iter_sales_pages(start_date, end_date), db_config, write_sales),
+            return_exceptions=True
+        )
+    return dict(zip(["订单", "库存", "销量"], results))
+
+
+if __name__ == "__main__":
+    from datetime import datetime, timedelta
+
+    config = load_config_from_env()
+    configure_logging()
+    end_time = int(time.time())
+    start_time = end_time - 86400
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=30)
+    summary = asyncio.run(run_concurrent_sync(
+        config, start_time, end_time, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+    ))
+    print(summary)
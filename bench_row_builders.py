@@ -0,0 +1,235 @@
+"""
+行构造微基准
+功能：对比重构前的 DataOperator（逐字段调用 serialize_value 的 _insert_* / _process_* 方法，
+从 git 历史中原样加载，不做任何改动）与当前按 table_schema 取值函数构造行的 DataOperator，
+两边都走各自的写入方法、游标为空操作，按表输出每秒构造的行数（只测 Python 侧，不连接数据库）
+样本数据默认与接口返回的形态一致（字典/列表只出现在 JSON 字段中）；--mixed 时任意字段都可能是字典（最坏情况）
+用法: python bench_row_builders.py [--mixed] [每张表的记录数，默认20000] [重构前的 git 版本，默认自动查找]
+"""
+import os
+import sys
+import time
+import types
+import random
+import subprocess
+
+import dataoperator
+from table_schema import (ORDER_TABLES, ORDERS_SCHEMA, ORDERS_NO_HASH_SCHEMA, STORE_INFO_SCHEMA, WAREHOUSE_INFO_SCHEMA,
+                          INVENTORY_INFO_SCHEMA, SALES_INFO_SCHEMA, FLOAT, PARENT, COMPUTED, order_table_rows)
+
+# 各表在重构前 DataOperator 中的写入方法
+LEGACY_ORDER_METHODS = {
+    "orders": "_insert_orders_table",
+    "buyers_info": "_insert_buyers_info",
+    "address_info": "_insert_address_info",
+    "item_info": "_insert_item_info",
+    "platform_info": "_insert_platform_info",
+    "payment_info": "_insert_payment_info",
+    "logistics_info": "_insert_logistics_info",
+}
+LEGACY_RECORD_METHODS = [
+    (STORE_INFO_SCHEMA, "_process_stores"),
+    (WAREHOUSE_INFO_SCHEMA, "_process_warehouse"),
+    (INVENTORY_INFO_SCHEMA, "_process_single_inventory"),
+    (SALES_INFO_SCHEMA, "insert_sales_info"),
+]
+
+# 接口返回字典/列表的字段（其余字段为字符串、数字或空值）
+JSON_COLUMNS = {"order_custom_fields", "data_json", "item_custom_fields"}
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class _NullCursor:
+    """只记录最后一次参数的游标"""
+
+    def __init__(self):
+        self.last = None
+
+    def execute(self, sql, values=None):
+        self.last = values
+
+
+class _NullConn:
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def _git(*args):
+    return subprocess.check_output(["git", "-C", REPO_DIR] + list(args)).decode("utf-8")
+
+
+def load_legacy_module(rev=None):
+    """
+    从 git 历史加载重构前的 dataoperator.py
+    Args:
+        rev: git 版本，默认取删除 _insert_item_info 的那次提交的父提交
+    Returns:
+        module: 重构前的 dataoperator 模块
+    """
+    if rev is None:
+        removed_in = _git("log", "-1", "--format=%H", "-S", "def _insert_item_info", "--", "dataoperator.py").strip()
+        rev = f"{removed_in}^"
+    source = _git("show", f"{rev}:dataoperator.py")
+    module = types.ModuleType("legacy_dataoperator")
+    module.__file__ = f"{rev}:dataoperator.py"
+    exec(compile(source, module.__file__, "exec"), module.__dict__)
+    return module
+
+
+def _make_operator(cls, **attrs):
+    """不连接数据库的 DataOperator 实例"""
+    operator = cls.__new__(cls)
+    operator.db_config = {}
+    operator.conn = _NullConn()
+    operator.cursor = _NullCursor()
+    for name, value in attrs.items():
+        setattr(operator, name, value)
+    return operator
+
+
+def _is_json_column(column):
+    return column.name in JSON_COLUMNS or isinstance(column.default, (list, dict))
+
+
+def _sample_record(schema, rng, index, mixed=False):
+    record = {}
+    for column in schema.columns:
+        if column.kind in (PARENT, COMPUTED):
+            continue
+        if column.kind == FLOAT:
+            value = rng.choice([None, "", f"{rng.uniform(0, 500):.2f}", rng.randint(0, 50)])
+        elif mixed:
+            value = rng.choice([f"{column.name}-{index}", rng.randint(0, 10000), None, "", {"k": index}])
+        elif _is_json_column(column):
+            value = rng.choice([{"k": index}, [f"{column.name}-{index}"], None])
+        else:
+            value = rng.choice([f"{column.name}-{index}", rng.randint(0, 10000), None, ""])
+        target = record
+        parts = (column.source or column.name).split(".")
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    if schema is INVENTORY_INFO_SCHEMA:
+        record["stock_age_list"] = [{"name": "0-15天库龄", "qty": rng.randint(0, 20)},
+                                    {"name": "91天以上库龄", "qty": rng.randint(0, 20)}]
+    return record
+
+
+def _sample_order(rng, index, mixed=False):
+    order = _sample_record(ORDERS_SCHEMA, rng, index, mixed)
+    order["global_order_no"] = f"BENCH{index}"
+    for schema in ORDER_TABLES[1:]:
+        if schema.many:
+            order[schema.source] = [_sample_record(schema, rng, index, mixed) for _ in range(rng.randint(1, 3))]
+        else:
+            order[schema.source] = _sample_record(schema, rng, index, mixed)
+    return order
+
+
+def _rows_per_second(func, records, rows, repeat=3):
+    """跑 repeat 遍取最快的一遍，减少机器负载波动的影响"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for record in records:
+            func(record)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return rows / best if best else float("inf")
+
+
+def _order_table_cases(legacy, current, orders):
+    """
+    订单各表：原写法 _insert_*(order, batch)，现写法 _write_rows(schema.sql, schema.rows(order), batch)；
+    重构时主订单表还没有订单指纹列，按不含指纹列的 ORDERS_NO_HASH_SCHEMA 对比取值
+    """
+    for schema in [ORDERS_NO_HASH_SCHEMA] + ORDER_TABLES[1:]:
+        legacy_method = getattr(legacy, LEGACY_ORDER_METHODS[schema.table])
+        legacy_batch, current_batch = {}, {}
+        for order in orders[:100]:
+            legacy_method(order, legacy_batch)
+            current._write_rows(schema.sql, schema.rows(order), current_batch)
+        assert list(legacy_batch.values()) == list(current_batch.values()), schema.table
+
+        rows = sum(len(schema.rows(order)) for order in orders)
+        yield (schema.table, len(schema.columns), rows,
+               lambda order, method=legacy_method: method(order, {}),
+               lambda order, schema=schema: current._write_rows(schema.sql, schema.rows(order), {}))
+
+
+def _whole_order_case(legacy, current, orders):
+    """
+    整单净开销：原写法依次调用七个 _insert_*，现写法 order_table_rows（含订单指纹）+ _write_order_rows，
+    即现行写库路径上每条订单的全部 Python 开销
+    """
+    legacy_methods = [getattr(legacy, LEGACY_ORDER_METHODS[schema.table]) for schema in ORDER_TABLES]
+
+    def legacy_func(order):
+        batch = {}
+        for method in legacy_methods:
+            method(order, batch)
+
+    def current_func(order):
+        current._write_order_rows(order_table_rows(order), {})
+
+    rows = sum(len(schema.rows(order)) for order in orders for schema in ORDER_TABLES[1:]) + len(orders)
+    columns = sum(len(schema.columns) for schema in ORDER_TABLES)
+    return "整单+指纹", columns, rows, orders, legacy_func, current_func
+
+
+def _record_table_cases(legacy, current, rng, count, mixed=False):
+    """店铺/仓库/库存/销量：两边都调用同名的逐行写入方法，游标为空操作"""
+    for schema, method in LEGACY_RECORD_METHODS:
+        records = [_sample_record(schema, rng, i, mixed) for i in range(count)]
+        legacy_method, current_method = getattr(legacy, method), getattr(current, method)
+        for record in records[:100]:
+            legacy_method(record)
+            current_method(record)
+            assert tuple(legacy.cursor.last) == tuple(current.cursor.last), schema.table
+        yield schema.table, len(schema.columns), count, records, legacy_method, current_method
+
+
+def main():
+    args = sys.argv[1:]
+    mixed = "--mixed" in args
+    args = [arg for arg in args if arg != "--mixed"]
+    count = int(args[0]) if len(args) > 0 else 20000
+    legacy_module = load_legacy_module(args[1] if len(args) > 1 else None)
+    print(f"原写法: {legacy_module.__file__}")
+    print(f"样本数据: {'任意字段都可能是字典（最坏情况）' if mixed else '接口形态（字典/列表只在 JSON 字段中）'}")
+    legacy = _make_operator(legacy_module.DataOperator, pool=None)
+    current = _make_operator(dataoperator.DataOperator, write_config={})
+    rng = random.Random(0)
+
+    cases = []
+    orders = [_sample_order(rng, i, mixed) for i in range(count)]
+    for table, columns, rows, legacy_func, current_func in _order_table_cases(legacy, current, orders):
+        cases.append((table, columns, rows, orders, legacy_func, current_func))
+    cases.extend(_record_table_cases(legacy, current, rng, count, mixed))
+    whole_order = _whole_order_case(legacy, current, orders)
+
+    print(f"{'表':<16}{'字段数':>6}{'原写法 行/秒':>16}{'现写法 行/秒':>16}{'提升':>8}")
+    total_rows = total_legacy = total_current = 0.0
+    for table, columns, rows, records, legacy_func, current_func in cases:
+        legacy_rate = _rows_per_second(legacy_func, records, rows)
+        current_rate = _rows_per_second(current_func, records, rows)
+        print(f"{table:<16}{columns:>6}{legacy_rate:>16,.0f}{current_rate:>16,.0f}{current_rate / legacy_rate:>7.1f}x")
+        total_rows += rows
+        total_legacy += rows / legacy_rate
+        total_current += rows / current_rate
+
+    print(f"{'合计':<16}{'':>6}{total_rows / total_legacy:>16,.0f}{total_rows / total_current:>16,.0f}"
+          f"{total_legacy / total_current:>7.1f}x")
+    # 订单写库的净效果：七张表的取值加上订单指纹（跳过未变化订单所需的开销）
+    table, columns, rows, records, legacy_func, current_func = whole_order
+    legacy_rate = _rows_per_second(legacy_func, records, rows)
+    current_rate = _rows_per_second(current_func, records, rows)
+    print(f"{table:<16}{columns:>6}{legacy_rate:>16,.0f}{current_rate:>16,.0f}{current_rate / legacy_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
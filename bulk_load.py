@@ -0,0 +1,111 @@
+"""
+订单批量导入（只用于归档重放：archive_replay.py 在 ARCHIVE_REPLAY_BULK=1 时使用，日常同步和按时间范围拉取不走这里）
+功能：把订单各表的行流式写入临时 TSV 文件（不在内存中保留整批数据），
+由 DataOperator.insert_orders_bulk 用 LOAD DATA LOCAL INFILE 导入会话临时表，
+再每张表一条 INSERT ... SELECT ... ON DUPLICATE KEY UPDATE 合并到正式表
+
+手工验证（需要服务端 local_infile=ON 的测试库，DB_LOCAL_INFILE=1）：
+1. 同一段订单归档分别用 ARCHIVE_REPLAY_BULK=0（逐页多行 upsert）和 ARCHIVE_REPLAY_BULK=1 重放到两个空库：
+   python archive_replay.py 2025-12-01 2025-12-07 /pb/mp/order/v2/list
+2. 两个库七张订单表的行数相同，按主键逐行比较除 data_updatetime 外的各列完全一致
+   （同一订单在归档中出现多次时，两种方式都以最后拉取的版本为准）
+3. 对 ARCHIVE_REPLAY_BULK=1 的库再重放一次：行数不变（合并走 ON DUPLICATE KEY UPDATE，不产生重复行）
+4. 服务端改为 local_infile=OFF 再重放一次：日志出现"未开启 local_infile，批量导入退回多行 upsert"，结果同上
+"""
+import os
+import tempfile
+
+# 临时表自增序号：同一主键在回补数据中出现多次时，按写入顺序合并，最后一行生效
+STAGING_SEQ_COLUMN = "stage_seq"
+
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+
+
+def tsv_field(value):
+    """按 LOAD DATA 默认转义规则编码单个字段（None 为 \\N）"""
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "1"
+    if value is False:
+        return "0"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def tsv_line(row):
+    return "\t".join([tsv_field(value) for value in row]) + "\n"
+
+
+def staging_table(schema):
+    return f"stage_{schema.table}"
+
+
+def create_staging_sql(schema):
+    """与正式表字段类型相同、但不带唯一键的会话临时表（重复主键在合并时处理）"""
+    return (f"CREATE TEMPORARY TABLE {staging_table(schema)} "
+            f"({STAGING_SEQ_COLUMN} BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY) "
+            f"SELECT {', '.join(schema.column_names)} FROM {schema.table} LIMIT 0")
+
+
+def drop_staging_sql(schema):
+    return f"DROP TEMPORARY TABLE IF EXISTS {staging_table(schema)}"
+
+
+def load_data_sql(schema):
+    """LOAD DATA 语句，文件路径作为参数传入"""
+    return (f"LOAD DATA LOCAL INFILE %s INTO TABLE {staging_table(schema)} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+            f"({', '.join(schema.column_names)})")
+
+
+class StagingFiles:
+    """每张表一个临时 TSV 文件"""
+
+    def __init__(self, schemas, tmp_dir=None, rows_of=None):
+        """
+        Args:
+            schemas: 要导入的表（table_schema.TableSchema 列表）
+            tmp_dir: 临时文件目录，默认系统临时目录
+            rows_of: 把一条记录拆成各表的行 rows_of(record) -> [(schema, 行列表), ...]，默认逐表 schema.rows
+        """
+        self.schemas = list(schemas)
+        self.tmp_dir = tmp_dir or None
+        self.rows_of = rows_of or (lambda record: [(schema, schema.rows(record)) for schema in self.schemas])
+        self.paths = {}
+        self.counts = {schema.table: 0 for schema in self.schemas}
+
+    def write_records(self, records):
+        """
+        把记录逐条拆分为各表的行写入文件
+        Returns:
+            int: 写入的记录数
+        """
+        if self.tmp_dir:
+            os.makedirs(self.tmp_dir, exist_ok=True)
+        files = {}
+        record_count = 0
+        try:
+            for schema in self.schemas:
+                fd, path = tempfile.mkstemp(prefix=f"{schema.table}-", suffix=".tsv", dir=self.tmp_dir)
+                self.paths[schema.table] = path
+                files[schema.table] = os.fdopen(fd, "w", encoding="utf-8", newline="\n")
+            for record in records:
+                for schema, rows in self.rows_of(record):
+                    if rows:
+                        files[schema.table].writelines([tsv_line(row) for row in rows])
+                        self.counts[schema.table] += len(rows)
+                record_count += 1
+        finally:
+            for f in files.values():
+                f.close()
+        return record_count
+
+    def cleanup(self):
+        for path in self.paths.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.paths = {}
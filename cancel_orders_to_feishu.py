@@ -1,9 +1,10 @@
 import pymysql
-import requests
 import time
 import re
 from datetime import datetime, date
 from config import  load_config_from_env
+from db_pool import get_shared_pool
+from http_session import get_session
 from utils import extract_store_name
 
 config = load_config_from_env()
@@ -16,6 +17,9 @@ CANCEL_ORDERS_TABLE_ID = config['cancel_orders_config']['CANCEL_ORDERS_TABLE_ID'
 
 MYSQL_CONFIG = config['db_config']
 
+# 飞书接口共享连接池会话（keep-alive，统一超时配置）
+session = get_session('feishu')
+
 MYSQL_TABLE = "orders_merge"
 
 # 修正后的取消订单表字段定义 - 全部使用文本类型
@@ -65,7 +69,7 @@ CANCEL_ORDERS_FIELDS = [
 def get_tenant_access_token():
     """获取访问令牌"""
     url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-    resp = requests.post(url, json={
+    resp = session.post(url, json={
         "app_id": APP_ID,
         "app_secret": APP_SECRET
     }).json()
@@ -82,7 +86,7 @@ def get_existing_fields_with_details(token, table_id):
     headers = {"Authorization": f"Bearer {token}"}
 
     try:
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers)
         result = response.json()
 
         if result.get("code") == 0:
@@ -158,7 +162,7 @@ def update_field_type(token, field_def, table_id, field_id):
 
     try:
         print(f"🔄 正在更新字段类型: {field_def['field_name']} -> 类型 {field_def['type']}")
-        response = requests.put(url, headers=headers, json=payload, timeout=10)
+        response = session.put(url, headers=headers, json=payload, timeout=10)
         result = response.json()
 
         if result.get("code") == 0:
@@ -194,7 +198,7 @@ def create_field(token, field_def, table_id):
 
     try:
         print(f"🔄 正在创建字段: {field_def['field_name']} (类型: {field_def['type']})")
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = session.post(url, headers=headers, json=payload, timeout=10)
         result = response.json()
 
         if result.get("code") == 0:
@@ -216,33 +220,33 @@ def create_field(token, field_def, table_id):
 def fetch_cancel_orders_data(date_filter=None):
     """从MySQL读取取消订单数据"""
     try:
-        conn = pymysql.connect(**MYSQL_CONFIG)
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-
-        # 基础查询语句
-        sql = """
-        SELECT 
-            global_cancel_time,
-            order_status,
-            platform_order_no,
-            store_id,
-            store_full_name
-        FROM orders_merge 
-        WHERE order_status = 7
-        AND global_cancel_time IS NOT NULL 
-        AND global_cancel_time != ''
-        """
-
-        # 添加日期过滤条件
-        if date_filter:
-            sql += f" AND global_cancel_time > '{date_filter}'"
-            print(f"🔍 使用日期过滤条件: > {date_filter}")
-
-        cursor.execute(sql)
-        rows = cursor.fetchall()
-
-        cursor.close()
-        conn.close()
+        # 从进程内共享的连接池借用连接，读取完成后归还
+        with get_shared_pool(MYSQL_CONFIG).connection() as conn:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+
+            # 基础查询语句
+            sql = """
+            SELECT 
+                global_cancel_time,
+                order_status,
+                platform_order_no,
+                store_id,
+                store_full_name
+            FROM orders_merge 
+            WHERE order_status = 7
+            AND global_cancel_time IS NOT NULL 
+            AND global_cancel_time != ''
+            """
+
+            # 添加日期过滤条件
+            if date_filter:
+                sql += f" AND global_cancel_time > '{date_filter}'"
+                print(f"🔍 使用日期过滤条件: > {date_filter}")
+
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+
+            cursor.close()
 
         print(f"✅ 读取到 {len(rows)} 条取消订单记录 (order_status=7)")
         return rows
@@ -413,7 +417,7 @@ def batch_insert_cancel_orders(token, records, batch_size=50):
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = requests.post(url, headers=headers, json=payload, timeout=30)
+                response = session.post(url, headers=headers, json=payload, timeout=30)
                 result = response.json()
 
                 if result.get("code") == 0:
@@ -484,7 +488,7 @@ def check_existing_cancel_orders(token, platform_order_nos):
             params["page_token"] = page_token
 
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = session.get(url, headers=headers, params=params, timeout=30)
             result = response.json()
 
             if result.get("code") == 0:
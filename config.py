@@ -15,6 +15,8 @@ def load_config_from_env():
         # 零星平台配置
         'app_id': os.getenv('LINGXING_APP_ID', 'ak_89uM2PNqPSPFJ'),
         'app_secret': os.getenv('LINGXING_APP_SECRET', 'COQo5uhVIR8eAPTN3Vy/ig=='),
+        # access_token 磁盘缓存目录（多个定时脚本共享同一个token）
+        'token_cache_dir': os.getenv('LINGXING_TOKEN_CACHE_DIR', '/tmp'),
 
         # 数据库配置
         'db_config': {
@@ -29,6 +31,138 @@ def load_config_from_env():
             'write_timeout': int(os.getenv('DB_WRITE_TIMEOUT', '45'))
         },
 
+        # 数据写入配置（db_config 会原样传给 pymysql.connect，不能放连接参数以外的键）
+        'db_write_config': {
+            # 订单多行 upsert 单条语句的最大字节数（实际还会受服务端 max_allowed_packet 限制）
+            'max_stmt_length': int(os.getenv('DB_MAX_STMT_LENGTH', str(4 * 1024 * 1024))),
+            # 允许 LOAD DATA LOCAL INFILE（订单批量导入），服务端也需开启 local_infile
+            'local_infile': os.getenv('DB_LOCAL_INFILE', '0') in ('1', 'true', 'True'),
+            # 写订单前按页比对 orders.content_hash 指纹，未变化的订单跳过全部七张表的写入
+            'skip_unchanged_orders': os.getenv('DB_SKIP_UNCHANGED_ORDERS', '1') in ('1', 'true', 'True')
+        },
+
+        # 订单批量导入（只用于归档重放，ARCHIVE_REPLAY_BULK=1）：临时 TSV 文件目录，每块（每个事务）的订单数，未开启 local_infile 时退回多行 upsert 的每批订单数
+        'bulk_load_config': {
+            'tmp_dir': os.getenv('BULK_LOAD_TMP_DIR', ''),
+            'chunk_orders': int(os.getenv('BULK_LOAD_CHUNK_ORDERS', '20000')),
+            'fallback_batch': int(os.getenv('BULK_LOAD_FALLBACK_BATCH', '1000'))
+        },
+
+        # 数据库连接池配置（进程内接口客户端、更新器、飞书脚本共用一组连接）
+        'db_pool_config': {
+            'max_size': int(os.getenv('DB_POOL_SIZE', '10')),
+            'acquire_timeout': float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', '60')),  # 连接全部借出时的等待秒数
+            'max_age': int(os.getenv('DB_POOL_MAX_AGE', '3600')),  # 连接最长存活秒数，超过后关闭重建
+            'ping_interval': int(os.getenv('DB_POOL_PING_INTERVAL', '30'))  # 空闲超过该秒数借出前先 ping
+        },
+
+        # HTTP连接池配置（零星、飞书接口共用）
+        'http_config': {
+            'pool_connections': int(os.getenv('HTTP_POOL_CONNECTIONS', '10')),
+            'pool_maxsize': int(os.getenv('HTTP_POOL_MAXSIZE', '20')),
+            'connect_timeout': float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+            'read_timeout': float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+        },
+
+        # 参考数据（仓库、店铺）本地响应缓存：TTL 内不重复拉取，数据未变化时不重复写库
+        'cache_config': {
+            'dir': os.getenv('RESPONSE_CACHE_DIR', '/tmp/lingxing_cache'),
+            'ttl': int(os.getenv('RESPONSE_CACHE_TTL', '21600')),  # 缓存有效秒数
+            'force_refresh': os.getenv('REFERENCE_FORCE_REFRESH', '0') in ('1', 'true', 'True')  # 忽略缓存强制刷新
+        },
+
+        # 原始分页响应归档（gzip NDJSON，按接口/日期分区），用于不调用接口重建数据表；默认关闭，开启前确认磁盘空间
+        'archive_config': {
+            'enabled': os.getenv('ARCHIVE_ENABLED', '0') in ('1', 'true', 'True'),
+            'dir': os.getenv('ARCHIVE_DIR', '/tmp/lingxing_archive'),
+            'retention_days': int(os.getenv('ARCHIVE_RETENTION_DAYS', '14')),  # 按日期分区保留的天数，0 为不清理
+            'replay_workers': int(os.getenv('ARCHIVE_REPLAY_WORKERS', '4')),  # 重放进程数
+            # 订单重放走批量导入（LOAD DATA，需服务端开启 local_infile），默认按页多行 upsert
+            'replay_bulk': os.getenv('ARCHIVE_REPLAY_BULK', '0') in ('1', 'true', 'True')
+        },
+
+        # 接口重试配置：按错误类别决定是否重试，指数退避 + 抖动，单次调用总时限，按接口熔断
+        'retry_config': {
+            'max_attempts': int(os.getenv('RETRY_MAX_ATTEMPTS', '4')),
+            'base_delay': float(os.getenv('RETRY_BASE_DELAY', '1')),
+            'max_delay': float(os.getenv('RETRY_MAX_DELAY', '30')),
+            'rate_limit_delay': float(os.getenv('RETRY_RATE_LIMIT_DELAY', '5')),  # 限流错误退避基数
+            'deadline': float(os.getenv('RETRY_DEADLINE', '120')),  # 单次调用含重试的总时限（秒）
+            'retry_business': os.getenv('RETRY_BUSINESS_ERRORS', '0') in ('1', 'true', 'True'),
+            'breaker_threshold': int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', '5')),  # 连续失败次数
+            'breaker_reset': float(os.getenv('CIRCUIT_BREAKER_RESET', '60'))  # 熔断持续秒数
+        },
+
+        # 日志配置：完整请求/响应内容只在 DEBUG 级别输出；高频事件先输出前 sample_first 条，之后每 sample_every 条输出一次
+        'log_config': {
+            'level': os.getenv('LOG_LEVEL', 'INFO').upper(),
+            'sample_first': int(os.getenv('LOG_SAMPLE_FIRST', '5')),
+            'sample_every': int(os.getenv('LOG_SAMPLE_EVERY', '100'))
+        },
+
+        # 零星接口限流配置（令牌桶：rate 每秒请求数，burst 突发容量），多个脚本通过状态目录共享
+        'rate_limit_config': {
+            'state_dir': os.getenv('RATE_LIMIT_STATE_DIR', '/tmp'),
+            'default': {
+                'rate': float(os.getenv('RATE_LIMIT_DEFAULT_RATE', '1')),
+                'burst': int(os.getenv('RATE_LIMIT_DEFAULT_BURST', '2'))
+            },
+            'endpoints': {
+                '/pb/mp/order/v2/list': {'rate': 2, 'burst': 4},
+                '/pb/mp/shop/v2/getSellerList': {'rate': 1, 'burst': 2},
+                '/erp/sc/data/local_inventory/warehouse': {'rate': 1, 'burst': 2},
+                '/erp/sc/routing/data/local_inventory/inventoryDetails': {'rate': 2, 'burst': 4},
+                '/basicOpen/platformStatisticsV2/saleStat/pageList': {'rate': 1, 'burst': 2}
+            },
+            'min_rate': 0.1,  # 触发限流后速率下限
+            'decrease_factor': 0.5,  # 触发限流时速率减半
+            'recovery_ratio': 0.05  # 每次成功请求恢复配置速率的5%
+        },
+
+        # 数据同步配置
+        'sync_config': {
+            'order_concurrency': int(os.getenv('ORDER_FETCH_CONCURRENCY', '1')),  # 订单分页并发拉取数，1为串行
+            'order_writers': int(os.getenv('ORDER_WRITER_THREADS', '0')),  # 订单写库线程数，0为拉取后同步写入
+            'order_queue_size': int(os.getenv('ORDER_QUEUE_SIZE', '8')),  # 待写入页队列容量（背压）
+            'order_watermark_overlap': int(os.getenv('ORDER_WATERMARK_OVERLAP', '600')),  # 增量水位回看秒数
+            # 按水位增量拉取时单次运行最多追赶的秒数（停机较久后分多次运行追平），0为不限
+            'order_max_window': int(os.getenv('ORDER_WATERMARK_MAX_WINDOW', '86400')),
+            # 单个时间窗口的最大订单量，超过时二分拆分查询时间范围，0为不拆分
+            'order_shard_threshold': int(os.getenv('ORDER_SHARD_THRESHOLD', '10000')),
+            # 订单页流式解码（需安装 ijson），在途页只保留原始响应，写库时逐条解码
+            'order_stream_decode': os.getenv('ORDER_STREAM_DECODE', '0') in ('1', 'true', 'True'),
+            'inventory_workers': int(os.getenv('INVENTORY_WORKERS', '4')),  # 库存按仓库并行拉取数
+            'inventory_group_size': int(os.getenv('INVENTORY_WAREHOUSE_GROUP', '1')),  # 每组仓库数
+            'inventory_page_size': int(os.getenv('INVENTORY_PAGE_SIZE', '400')),  # 库存每页条数
+            # 订单、店铺同步的平台代码（逗号分隔），按平台分片并行拉取
+            'platform_codes': [int(code) for code in os.getenv('LINGXING_PLATFORM_CODES', '10024').split(',')
+                               if code.strip()],
+            'platform_workers': int(os.getenv('PLATFORM_WORKERS', '4'))
+        },
+
+        # 零星本地模拟服务（离线压测用，见 mock_lingxing_server.py）
+        'mock_server_config': {
+            'host': os.getenv('MOCK_HOST', '127.0.0.1'),
+            'port': int(os.getenv('MOCK_PORT', '18080')),
+            'seed': int(os.getenv('MOCK_SEED', '0')),
+            'counts': {
+                'orders': int(os.getenv('MOCK_ORDER_COUNT', '2000')),
+                'stores': int(os.getenv('MOCK_STORE_COUNT', '20')),
+                'warehouses': int(os.getenv('MOCK_WAREHOUSE_COUNT', '10')),
+                'inventory': int(os.getenv('MOCK_INVENTORY_COUNT', '1000')),
+                'sales': int(os.getenv('MOCK_SALES_COUNT', '500'))
+            },
+            # 响应延迟（毫秒），对数正态分布
+            'latency': {'dist': 'lognormal', 'mean': float(os.getenv('MOCK_LATENCY_MS', '200')),
+                        'sigma': float(os.getenv('MOCK_LATENCY_SIGMA', '0.5'))},
+            'rate_limit_prob': float(os.getenv('MOCK_RATE_LIMIT_PROB', '0')),  # 随机限流错误概率
+            'max_qps': int(os.getenv('MOCK_MAX_QPS', '0')),  # 每接口每秒请求上限，0为不限
+            'error_prob': float(os.getenv('MOCK_ERROR_PROB', '0')),  # HTTP 500 概率
+            'total_drift': int(os.getenv('MOCK_TOTAL_DRIFT', '0')),  # total 随机偏移幅度
+            'archive_dir': os.getenv('MOCK_ARCHIVE_DIR', ''),  # 录制/回放使用的归档目录
+            'upstream': os.getenv('MOCK_UPSTREAM', '')  # 设置后进入录制模式，转发到真实接口
+        },
+
         # 飞书配置
         'cancel_orders_config': {
             'APP_ID': os.getenv('FEISHU_APP_ID', 'cli_a9bc132c7af81bc7'),
@@ -8,7 +8,9 @@ import sys
 import logging
 import time
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from dataoperator import DataOperator
+from db_pool import get_shared_pool
 from config import load_config_from_env
 from api_use import LingXingAPI
 import  traceback
@@ -19,7 +21,7 @@ from utils import extract_store_name, extract_from_json
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # 配置日志系统
 logging.basicConfig(
-    level=logging.INFO,
+    level=load_config_from_env()['log_config']['level'],  # LOG_LEVEL=DEBUG 时输出完整请求/响应内容
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler('/var/log/daily_order_update.log'),
@@ -29,31 +31,47 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 class DailyOrderUpdater:
     """每日订单状态更新器"""
-    def __init__(self, app_id, app_secret, db_config):
+    def __init__(self, app_id, app_secret, db_config, token_cache_dir=None, db_pool_size=None):
         """
         初始化更新器
         Args:
             app_id: 零星平台APP_ID
             app_secret: 零星平台APP_SECRET
             db_config: 数据库连接配置
+            token_cache_dir: access_token 磁盘缓存目录
+            db_pool_size: 进程内共享数据库连接池的大小（接口客户端写库、更新器自身查询共用），默认取 db_pool_config
         """
-        self.api_client = LingXingAPI(app_id, app_secret)
+        self.api_client = LingXingAPI(app_id, app_secret, token_cache_dir=token_cache_dir)
         self.db_config = db_config
         self.data_operator = None
+        self.db_pool = get_shared_pool(db_config, max_size=db_pool_size)
+    def check_database(self):
+        """检查数据库是否可用（借出一个连接后立即归还，不在整个任务期间占用）"""
+        try:
+            with self.db_pool.connection() as conn:
+                conn.ping(reconnect=True)
+            logger.info("数据库连接检查通过")
+            return True
+        except Exception as e:
+            logger.error(f"数据库连接失败: {e}")
+            return False
     def connect_database(self):
-        """连接数据库"""
+        """为更新器自身的查询（一致性检查、宽表重建等）从连接池借用连接，首次使用时才借出"""
         try:
-            self.data_operator = DataOperator(self.db_config)
-            self.data_operator.connect_db()
-            logger.info("数据库连接成功")
+            if self.data_operator is None:
+                self.data_operator = DataOperator(self.db_config, pool=self.db_pool)
+            if not self.data_operator.conn:
+                self.data_operator.connect_db()
+                logger.info("数据库连接成功")
             return True
         except Exception as e:
             logger.error(f"数据库连接失败: {e}")
             return False
     def disconnect_database(self):
-        """断开数据库连接"""
+        """归还更新器的连接并关闭连接池中的空闲连接"""
         if self.data_operator:
             self.data_operator.disconnect_db()
+        self.db_pool.close_all()
         logger.info("数据库连接已关闭")
     def get_yesterday_time_range(self):
         """
@@ -83,44 +101,182 @@ class DailyOrderUpdater:
         end_timestamp = int(end_time.timestamp())
         logger.info(f"查询最近{days}天时间范围: {start_time} 到 {end_time}")
         return start_timestamp, end_timestamp
-    def fetch_updated_orders(self, days_to_check=1):
+    def get_order_watermark(self, platform, data_operator=None):
+        """
+        读取订单增量同步水位
+        Args:
+            platform: 平台代码
+            data_operator: 使用的数据库连接，为空时使用更新器自身的连接
+        Returns:
+            int: 上次成功同步的截止时间戳，无记录或读取失败时返回None
+        """
+        try:
+            if data_operator is None:
+                self.connect_database()
+                data_operator = self.data_operator
+            data_operator.ensure_sync_state_table()
+            return data_operator.get_sync_watermark("orders", platform)
+        except Exception as e:
+            logger.warning(f"读取平台 {platform} 订单同步水位失败，按最近天数拉取: {e}")
+            return None
+    def fetch_updated_orders(self, days_to_check=1, concurrency=1, writers=0, queue_size=None,
+                             use_watermark=True, overlap_seconds=600, platform_codes=None, platform_workers=4,
+                             stream_decode=False, max_window_seconds=86400, shard_threshold=10000):
         """
         获取需要更新的订单数据
+        按平台分片并行拉取，每个平台独立维护同步水位和统计，一个平台变慢不会拖住其他平台；
+        有同步水位时从 水位 - overlap_seconds 拉取到当前时间（只拉真实增量），单次最多拉取 max_window_seconds 秒，
+        停机较久时分多次运行追平；没有水位时按最近 days_to_check 天拉取；
+        查询范围按数据量拆分为时间窗口逐个拉取，全部页提交成功后才把水位推进到本次查询的截止时间
         Args:
-            days_to_check: 检查最近多少天的订单
+            days_to_check: 无同步水位时检查最近多少天的订单
+            concurrency: 并发拉取的页数，1为串行
+            writers: 写库线程数，大于0时拉取与写库流水线并行
+            queue_size: 流水线模式下待写入页队列容量
+            use_watermark: 是否使用 sync_state 增量水位
+            overlap_seconds: 水位回看秒数，覆盖接口数据延迟与边界时刻
+            platform_codes: 要同步的平台代码列表，默认 [10024]
+            platform_workers: 并行同步的平台数
+            stream_decode: 是否流式解码订单页（逐条解码入库，降低内存峰值）
+            max_window_seconds: 按水位增量拉取时单次运行最多追赶的秒数，0为不限
+            shard_threshold: 单个时间窗口的最大订单量，超过时二分拆分时间范围，0为不拆分
         Returns:
-            list: 订单数据列表
+            bool: 所有平台的订单同步是否都完整成功
+        """
+        platform_codes = platform_codes or [10024]
+        # 并行拉取期间不占用更新器自身的连接，全部留给各平台的写库线程
+        if self.data_operator and self.data_operator.conn:
+            self.data_operator.disconnect_db()
+        platform_workers, writers = self._fit_order_workers(platform_workers, writers, len(platform_codes))
+        def sync_platform(platform_code):
+            return self._sync_platform_orders(platform_code, days_to_check, concurrency, writers, queue_size,
+                                              use_watermark, overlap_seconds, stream_decode,
+                                              max_window_seconds, shard_threshold)
+        logger.info(f"开始获取订单更新数据，平台: {platform_codes}")
+        if platform_workers > 1 and len(platform_codes) > 1:
+            with ThreadPoolExecutor(max_workers=platform_workers) as executor:
+                results = list(executor.map(sync_platform, platform_codes))
+        else:
+            results = [sync_platform(platform_code) for platform_code in platform_codes]
+        for metrics in results:
+            status_icon = "✅" if metrics["completed"] else "❌"
+            logger.info(f"  {status_icon} 平台 {metrics['platform']}: 处理 {metrics['processed']}/{metrics['expected']} 条，"
+                        f"耗时 {metrics['elapsed']:.1f}s")
+        return all(metrics["completed"] for metrics in results)
+    def _fit_order_workers(self, platform_workers, writers, platform_count):
+        """
+        按连接池大小限制订单同步的并行度：每个平台同时占用 max(1, writers) 个写库连接，
+        所有并行平台合计不能超过连接池大小，否则各线程持有部分连接互相等待，最终借连接超时
+        Returns:
+            tuple: (并行平台数, 每个平台的写库线程数)
+        """
+        pool_size = self.db_pool.max_size
+        if writers > pool_size:
+            logger.warning(f"订单写库线程数 {writers} 超过连接池大小 {pool_size}，降为 {pool_size}")
+            writers = pool_size
+        requested = max(1, min(platform_workers, platform_count))
+        parallel = max(1, min(requested, pool_size // max(1, writers)))
+        if parallel < requested:
+            logger.warning(f"连接池大小 {pool_size} 不足以支撑 {requested} 个平台各 {max(1, writers)} 个写库连接，"
+                           f"并行平台数降为 {parallel}")
+        return parallel, writers
+    def _sync_platform_orders(self, platform_code, days_to_check, concurrency, writers, queue_size,
+                              use_watermark, overlap_seconds, stream_decode=False, max_window_seconds=86400,
+                              shard_threshold=10000):
         """
+        同步单个平台的订单并推进该平台的水位
+        Returns:
+            dict: platform/processed/expected/completed/elapsed
+        """
+        platform_key = str(platform_code)
+        metrics = {"platform": platform_key, "processed": 0, "expected": 0, "completed": False, "elapsed": 0.0}
+        task_start = time.time()
+        # 多个平台并行时水位读写不能共用更新器的连接，从连接池借用独立连接；
+        # 只在读写水位时占用，拉取期间归还，留给写库线程使用
+        data_operator = DataOperator(self.db_config, pool=self.db_pool)
         try:
-            # 获取时间范围
-            start_time, end_time = self.get_recent_days_time_range(days_to_check)
+            data_operator.connect_db()
+            watermark = self.get_order_watermark(platform_key, data_operator) if use_watermark else None
+            data_operator.disconnect_db()
+            if watermark:
+                end_time = int(time.time())
+                start_time = watermark - overlap_seconds
+                if max_window_seconds and end_time - start_time > max_window_seconds:
+                    # 停机较久后不一次拉完积压：本次只追赶一段，水位推进后下次运行继续
+                    end_time = start_time + max_window_seconds
+                    logger.warning(f"平台 {platform_key} 同步水位落后超过 {max_window_seconds} 秒，"
+                                   f"本次只拉取到 {datetime.fromtimestamp(end_time)}，剩余部分由后续运行追平")
+                logger.info(f"平台 {platform_key} 按同步水位增量拉取订单: 水位 {datetime.fromtimestamp(watermark)}，"
+                            f"回看 {overlap_seconds} 秒，截止 {datetime.fromtimestamp(end_time)}")
+            else:
+                # 获取时间范围
+                start_time, end_time = self.get_recent_days_time_range(days_to_check)
             # 构建API请求参数
             api_path = "/pb/mp/order/v2/list"
             base_biz_body = {
                 "start_time": start_time,
                 "end_time": end_time,
                 "date_type": "update_time",  # 按更新时间查询
-                "platform_code": [10024],  # 指定平台
+                "platform_code": [platform_code],
             }
-            logger.info("开始获取订单更新数据...")
-            total_processed = self.api_client.fetch_and_process_order_data_batch(
-                api_path, base_biz_body, self.db_config, delay=1
-            )
-            logger.info(f"订单数据获取完成，共处理 {total_processed} 条记录")
-            return total_processed > 0
+            # 按数据量拆分时间窗口，避免深 offset 翻页
+            if shard_threshold:
+                windows = self.api_client.split_order_time_windows(api_path, base_biz_body, start_time, end_time,
+                                                                   max_total=shard_threshold)
+            else:
+                windows = [(start_time, end_time, None)]
+            if len(windows) > 1:
+                logger.info(f"平台 {platform_key} 查询范围拆分为 {len(windows)} 个时间窗口")
+            failed_pages = []
+            for window_start, window_end, _ in windows:
+                window_body = dict(base_biz_body, start_time=window_start, end_time=window_end)
+                stats = self.api_client.fetch_order_pages(
+                    api_path, window_body, self.db_config, delay=1, concurrency=concurrency,
+                    writers=writers, queue_size=queue_size, stream=stream_decode
+                )
+                metrics["processed"] += stats["processed"]
+                metrics["expected"] += stats["expected"]
+                if not stats["completed"]:
+                    failed_pages.append((window_start, window_end, sorted(stats["failed_pages"])))
+            metrics["completed"] = not failed_pages
+            logger.info(f"平台 {platform_key} 订单数据获取完成，共处理 {metrics['processed']} 条记录"
+                        f"（预期 {metrics['expected']} 条）")
+            if failed_pages:
+                logger.warning(f"平台 {platform_key} 订单同步未完整完成（失败窗口与页: {failed_pages}），同步水位保持不变")
+                return metrics
+            if use_watermark:
+                data_operator.connect_db()
+                data_operator.save_sync_watermark("orders", platform_key, end_time, metrics["processed"])
+                logger.info(f"平台 {platform_key} 订单同步水位推进到 {datetime.fromtimestamp(end_time)}")
+            return metrics
         except Exception as e:
-            logger.error(f"获取订单数据失败: {e}")
-            return False
-    def update_store_info(self):
+            logger.error(f"平台 {platform_key} 获取订单数据失败: {e}")
+            metrics["completed"] = False
+            return metrics
+        finally:
+            metrics["elapsed"] = time.time() - task_start
+            data_operator.disconnect_db()
+    def update_store_info(self, platform_codes=None, platform_workers=4, force_refresh=False):
         """
-        更新店铺信息表
+        更新店铺信息表（按平台分片并行拉取，数据未变化的平台跳过写库）
+        Args:
+            platform_codes: 要同步的平台代码列表，默认 [10024]
+            platform_workers: 并行同步的平台数
+            force_refresh: 忽略本地响应缓存，强制拉取并写库
         Returns:
             bool: 更新是否成功
         """
         try:
             logger.info("开始更新店铺信息...")
             # 调用店铺信息API
-            success = self.api_client.getstoreList(self.db_config)
+            summary = self.api_client.get_stores_by_platforms(self.db_config, platform_codes or [10024],
+                                                              workers=platform_workers, force_refresh=force_refresh)
+            for platform, metrics in summary.items():
+                status_icon = "✅" if metrics["completed"] else "❌"
+                skipped_note = "（数据未变化，跳过写库）" if metrics.get("skipped") else ""
+                logger.info(f"  {status_icon} 平台 {platform}: 处理 {metrics['processed']}/{metrics['expected']} 条，"
+                            f"耗时 {metrics['elapsed']:.1f}s{skipped_note}")
+            success = all(metrics["completed"] for metrics in summary.values())
             if success:
                 logger.info("✅ 店铺信息更新成功")
             else:
@@ -129,24 +285,32 @@ class DailyOrderUpdater:
         except Exception as e:
             logger.error(f"更新店铺信息失败: {e}")
             return False
-    def update_warehouse_info(self):
+    def update_warehouse_info(self, force_refresh=False):
         """
-        更新仓库信息表
+        更新仓库信息表（数据未变化时跳过写库）
+        Args:
+            force_refresh: 忽略本地响应缓存，强制拉取并写库
         Returns:
             bool: 更新是否成功
         """
         try:
             logger.info("开始更新仓库信息...")
             # 调用仓库信息API
-            self.api_client.getwarehouseList(self.db_config, type=3)
+            if not self.api_client.getwarehouseList(self.db_config, type=3, force_refresh=force_refresh):
+                logger.error("❌ 仓库信息更新失败")
+                return False
             logger.info("✅ 仓库信息更新完成")
             return True
         except Exception as e:
             logger.error(f"更新仓库信息失败: {e}")
             return False
-    def update_inventory_info(self):
+    def update_inventory_info(self, workers=4, group_size=1, page_size=400):
         """
-        更新库存信息表
+        更新库存信息表（按仓库分组并行拉取，各仓库独立提交）
+        Args:
+            workers: 并行拉取的仓库分组数
+            group_size: 每组仓库数
+            page_size: 库存每页条数
         Returns:
             bool: 更新是否成功
         """
@@ -157,15 +321,16 @@ class DailyOrderUpdater:
             if not warehouse_ids:
                 logger.warning("未获取到仓库ID，跳过库存更新")
                 return False
-            # 将仓库ID列表转换为逗号分隔的字符串
-            wid_str = ",".join([str(wid) for wid in warehouse_ids])
             logger.info(f"获取到 {len(warehouse_ids)} 个仓库，开始更新库存...")
-            # 调用库存信息API
-            success = self.api_client.getinvetoryList(self.db_config, str=wid_str)
+            # 按仓库分组并行调用库存信息API
+            summary = self.api_client.get_inventory_by_warehouses(
+                self.db_config, warehouse_ids, group_size=group_size, workers=workers, page_size=page_size
+            )
+            success = not summary["failed"]
             if success:
-                logger.info("✅ 库存信息更新成功")
+                logger.info(f"✅ 库存信息更新成功，共 {summary['processed']} 条")
             else:
-                logger.error("❌ 库存信息更新失败")
+                logger.error(f"❌ 部分仓库库存更新失败: {summary['failed']}（其余 {summary['processed']} 条已提交）")
             return success
         except Exception as e:
             logger.error(f"更新库存信息失败: {e}")
@@ -176,7 +341,7 @@ class DailyOrderUpdater:
         确保orders表和platform_info表的order_status字段一致
         """
         try:
-            if not self.data_operator or not self.data_operator.conn:
+            if not self.connect_database():
                 logger.warning("数据库未连接，跳过一致性验证")
                 return True
             # 检查两个表的订单状态是否一致
@@ -206,7 +371,7 @@ class DailyOrderUpdater:
             days_to_keep: 保留多少天的数据
         """
         try:
-            if not self.data_operator or not self.data_operator.conn:
+            if not self.connect_database():
                 return False
             # 清理90天前的订单数据（根据业务需求调整）
             cleanup_sql = """
@@ -236,27 +401,35 @@ class DailyOrderUpdater:
         """
         try:
             overall_success = True
-            # 更新销量统计数据（按不同维度分别更新）
+            # 更新销量统计数据（按不同维度并发更新，请求节奏由共享限流器统一控制，数据库连接来自连接池）
             update_tasks = [
                 {"name": "SKU维度销量", "data_type": "4"},
                 {"name": "店铺维度销量", "data_type": "6"},
                 {"name": "ASIN维度销量", "data_type": "1"}
             ]
-            for task in update_tasks:
+            def run_task(task):
                 logger.info(f"开始更新 {task['name']} 数据...")
+                task_start = time.time()
                 task_success = self.update_sales_statistics(
                     days_back=days_back,
                     result_type="1",  # 销量
                     date_unit="4",  # 按日统计
-                    data_type=task['data_type']
+                    data_type=task['data_type'],
+                    log_summary=False
                 )
+                return task, task_success, time.time() - task_start
+            with ThreadPoolExecutor(max_workers=len(update_tasks)) as executor:
+                results = list(executor.map(run_task, update_tasks))
+            for task, task_success, elapsed in results:
                 if not task_success:
-                    logger.warning(f"{task['name']} 更新失败，但继续执行其他任务")
+                    logger.warning(f"{task['name']} 更新失败（耗时 {elapsed:.1f}s），但继续执行其他任务")
                     overall_success = False
                 else:
-                    logger.info(f"✅ {task['name']} 更新完成")
-                # 任务间短暂延迟，避免API限流
-                time.sleep(2)
+                    logger.info(f"✅ {task['name']} 更新完成，耗时 {elapsed:.1f}s")
+            if any(task_success for _, task_success, _ in results):
+                end_date = datetime.now().date()
+                self._log_sales_update_summary((end_date - timedelta(days=days_back)).strftime("%Y-%m-%d"),
+                                               end_date.strftime("%Y-%m-%d"))
             # 可选：清理旧数据
             if enable_cleanup:
                 cleanup_success = self.cleanup_old_sales_data(days_to_keep=90)
@@ -295,21 +468,22 @@ class DailyOrderUpdater:
         else:
             logger.info("⚠️  部分任务执行失败，但非关键任务不影响整体流程")
         logger.info("=" * 60)
-    def update_sales_statistics(self, days_back=30, result_type="1", date_unit="4", data_type="4", sids=None):
+    def update_sales_statistics(self, days_back=30, result_type="1", date_unit="4", data_type="4", sids=None,
+                                log_summary=True):
         """
         更新销量统计数据
         Args:
-            days_back: 获取最近多少天的数据（默认30天）
+            days_back: 获取最近多少天的数据（默认30天，超过90天时自动分段拉取）
             result_type: 汇总类型 1销量 2订单量 3销售额
             date_unit: 统计时间指标 1年 2月 3周 4日
             data_type: 统计数据维度 1ASIN 2父体 3MSKU 4SKU 5SPU 6店铺
             sids: 店铺ID列表，多个使用英文逗号分隔
+            log_summary: 是否在完成后记录销量汇总（并发更新多个维度时由调用方统一记录）
         Returns:
             bool: 更新是否成功
         """
         try:
-            # 计算日期范围（确保不超过90天限制）
-            days_back = min(days_back, 90)  # API限制最大90天
+            # 计算日期范围（超过接口90天限制时由客户端自动分段拉取并合并）
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=days_back)
             start_date_str = start_date.strftime("%Y-%m-%d")
@@ -326,12 +500,14 @@ class DailyOrderUpdater:
                 result_type=result_type,
                 date_unit=date_unit,
                 data_type=data_type,
-                sids=sids
+                sids=sids,
+                pool=self.db_pool
             )
             if success:
                 print("销量统计数据更新成功")
                 # 记录更新统计信息
-                self._log_sales_update_summary(start_date_str, end_date_str)
+                if log_summary:
+                    self._log_sales_update_summary(start_date_str, end_date_str)
             else:
                 print("销量统计数据更新失败")
             return success
@@ -859,7 +1035,11 @@ class DailyOrderUpdater:
     def run_daily_update(self, days_to_check=1, enable_cleanup=False,
                          update_orders=True, update_inventory=True, update_warehouse=True,
                          update_store=True, update_sales=True, sales_days_back=7,
-                         rebuild_merge_table=True, rebuild_sales_summary=True):
+                         rebuild_merge_table=True, rebuild_sales_summary=True, order_concurrency=1,
+                         order_writers=0, order_queue_size=None, order_overlap_seconds=600,
+                         inventory_workers=4, inventory_group_size=1, inventory_page_size=400,
+                         platform_codes=None, platform_workers=4, order_stream_decode=False,
+                         refresh_reference_data=False, order_max_window=86400, order_shard_threshold=10000):
         """
         执行每日更新任务（整合销量数据更新）
         Args:
@@ -873,6 +1053,19 @@ class DailyOrderUpdater:
             sales_days_back: 销量数据回溯天数
             rebuild_merge_table: 是否重建订单合并宽表
             rebuild_sales_summary: 是否重建销量汇总表
+            order_concurrency: 订单分页并发拉取数，1为串行
+            order_writers: 订单写库线程数，0为拉取后同步写入
+            order_queue_size: 订单流水线待写入页队列容量
+            order_overlap_seconds: 订单增量水位回看秒数
+            inventory_workers: 库存按仓库并行拉取数
+            inventory_group_size: 库存拉取每组仓库数
+            inventory_page_size: 库存每页条数
+            platform_codes: 订单、店铺同步的平台代码列表，默认 [10024]
+            platform_workers: 订单、店铺按平台并行同步数
+            order_stream_decode: 订单页是否流式解码
+            refresh_reference_data: 仓库、店铺信息是否忽略本地缓存强制刷新
+            order_max_window: 订单按水位增量拉取时单次运行最多追赶的秒数，0为不限
+            order_shard_threshold: 订单单个时间窗口的最大订单量，超过时拆分时间范围，0为不拆分
         Returns:
             bool: 任务执行是否成功
         """
@@ -889,17 +1082,27 @@ class DailyOrderUpdater:
         logger.info(f"  重建合并宽表: {rebuild_merge_table}")
         logger.info(f"  重建销量汇总: {rebuild_sales_summary}")
         logger.info(f"  数据清理: {enable_cleanup}")
+        logger.info(f"  订单并发拉取数: {order_concurrency}")
+        logger.info(f"  订单写库线程数: {order_writers}")
+        logger.info(f"  同步平台: {platform_codes or [10024]}")
         start_time = time.time()
         overall_success = True
         task_results = {}
         try:
-            # 1. 连接数据库
-            if not self.connect_database():
+            # 1. 检查数据库（更新器自身的连接在需要时才从连接池借用）
+            if not self.check_database():
                 return False
             # 2. 获取并更新订单数据（新增参数控制）
             if update_orders:
                 logger.info("开始更新订单数据...")
-                order_success = self.fetch_updated_orders(days_to_check)
+                order_success = self.fetch_updated_orders(days_to_check, concurrency=order_concurrency,
+                                                          writers=order_writers, queue_size=order_queue_size,
+                                                          overlap_seconds=order_overlap_seconds,
+                                                          platform_codes=platform_codes,
+                                                          platform_workers=platform_workers,
+                                                          stream_decode=order_stream_decode,
+                                                          max_window_seconds=order_max_window,
+                                                          shard_threshold=order_shard_threshold)
                 task_results["订单数据"] = order_success
                 if not order_success:
                     logger.error("订单数据更新失败")
@@ -912,7 +1115,7 @@ class DailyOrderUpdater:
             # 3. 更新仓库信息
             if update_warehouse:
                 logger.info("开始更新仓库信息...")
-                warehouse_success = self.update_warehouse_info()
+                warehouse_success = self.update_warehouse_info(force_refresh=refresh_reference_data)
                 task_results["仓库信息"] = warehouse_success
                 if not warehouse_success:
                     logger.warning("仓库信息更新失败，但继续执行其他任务")
@@ -925,7 +1128,9 @@ class DailyOrderUpdater:
             # 4. 更新店铺信息
             if update_store:
                 logger.info("开始更新店铺信息...")
-                store_success = self.update_store_info()
+                store_success = self.update_store_info(platform_codes=platform_codes,
+                                                       platform_workers=platform_workers,
+                                                       force_refresh=refresh_reference_data)
                 task_results["店铺信息"] = store_success
                 if not store_success:
                     logger.warning("店铺信息更新失败，但继续执行其他任务")
@@ -938,7 +1143,9 @@ class DailyOrderUpdater:
             # 5. 更新库存信息（需要先有仓库信息）
             if update_inventory:
                 logger.info("开始更新库存信息...")
-                inventory_success = self.update_inventory_info()
+                inventory_success = self.update_inventory_info(workers=inventory_workers,
+                                                               group_size=inventory_group_size,
+                                                               page_size=inventory_page_size)
                 task_results["库存信息"] = inventory_success
                 if not inventory_success:
                     logger.warning("库存信息更新失败，但继续执行其他任务")
@@ -1031,7 +1238,9 @@ def main():
         updater = DailyOrderUpdater(
             app_id=config['app_id'],
             app_secret=config['app_secret'],
-            db_config=config['db_config']
+            db_config=config['db_config'],
+            token_cache_dir=config['token_cache_dir'],
+            db_pool_size=config['db_pool_config']['max_size']
         )
         # 执行整合后的每日更新任务
         success = updater.run_daily_update(
@@ -1044,7 +1253,20 @@ def main():
             update_sales=True,  # 更新销量数据
             sales_days_back=30,  # 销量数据回溯30天
             rebuild_merge_table=True,  # 重建订单合并宽表
-            rebuild_sales_summary=True  # 新增：重建销量汇总表
+            rebuild_sales_summary=True,  # 新增：重建销量汇总表
+            order_concurrency=config['sync_config']['order_concurrency'],  # 订单分页并发拉取数
+            order_writers=config['sync_config']['order_writers'],  # 订单写库线程数
+            order_queue_size=config['sync_config']['order_queue_size'],  # 订单待写入页队列容量
+            order_overlap_seconds=config['sync_config']['order_watermark_overlap'],  # 订单增量水位回看秒数
+            order_max_window=config['sync_config']['order_max_window'],  # 订单增量单次最多追赶秒数
+            order_shard_threshold=config['sync_config']['order_shard_threshold'],  # 订单时间窗口拆分阈值
+            inventory_workers=config['sync_config']['inventory_workers'],  # 库存按仓库并行拉取数
+            inventory_group_size=config['sync_config']['inventory_group_size'],  # 库存拉取每组仓库数
+            inventory_page_size=config['sync_config']['inventory_page_size'],  # 库存每页条数
+            platform_codes=config['sync_config']['platform_codes'],  # 订单、店铺同步平台
+            platform_workers=config['sync_config']['platform_workers'],  # 按平台并行同步数
+            order_stream_decode=config['sync_config']['order_stream_decode'],  # 订单页流式解码
+            refresh_reference_data=config['cache_config']['force_refresh']  # 仓库、店铺忽略缓存强制刷新
         )
         if success:
             logger.info("✅ 每日数据更新任务执行成功")
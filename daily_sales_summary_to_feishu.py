@@ -1,9 +1,10 @@
 import pymysql
-import requests
 import time
 import re
 from datetime import datetime, date
 from config import  load_config_from_env
+from db_pool import get_shared_pool
+from http_session import get_session
 from utils import extract_store_name
 import traceback
 
@@ -17,6 +18,9 @@ CANCEL_ORDERS_TABLE_ID = config['sales_summary_config']['CANCEL_ORDERS_TABLE_ID'
 
 MYSQL_CONFIG = config['db_config']
 
+# 飞书接口共享连接池会话（keep-alive，统一超时配置）
+session = get_session('feishu')
+
 MYSQL_TABLE = "sales_summary_daily"
 
 # 修正后的销量汇总表字段定义 - 全部使用文本类型
@@ -64,7 +68,7 @@ CANCEL_ORDERS_FIELDS = [
 def get_tenant_access_token():
     """获取访问令牌"""
     url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-    resp = requests.post(url, json={
+    resp = session.post(url, json={
         "app_id": APP_ID,
         "app_secret": APP_SECRET
     }).json()
@@ -81,7 +85,7 @@ def get_existing_fields_with_details(token, table_id):
     headers = {"Authorization": f"Bearer {token}"}
 
     try:
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers)
         result = response.json()
 
         if result.get("code") == 0:
@@ -157,7 +161,7 @@ def update_field_type(token, field_def, table_id, field_id):
 
     try:
         print(f"🔄 正在更新字段类型: {field_def['field_name']} -> 类型 {field_def['type']}")
-        response = requests.put(url, headers=headers, json=payload, timeout=10)
+        response = session.put(url, headers=headers, json=payload, timeout=10)
         result = response.json()
 
         if result.get("code") == 0:
@@ -193,7 +197,7 @@ def create_field(token, field_def, table_id):
 
     try:
         print(f"🔄 正在创建字段: {field_def['field_name']} (类型: {field_def['type']})")
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = session.post(url, headers=headers, json=payload, timeout=10)
         result = response.json()
 
         if result.get("code") == 0:
@@ -220,7 +224,7 @@ def clear_feishu_table(token, table_id):
             url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{APP_Token}/tables/{table_id}/records"
             headers = {"Authorization": f"Bearer {token}"}
             params = {"page_size": 100, "page_token": page_token} if page_token else {"page_size": 100}
-            response = requests.get(url, headers=headers, params=params)
+            response = session.get(url, headers=headers, params=params)
             result = response.json()
             if result.get("code") != 0:
                 print(f"❌ 获取记录失败: {result.get('msg')}")
@@ -264,7 +268,7 @@ def clear_feishu_table(token, table_id):
             payload = {
                 "records": batch_ids
             }
-            response = requests.post(url, headers=headers, json=payload)
+            response = session.post(url, headers=headers, json=payload)
             result = response.json()
             print("22222")
             print(result)
@@ -276,7 +280,7 @@ def clear_feishu_table(token, table_id):
                 # 尝试单条删除
                 for record_id in batch_ids:
                     single_url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{APP_Token}/tables/{table_id}/records/{record_id}"
-                    single_response = requests.delete(single_url, headers={"Authorization": f"Bearer {token}"})
+                    single_response = session.delete(single_url, headers={"Authorization": f"Bearer {token}"})
                     single_result = single_response.json()
                     if single_result.get("code") == 0:
                         deleted_count += 1
@@ -293,30 +297,30 @@ def clear_feishu_table(token, table_id):
 def fetch_cancel_orders_data():
     """从MySQL读取销量数据"""
     try:
-        conn = pymysql.connect(**MYSQL_CONFIG)
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-
-        # 基础查询语句
-        sql = """
-        SELECT 
-            sku,
-            store_name,
-            platform_name,
-            recent_3d_sales,
-            recent_7d_sales,
-            recent_15d_sales,
-            recent_30d_sales,
-            total_sales,
-            last_sale_date
-        FROM sales_summary_daily
-        WHERE sku IS NOT NULL 
-        AND sku != ''
-        """
-
-        cursor.execute(sql)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        # 从进程内共享的连接池借用连接，读取完成后归还
+        with get_shared_pool(MYSQL_CONFIG).connection() as conn:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+
+            # 基础查询语句
+            sql = """
+            SELECT 
+                sku,
+                store_name,
+                platform_name,
+                recent_3d_sales,
+                recent_7d_sales,
+                recent_15d_sales,
+                recent_30d_sales,
+                total_sales,
+                last_sale_date
+            FROM sales_summary_daily
+            WHERE sku IS NOT NULL 
+            AND sku != ''
+            """
+
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+            cursor.close()
         print(f"✅ 读取到 {len(rows)} 条销量汇总记录 ")
         return rows
 
@@ -450,7 +454,7 @@ def batch_insert_cancel_orders(token, records, batch_size=50):
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = requests.post(url, headers=headers, json=payload, timeout=30)
+                response = session.post(url, headers=headers, json=payload, timeout=30)
                 result = response.json()
 
                 if result.get("code") == 0:
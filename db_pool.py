@@ -0,0 +1,172 @@
+"""
+MySQL 连接池
+功能：在多个并发同步任务之间复用一组数据库连接，限制同时打开的连接数，
+连接归还后留在池中供下一个任务使用，避免每个任务都重新建立连接；
+借出前对空闲过久的连接 ping 检查（断开时自动重连），超过最大存活时间的连接关闭重建；
+同一进程内同一数据库共用一个池（get_shared_pool），接口客户端、更新器和飞书脚本都从这里取连接
+"""
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import pymysql
+
+from config import load_config_from_env
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConnectionPool:
+    """线程安全的 pymysql 连接池"""
+
+    def __init__(self, db_config, max_size=5, acquire_timeout=60, max_age=3600, ping_interval=30,
+                 local_infile=False):
+        """
+        初始化连接池
+        Args:
+            db_config: 数据库配置（与 DataOperator 相同）
+            max_size: 最多同时打开的连接数
+            acquire_timeout: 连接全部被占用时的最长等待秒数
+            max_age: 连接最长存活秒数，超过后借出时关闭重建（早于服务端 wait_timeout 回收），0 为不限
+            ping_interval: 连接空闲超过该秒数后，借出前先 ping 检查，0 为每次借出都检查
+            local_infile: 是否允许 LOAD DATA LOCAL INFILE（订单批量导入）
+        """
+        self.db_config = db_config
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_age = max_age
+        self.ping_interval = ping_interval
+        self.local_infile = local_infile
+        # 空闲连接: (连接, 创建时间, 归还时间)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._created_at = {}
+        self._lock = threading.Lock()
+
+    def _create_connection(self):
+        conn = pymysql.connect(
+            host=self.db_config['host'],
+            user=self.db_config['user'],
+            password=self.db_config['password'],
+            database=self.db_config['database'],
+            port=self.db_config.get('port', 3306),
+            charset=self.db_config.get('charset', 'utf8mb4'),
+            connect_timeout=self.db_config.get('connect_timeout', 10),
+            read_timeout=self.db_config.get('read_timeout', 30),
+            write_timeout=self.db_config.get('write_timeout', 30),
+            local_infile=self.local_infile
+        )
+        with self._lock:
+            self._created_at[id(conn)] = time.time()
+        logger.debug("新建数据库连接", pool_size=self.max_size)
+        return conn
+
+    def _close(self, conn):
+        with self._lock:
+            self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        """取一个可用连接：过期的关闭重建，空闲过久的先 ping（断开时重连，重连失败则重建）"""
+        while True:
+            try:
+                conn, created_at, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._create_connection()
+            now = time.time()
+            if self.max_age and now - created_at > self.max_age:
+                logger.debug("连接超过最大存活时间，关闭重建", age=int(now - created_at))
+                self._close(conn)
+                continue
+            if now - released_at >= self.ping_interval:
+                try:
+                    conn.ping(reconnect=True)
+                except Exception as e:
+                    logger.warning("空闲连接检查失败，丢弃后重建", error=e)
+                    self._close(conn)
+                    continue
+            return conn
+
+    def acquire(self):
+        """借出一个连接（优先复用空闲连接），连接数已满时阻塞等待"""
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError(f"等待数据库连接超时（{self.acquire_timeout}秒），连接池大小 {self.max_size}")
+        try:
+            return self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        """归还连接，未提交的事务会被回滚"""
+        try:
+            if not conn.open:
+                raise pymysql.err.InterfaceError("连接已关闭")
+            conn.rollback()
+            with self._lock:
+                created_at = self._created_at.get(id(conn), time.time())
+            self._idle.put((conn, created_at, time.time()))
+        except Exception:
+            # 连接已失效，直接丢弃，下次借出时重新创建
+            self._close(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as conn: 借出连接，退出时归还"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """关闭所有空闲连接"""
+        while True:
+            try:
+                conn, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(conn)
+
+
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_shared_pool(db_config=None, max_size=None) -> ConnectionPool:
+    """
+    获取进程内按数据库共享的连接池（子进程各自创建，不复用父进程的连接）
+    Args:
+        db_config: 数据库配置，默认取 load_config_from_env()['db_config']
+        max_size: 连接池大小，只在首次创建时生效，默认取 db_pool_config
+    Returns:
+        ConnectionPool
+    """
+    config = None
+    if db_config is None:
+        config = load_config_from_env()
+        db_config = config['db_config']
+    key = (os.getpid(), db_config.get('host'), db_config.get('port', 3306), db_config.get('database'),
+           db_config.get('user'))
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            config = config or load_config_from_env()
+            pool_config = config['db_pool_config']
+            pool = _shared_pools[key] = ConnectionPool(
+                db_config,
+                max_size=max_size or pool_config['max_size'],
+                acquire_timeout=pool_config['acquire_timeout'],
+                max_age=pool_config['max_age'],
+                ping_interval=pool_config['ping_interval'],
+                local_infile=config['db_write_config']['local_infile'],
+            )
+        return pool
@@ -0,0 +1,81 @@
+"""
+共享HTTP会话层
+功能：为零星开放平台、飞书等外部接口提供按名称复用的 requests.Session，
+统一配置连接池大小、keep-alive、连接/读取超时以及 gzip 压缩响应，
+避免每次请求都重新建立 TCP+TLS 连接
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import load_config_from_env
+
+
+class PooledSession(requests.Session):
+    """带连接池和默认超时的会话（调用方未显式传入 timeout 时使用默认值）"""
+
+    def __init__(self, pool_connections=10, pool_maxsize=20, connect_timeout=5, read_timeout=30):
+        """
+        初始化会话
+        Args:
+            pool_connections: 缓存的连接池数量（按主机区分）
+            pool_maxsize: 每个主机连接池保留的最大连接数，应不小于并发线程数
+            connect_timeout: 建立连接超时（秒）
+            read_timeout: 读取响应超时（秒）
+        """
+        super().__init__()
+        # 重试由业务层控制，这里不做底层自动重试
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        self.default_timeout = (connect_timeout, read_timeout)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.default_timeout
+        return super().request(method, url, **kwargs)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name="default", http_config=None) -> PooledSession:
+    """
+    获取指定名称的共享会话（同一进程内同名会话只创建一次）
+    Args:
+        name: 会话名称，如 lingxing / feishu，不同服务使用独立的连接池
+        http_config: 连接池与超时配置，为空时从环境变量配置读取
+    Returns:
+        PooledSession: 共享会话
+    """
+    session = _sessions.get(name)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            if http_config is None:
+                http_config = load_config_from_env()['http_config']
+            session = PooledSession(
+                pool_connections=http_config.get('pool_connections', 10),
+                pool_maxsize=http_config.get('pool_maxsize', 20),
+                connect_timeout=http_config.get('connect_timeout', 5),
+                read_timeout=http_config.get('read_timeout', 30),
+            )
+            _sessions[name] = session
+        return session
+
+
+def close_sessions():
+    """关闭所有共享会话（进程退出前调用，释放连接）"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,190 @@
+"""
+响应JSON解码
+功能：安装了 orjson 时用它整页解码（比标准库 json 快数倍）；
+安装了 ijson（C 后端）时支持流式解码大分页响应：拉取时只解码数据列表之外的 code/msg/total 等字段
+（列表只按括号配对跳过，不构造对象），数据列表保留为原始字节，写库时用 ijson 逐条解码一遍，
+多页在途时内存中只有原始响应而不是整页的 dict。流式解码是用 CPU 换内存（500 条订单的一页约慢 1/3），
+只在多页在途导致内存紧张时开启（ORDER_STREAM_DECODE），默认整页解码
+"""
+import io
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+    # 纯 Python 后端逐事件解析比整页解码还慢，只在 C 后端可用时启用流式解码
+    STREAMING_AVAILABLE = ijson.backend in ("yajl2_c", "yajl2_cffi")
+except ImportError:
+    ijson = None
+    STREAMING_AVAILABLE = False
+
+# 响应头部的一个词法单元：字符串 / 结构符号 / 其他标量
+_TOKEN = re.compile(rb'\s*(?:("[^"\\]*(?:\\.[^"\\]*)*")|([{}\[\]:,])|[^\s,:{}\[\]"]+)')
+# 数组内部：跳过括号之外的内容，字符串整体跳过
+_NO_BRACKET = re.compile(rb'[^"\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]]*)*')
+_EMPTY_ARRAY = re.compile(rb'\[\s*\]')
+
+
+def loads(data):
+    """整页解码（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class StreamedList:
+    """响应中的数据列表：每次迭代都从原始字节中逐条解码，条数在第一次完整迭代时得到"""
+
+    def __init__(self, raw, item_prefix, non_empty):
+        self.raw = raw
+        self.item_prefix = item_prefix
+        self.non_empty = non_empty
+        self.count = None if non_empty else 0
+
+    def __bool__(self):
+        return self.non_empty
+
+    def __len__(self):
+        if self.count is None:
+            # 未迭代过时才需要单独数一遍
+            for _ in self:
+                pass
+        return self.count
+
+    def __iter__(self):
+        count = 0
+        for item in ijson.items(io.BytesIO(self.raw), self.item_prefix, use_float=True):
+            count += 1
+            yield item
+        self.count = count
+
+
+class RawPage(dict):
+    """只包含标量字段的响应（按 dict 使用），数据列表在 items 中按需解码"""
+
+    def __init__(self, header, items):
+        super().__init__(header)
+        self.items = items
+
+
+def parse_page(raw, list_path):
+    """
+    流式解析分页响应：只解码数据列表之外的部分，列表本身不在这里解析，写库时逐条解码一遍
+    Args:
+        raw: 响应原始字节
+        list_path: 数据列表在响应中的路径，如 ("data", "list")
+    Returns:
+        RawPage: 标量字段组成的响应，数据列表为 StreamedList
+    """
+    item_prefix = ".".join(list_path) + ".item"
+    span = _find_list_span(raw, list_path)
+    try:
+        if span is None:
+            # 没有数据列表（或响应不完整）时整页解码，响应不完整会在这里报错
+            return RawPage(_scalar_fields(loads(raw)), StreamedList(raw, item_prefix, False))
+        start, end = span
+        header = loads(raw[:start] + b"[]" + raw[end:])
+    except ValueError as e:
+        raise ValueError(f"响应JSON解析失败: {e}")
+    if not isinstance(header, dict):
+        raise ValueError("响应JSON解析失败: 响应不是对象")
+    non_empty = _EMPTY_ARRAY.match(raw, start) is None
+    return RawPage(_scalar_fields(header), StreamedList(raw, item_prefix, non_empty))
+
+
+def _find_list_span(raw, list_path):
+    """
+    定位 list_path 处数组在原始字节中的位置：逐个扫描数组之前的键值（响应头部很短），
+    数组内部只按括号配对跳过，不构造任何对象
+    Returns:
+        tuple: (起始下标, 结束下标)，[start, end) 为包含方括号的数组；找不到或响应不完整时返回 None
+    """
+    keys = []  # 当前所在对象的键路径
+    key = None
+    expect_key = False
+    depth = 0
+    pos = 0
+    size = len(raw)
+    while pos < size:
+        match = _TOKEN.match(raw, pos)
+        if match is None or match.end() == pos:
+            return None
+        pos = match.end()
+        string, punct = match.group(1), match.group(2)
+        if string is not None:
+            if expect_key:
+                key = json.loads(string)
+                expect_key = False
+        elif punct == b"{":
+            if depth:
+                keys.append(key)
+            depth += 1
+            expect_key = True
+        elif punct == b"}":
+            depth -= 1
+            if depth <= 0:
+                return None
+            keys.pop()
+        elif punct == b",":
+            expect_key = True
+        elif punct == b"[":
+            start = match.start(2)
+            end = _skip_array(raw, start)
+            if end is None or (depth and tuple(keys) + (key,) == tuple(list_path)):
+                return None if end is None else (start, end)
+            pos = end
+    return None
+
+
+def _skip_array(raw, start):
+    """从 raw[start] 处的 '[' 跳到与之配对的 ']' 之后，字符串内的括号不计；不完整时返回 None"""
+    level = 0
+    pos = start
+    size = len(raw)
+    while True:
+        pos = _NO_BRACKET.match(raw, pos).end()
+        if pos >= size:
+            return None
+        char = raw[pos]
+        if char == 0x5B:  # [
+            level += 1
+        elif char == 0x5D:  # ]
+            level -= 1
+            if level == 0:
+                return pos + 1
+        else:
+            # 未闭合的字符串
+            return None
+        pos += 1
+
+
+def decode_response(raw, stream_list_path=None):
+    """
+    解码接口响应
+    Args:
+        raw: 响应原始字节
+        stream_list_path: 需要流式解码的数据列表路径，为 None 或未安装 ijson C 后端时整页解码
+    Returns:
+        dict: 响应内容（流式解码时为 RawPage）
+    """
+    if stream_list_path and STREAMING_AVAILABLE:
+        return parse_page(raw, stream_list_path)
+    return loads(raw)
+
+
+def _scalar_fields(value):
+    """只保留数组之外的标量字段"""
+    header = {}
+    for key, child in value.items():
+        if isinstance(child, dict):
+            child = _scalar_fields(child)
+            if child:
+                header[key] = child
+        elif not isinstance(child, list):
+            header[key] = child
+    return header
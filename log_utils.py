@@ -0,0 +1,124 @@
+"""
+日志工具
+功能：在标准 logging 之上提供分级的结构化日志（"消息 | key=value ..."），
+高频事件按 key 采样输出，逐行写库结果按页汇总为一条日志，
+完整的请求/响应内容只在 DEBUG 级别输出，避免大批量同步时日志量拖慢任务
+"""
+import logging
+import sys
+import threading
+
+from config import load_config_from_env
+
+DEFAULT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def configure_logging(level=None, log_file=None):
+    """
+    配置根日志（供独立运行的脚本使用；根日志已有处理器时只调整级别）
+    Args:
+        level: 日志级别，默认取 log_config.level（环境变量 LOG_LEVEL）
+        log_file: 同时写入的日志文件
+    """
+    level = level or load_config_from_env()['log_config']['level']
+    root = logging.getLogger()
+    if not root.handlers:
+        handlers = [logging.StreamHandler(sys.stdout)]
+        if log_file:
+            handlers.append(logging.FileHandler(log_file))
+        logging.basicConfig(format=DEFAULT_FORMAT, handlers=handlers)
+    root.setLevel(level)
+
+
+def format_fields(fields):
+    """把字段格式化为 key=value 形式"""
+    return " ".join(f"{key}={value}" for key, value in fields.items())
+
+
+class StructLogger:
+    """结构化日志记录器，带按 key 的采样"""
+
+    def __init__(self, name, sample_first=None, sample_every=None):
+        """
+        Args:
+            name: logging 记录器名称
+            sample_first: 每个采样 key 前多少次全部输出
+            sample_every: 超过 sample_first 后每多少次输出一次
+        """
+        log_config = load_config_from_env()['log_config']
+        self.logger = logging.getLogger(name)
+        self.sample_first = log_config['sample_first'] if sample_first is None else sample_first
+        self.sample_every = max(1, log_config['sample_every'] if sample_every is None else sample_every)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def is_debug(self):
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def log(self, level, msg, **fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        if fields:
+            msg = f"{msg} | {format_fields(fields)}"
+        self.logger.log(level, msg)
+
+    def debug(self, msg, **fields):
+        self.log(logging.DEBUG, msg, **fields)
+
+    def info(self, msg, **fields):
+        self.log(logging.INFO, msg, **fields)
+
+    def warning(self, msg, **fields):
+        self.log(logging.WARNING, msg, **fields)
+
+    def error(self, msg, **fields):
+        self.log(logging.ERROR, msg, **fields)
+
+    def sampled(self, key, level, msg, **fields):
+        """
+        采样输出高频事件：同一 key 前 sample_first 次全部输出，之后每 sample_every 次输出一次
+        Returns:
+            int: 该 key 累计发生次数
+        """
+        with self._lock:
+            count = self._counts[key] = self._counts.get(key, 0) + 1
+        if count <= self.sample_first or count % self.sample_every == 0:
+            self.log(level, msg, occurrences=count, **fields)
+        return count
+
+
+def get_logger(name):
+    return StructLogger(name)
+
+
+class PageSummary:
+    """汇总一页数据的逐行写入结果，写完后输出一条日志"""
+
+    def __init__(self, label, max_samples=3):
+        """
+        Args:
+            label: 数据名称（用于日志）
+            max_samples: 最多保留的失败样例数
+        """
+        self.label = label
+        self.max_samples = max_samples
+        self.succeeded = 0
+        self.failed = 0
+        self.samples = []
+
+    def add(self, ok, key=None, error=None):
+        """记录一行的写入结果"""
+        if ok:
+            self.succeeded += 1
+            return
+        self.failed += 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append(f"{key}: {error}" if error else str(key))
+
+    def log(self, logger):
+        fields = {"total": self.succeeded + self.failed, "succeeded": self.succeeded, "failed": self.failed}
+        if self.failed:
+            fields["samples"] = self.samples
+            logger.warning(f"{self.label}写入汇总", **fields)
+        else:
+            logger.info(f"{self.label}写入汇总", **fields)
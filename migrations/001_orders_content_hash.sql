@@ -0,0 +1,6 @@
+-- orders 表新增订单指纹列 content_hash
+-- 订单同步按该列跳过数据未变化的订单（DataOperator.insert_orders，见 DB_SKIP_UNCHANGED_ORDERS）；
+-- 同步程序运行时只检测该列是否存在，不执行 DDL：未执行本迁移时订单照常写入，只是不跳过未变化的订单。
+-- 在同步任务停止的时段执行一次，需要 ALTER 权限；MySQL 8.0.12 及以上可改为 ALGORITHM=INSTANT 避免重建表。
+-- 执行后重启同步进程（每个进程只检测一次）。
+ALTER TABLE orders ADD COLUMN content_hash CHAR(32) NULL;
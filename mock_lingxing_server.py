@@ -0,0 +1,517 @@
+"""
+零星开放平台本地模拟服务
+功能：实现 api_use.py 用到的认证、订单、店铺、仓库、库存、销量接口，
+数据来自合成数据或 page_archive 归档中录制的真实响应（录制模式下把请求转发到真实接口并写入归档），
+按请求中的时间范围、平台、店铺、仓库、销量日期范围过滤后分页返回，
+可配置响应延迟分布、限流错误、HTTP 错误以及 total 漂移；
+LingXingAPI 通过 base_url 指向本服务即可离线测量并发、重试、限流等功能
+用法: python mock_lingxing_server.py （参数见 config.py 中的 mock_server_config）
+"""
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import threading
+from datetime import date, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+from config import load_config_from_env
+from page_archive import PageArchive, iter_archived_pages
+
+AUTH_PATH = "/api/auth-server/oauth/access-token"
+REFRESH_PATH = "/api/auth-server/oauth/refresh"
+ORDER_PATH = "/pb/mp/order/v2/list"
+STORE_PATH = "/pb/mp/shop/v2/getSellerList"
+WAREHOUSE_PATH = "/erp/sc/data/local_inventory/warehouse"
+INVENTORY_PATH = "/erp/sc/routing/data/local_inventory/inventoryDetails"
+SALES_PATH = "/basicOpen/platformStatisticsV2/saleStat/pageList"
+
+
+# ========= 合成数据 =========
+# 合成数据的时间分布在服务启动前的这段时间内，按最近几天/几个月查询的同步任务都能取到数据
+ORDER_TIME_SPAN = 7 * 86400
+SALES_DAY_SPAN = 60
+
+
+def _platform_of_store(store_id):
+    # 大部分店铺属于默认平台 10024，少量属于其他平台，用于验证按平台过滤
+    return "10008" if int(store_id) % 5 == 0 else "10024"
+
+
+def _synthetic_orders(count, rng, now=None):
+    now = int(now or time.time())
+    step = max(1, ORDER_TIME_SPAN // max(count, 1))
+    orders = []
+    for i in range(count):
+        order_no = f"MOCK{100000000 + i}"
+        store_id = str(rng.randint(1, 20))
+        purchase_time = now - ORDER_TIME_SPAN + i * step
+        update_time = min(now, purchase_time + rng.randint(0, 3600))
+        status = rng.choice([1, 2, 3, 4, 5, 6])
+        shipped = status >= 4
+        orders.append({
+            # orders 表的 KEY 列接口总会返回，缺少时写库会失败，合成数据全部给出
+            "global_order_no": order_no,
+            "reference_no": f"REF{100000000 + i}",
+            "store_id": store_id,
+            "order_from_name": "线上订单",
+            "delivery_type": rng.choice([1, 2]),
+            "split_type": 1,
+            "status": status,
+            "global_purchase_time": purchase_time,
+            "global_payment_time": purchase_time + 60,
+            "global_review_time": purchase_time + 120 if status >= 2 else 0,
+            "global_distribution_time": purchase_time + 300 if status >= 3 else 0,
+            "global_print_time": purchase_time + 600 if status >= 3 else 0,
+            "global_mark_time": purchase_time + 900 if shipped else 0,
+            "global_delivery_time": purchase_time + 1800 if shipped else 0,
+            "amount_currency": "USD",
+            "remark": "",
+            "global_latest_ship_time": purchase_time + 3 * 86400,
+            "global_cancel_time": 0,
+            "update_time": update_time,
+            "order_tag": [],
+            "pending_order_tag": [],
+            "exception_order_tag": [],
+            "wid": rng.randint(1, 10),
+            "warehouse_name": "Mock Warehouse",
+            "original_global_order_no": "",
+            "supplier_id": 0,
+            "is_delete": 0,
+            "order_custom_fields": [],
+            "global_create_time": purchase_time,
+            "buyers_info": {"buyer_name": f"buyer{i}", "buyer_email": f"buyer{i}@example.com"},
+            "address_info": {"receiver_name": f"receiver{i}", "receiver_country_code": "US",
+                             "city": "New York", "postal_code": "10001", "address_line1": f"{i} Main St"},
+            "item_info": [{"globalItemNo": f"{order_no}-{j}", "sku": f"SKU{rng.randint(1, 500)}", "msku": f"MSKU{j}",
+                           "quantity": rng.randint(1, 5), "unit_price_amount": round(rng.uniform(5, 200), 2)}
+                          for j in range(rng.randint(1, 4))],
+            "platform_info": [{"platform_code": _platform_of_store(store_id), "platform_order_no": f"P{order_no}",
+                               "status": "Shipped" if shipped else "Unshipped"}],
+            "payment_info": [{"platform_order_no": f"P{order_no}", "currency": "USD",
+                              "payment_amount": round(rng.uniform(5, 800), 2), "payment_time": purchase_time + 60}],
+            "logistics_info": {"tracking_no": f"TRK{i}", "logistics_provider_name": "UPS",
+                               "actual_carrier": "UPS"},
+            "data_json": json.dumps({"remark": "mock"}),
+        })
+    return orders
+
+
+def _synthetic_stores(count, rng):
+    return [{"store_id": str(i), "sid": str(1000 + i), "store_name": f"Mock Store {i}",
+             "platform_code": _platform_of_store(i), "platform_name": "Mock", "currency": "USD", "is_sync": 1,
+             "status": 1, "country_code": "US"}
+            for i in range(1, count + 1)]
+
+
+def _synthetic_warehouses(count, rng):
+    return [{"wid": i, "type": 3, "sub_type": 1, "name": f"Mock Warehouse {i}", "is_delete": 0,
+             "country_code": "US", "wp_id": i, "wp_name": "Mock WP", "t_warehouse_name": f"T{i}",
+             "t_warehouse_code": f"TW{i}", "t_country_area_name": "US", "t_status": 1}
+            for i in range(1, count + 1)]
+
+
+def _synthetic_inventory(count, rng, warehouses=10):
+    return [{"wid": i % warehouses + 1, "product_id": i, "sku": f"SKU{i}", "seller_id": "0", "fnsku": "",
+             "product_total": rng.randint(0, 1000), "product_valid_num": rng.randint(0, 1000),
+             "product_bad_num": 0, "product_qc_num": 0, "product_lock_num": 0, "good_lock_num": 0,
+             "bad_lock_num": 0, "stock_cost_total": round(rng.uniform(0, 5000), 2), "quantity_receive": 0,
+             "stock_cost": round(rng.uniform(1, 50), 2), "product_onway": 0, "transit_head_cost": 0,
+             "average_age": rng.randint(0, 200)}
+            for i in range(count)]
+
+
+def _synthetic_sales(count, rng, today=None):
+    today = today or date.today()
+    rows = []
+    for i in range(count):
+        days = sorted(rng.sample(range(SALES_DAY_SPAN), 3))
+        date_collect = {(today - timedelta(days=day)).strftime("%Y-%m-%d"): rng.randint(0, 30) for day in days}
+        rows.append({"sku": [f"SKU{i}"], "spu": [f"SPU{i % 50}"], "msku": [f"MSKU{i}"], "sid": [str(i % 20 + 1)],
+                     "platform_code": ["10024"], "store_name": [f"Mock Store {i % 20 + 1}"],
+                     "date_collect": json.dumps(date_collect), "volumeTotal": sum(date_collect.values())})
+    return rows
+
+
+# ========= 请求条件过滤 =========
+def _split_ids(value):
+    """请求中的 id 条件：列表或英文逗号分隔的字符串，为空表示不限"""
+    if value in (None, "", []):
+        return None
+    if not isinstance(value, (list, tuple)):
+        value = str(value).split(",")
+    return {str(item).strip() for item in value if str(item).strip()}
+
+
+def _filter_orders(rows, body):
+    platforms = _split_ids(body.get("platform_code"))
+    stores = _split_ids(body.get("store_id"))
+    time_field = body.get("date_type") or "update_time"
+    start_time = int(body["start_time"]) if body.get("start_time") not in (None, "") else None
+    end_time = int(body["end_time"]) if body.get("end_time") not in (None, "") else None
+    result = []
+    for row in rows:
+        value = row.get(time_field) or 0
+        if start_time is not None and value < start_time:
+            continue
+        if end_time is not None and value > end_time:
+            continue
+        if stores and row.get("store_id") not in stores:
+            continue
+        if platforms and not platforms & {info.get("platform_code") for info in row.get("platform_info") or []}:
+            continue
+        result.append(row)
+    return result
+
+
+def _filter_sales(rows, body):
+    """按店铺（sids）和日期范围过滤，date_collect 只保留范围内的日期，volumeTotal 随之重算"""
+    sids = _split_ids(body.get("sids"))
+    start_date = body.get("start_date") or ""
+    end_date = body.get("end_date") or "9999-12-31"
+    result = []
+    for row in rows:
+        if sids and not sids & {str(sid) for sid in row.get("sid") or []}:
+            continue
+        date_collect = row.get("date_collect") or {}
+        if isinstance(date_collect, str):
+            date_collect = json.loads(date_collect)
+        in_range = {day: qty for day, qty in date_collect.items() if start_date <= day <= end_date}
+        if not in_range:
+            continue
+        row = dict(row, date_collect=json.dumps(in_range), volumeTotal=sum(in_range.values()))
+        result.append(row)
+    return result
+
+
+def filter_rows(path, rows, body):
+    """
+    按请求条件过滤数据集（时间范围、平台、店铺、仓库、销量日期范围）
+    Args:
+        path: 接口路径
+        rows: 接口的完整数据集
+        body: 请求体
+    Returns:
+        list: 符合条件的数据
+    """
+    if path == ORDER_PATH:
+        return _filter_orders(rows, body)
+    if path == STORE_PATH:
+        platforms = _split_ids(body.get("platform_code"))
+        return [row for row in rows if not platforms or str(row.get("platform_code")) in platforms]
+    if path == INVENTORY_PATH:
+        wids = _split_ids(body.get("wid"))
+        return [row for row in rows if not wids or str(row.get("wid")) in wids]
+    if path == SALES_PATH:
+        return _filter_sales(rows, body)
+    return rows
+
+
+class MockLingXingServer:
+    """零星接口模拟服务（在后台线程运行，可用 with 语句启动/停止）"""
+
+    def __init__(self, host="127.0.0.1", port=0, seed=0, counts=None, latency=None, rate_limit_prob=0.0,
+                 max_qps=0, error_prob=0.0, total_drift=0, token_ttl=7200, archive_dir=None, upstream=None):
+        """
+        Args:
+            host / port: 监听地址，port 为 0 时自动分配
+            seed: 随机种子（合成数据、延迟与错误注入可复现）
+            counts: 各接口合成数据条数，如 {"orders": 5000, "stores": 50}
+            latency: 响应延迟分布（毫秒），如 {"dist": "lognormal", "mean": 200, "sigma": 0.5}，
+                     dist 支持 fixed(value)/uniform(low, high)/lognormal(mean, sigma)；可按接口路径单独配置：
+                     {"default": {...}, "/pb/mp/order/v2/list": {...}}
+            rate_limit_prob: 按概率返回限流错误（3001008）
+            max_qps: 每个接口每秒最多处理的请求数，超出返回限流错误，0 为不限
+            error_prob: 按概率返回 HTTP 500
+            total_drift: 每次响应的 total 在真实条数基础上随机偏移 [-total_drift, total_drift]
+            token_ttl: 下发 token 的有效秒数
+            archive_dir: 归档目录；replay 模式下从中读取录制的响应作为数据，录制模式下写入归档
+            upstream: 真实接口地址；设置时进入录制模式，业务请求原样转发并把响应写入归档
+        """
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.latency = latency or {"default": {"dist": "fixed", "value": 0}}
+        if "dist" in self.latency:
+            self.latency = {"default": self.latency}
+        self.rate_limit_prob = rate_limit_prob
+        self.max_qps = max_qps
+        self.error_prob = error_prob
+        self.total_drift = total_drift
+        self.token_ttl = token_ttl
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.archive = PageArchive(archive_dir) if (archive_dir and upstream) else None
+        self.datasets = self._load_datasets(counts or {}, archive_dir if not upstream else None)
+        self.tokens = {}
+        self.stats = {}
+        self._qps_windows = {}
+        self._filtered = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # ========= 启停 =========
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        handler = type("MockHandler", (_MockHandler,), {"mock": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"零星模拟服务已启动: {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.archive is not None:
+            self.archive.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # ========= 数据集 =========
+    def _load_datasets(self, counts, archive_dir):
+        datasets = {
+            ORDER_PATH: _synthetic_orders(counts.get("orders", 2000), self.rng),
+            STORE_PATH: _synthetic_stores(counts.get("stores", 20), self.rng),
+            WAREHOUSE_PATH: _synthetic_warehouses(counts.get("warehouses", 10), self.rng),
+            INVENTORY_PATH: _synthetic_inventory(counts.get("inventory", 1000), self.rng),
+            SALES_PATH: _synthetic_sales(counts.get("sales", 500), self.rng),
+        }
+        if archive_dir:
+            for path in datasets:
+                rows = self._load_recorded_rows(archive_dir, path)
+                if rows:
+                    print(f"{path} 使用录制数据 {len(rows)} 条")
+                    datasets[path] = rows
+        return datasets
+
+    @staticmethod
+    def _load_recorded_rows(archive_dir, path):
+        """从归档读取录制的数据列表（同一接口多次录制时按页去重，保留最后一次）"""
+        pages = {}
+        for record in iter_archived_pages(archive_dir, path):
+            response = record.get("response") or {}
+            data = response.get("data")
+            rows = data.get("list") if isinstance(data, dict) else data
+            if not isinstance(rows, list):
+                continue
+            body = {k: v for k, v in (record.get("body") or {}).items() if k not in ("offset", "page", "length")}
+            key = (json.dumps(body, sort_keys=True), record.get("page", 0))
+            pages[key] = rows
+        return [row for key in sorted(pages) for row in pages[key]]
+
+    # ========= 故障注入 =========
+    def sample_latency(self, path):
+        spec = self.latency.get(path) or self.latency.get("default") or {}
+        dist = spec.get("dist", "fixed")
+        with self._lock:
+            if dist == "uniform":
+                ms = self.rng.uniform(spec.get("low", 0), spec.get("high", 0))
+            elif dist == "lognormal":
+                mean = spec.get("mean", 0)
+                sigma = spec.get("sigma", 0.5)
+                # 参数化为目标均值：mu = ln(mean) - sigma^2 / 2
+                ms = self.rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma) if mean > 0 else 0
+            else:
+                ms = spec.get("value", 0)
+        return max(ms, 0) / 1000.0
+
+    def _chance(self, probability):
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self.rng.random() < probability
+
+    def _over_qps(self, path):
+        if not self.max_qps:
+            return False
+        now = int(time.time())
+        with self._lock:
+            second, count = self._qps_windows.get(path, (now, 0))
+            if second != now:
+                second, count = now, 0
+            count += 1
+            self._qps_windows[path] = (second, count)
+            return count > self.max_qps
+
+    def _drifted_total(self, total):
+        if not self.total_drift:
+            return total
+        with self._lock:
+            return max(0, total + self.rng.randint(-self.total_drift, self.total_drift))
+
+    def count(self, path, outcome):
+        with self._lock:
+            endpoint_stats = self.stats.setdefault(path, {})
+            endpoint_stats[outcome] = endpoint_stats.get(outcome, 0) + 1
+
+    # ========= 认证 =========
+    def issue_token(self):
+        token = hashlib.md5(f"{time.time()}-{random.random()}".encode("utf-8")).hexdigest()
+        with self._lock:
+            self.tokens[token] = time.time() + self.token_ttl
+        return {"code": "200", "msg": "OK", "data": {"access_token": token, "refresh_token": f"r{token}",
+                                                   "expires_in": self.token_ttl}}
+
+    def token_valid(self, token):
+        with self._lock:
+            expires_at = self.tokens.get(token)
+        return expires_at is not None and expires_at > time.time()
+
+    # ========= 业务接口 =========
+    def _matching_rows(self, path, body):
+        """按请求条件过滤后的数据（同一查询的各页共用一次过滤结果）"""
+        query = {k: v for k, v in body.items() if k not in ("offset", "page", "length")}
+        key = (path, json.dumps(query, sort_keys=True, default=str))
+        with self._lock:
+            rows = self._filtered.get(key)
+        if rows is None:
+            rows = filter_rows(path, self.datasets[path], query)
+            with self._lock:
+                if len(self._filtered) >= 256:
+                    self._filtered.clear()
+                self._filtered[key] = rows
+        return rows
+
+    def handle_business(self, path, body):
+        if path not in self.datasets:
+            return 404, {"code": 404, "msg": f"未知接口: {path}"}
+        if path == WAREHOUSE_PATH:
+            rows = self.datasets[path]
+            if body.get("type") not in (None, ""):
+                rows = [row for row in rows if str(row.get("type")) == str(body["type"])]
+            return 200, {"code": 0, "msg": "success", "data": rows}
+        rows = self._matching_rows(path, body)
+        length = int(body.get("length") or 20)
+        if path == SALES_PATH:
+            offset = (int(body.get("page") or 1) - 1) * length
+        else:
+            offset = int(body.get("offset") or 0)
+        page = rows[offset:offset + length]
+        total = self._drifted_total(len(rows))
+        if path in (INVENTORY_PATH, SALES_PATH):
+            return 200, {"code": 0, "msg": "success", "data": page, "total": total}
+        return 200, {"code": 0, "msg": "success", "data": {"list": page, "total": total}}
+
+    def forward(self, path, query, raw_body, headers):
+        """录制模式：请求原样转发到真实接口（签名对真实接口同样有效），成功的分页响应写入归档"""
+        resp = requests.post(self.upstream + path, params=query, data=raw_body, headers=headers, timeout=60)
+        if self.archive is not None and resp.status_code == 200 and path not in (AUTH_PATH, REFRESH_PATH):
+            try:
+                body = json.loads(raw_body or b"{}")
+                page_size = int(body.get("length") or 1)
+                index = int(body["page"]) - 1 if "page" in body else int(body.get("offset") or 0) // page_size
+                self.archive.append(path, body, index, resp.json())
+            except ValueError as e:
+                print(f"录制响应失败: {e}")
+        return resp.status_code, resp.content
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    mock = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # 压测时访问日志量很大，不输出
+        pass
+
+    def _send(self, status, payload):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/__stats":
+            with self.mock._lock:
+                self._send(200, self.mock.stats)
+            return
+        self._send(404, {"code": 404, "msg": "not found"})
+
+    def do_POST(self):
+        mock = self.mock
+        url = urlparse(self.path)
+        path = url.path
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        raw_body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if mock.upstream:
+            status, content = mock.forward(path, query, raw_body, {"Content-Type": self.headers.get("Content-Type")})
+            mock.count(path, "forwarded")
+            self._send(status, content)
+            return
+
+        time.sleep(mock.sample_latency(path))
+        if path in (AUTH_PATH, REFRESH_PATH):
+            mock.count(path, "ok")
+            self._send(200, mock.issue_token())
+            return
+        if mock._chance(mock.error_prob):
+            mock.count(path, "http_500")
+            self._send(500, {"code": 500, "msg": "mock internal error"})
+            return
+        if not mock.token_valid(query.get("access_token")):
+            mock.count(path, "token_invalid")
+            self._send(200, {"code": "2001003", "msg": "access_token is missing or expire"})
+            return
+        if mock._over_qps(path) or mock._chance(mock.rate_limit_prob):
+            mock.count(path, "rate_limited")
+            self._send(200, {"code": "3001008", "msg": "请求过于频繁"})
+            return
+        try:
+            body = json.loads(raw_body or b"{}")
+        except ValueError:
+            mock.count(path, "bad_request")
+            self._send(400, {"code": 400, "msg": "invalid json"})
+            return
+        status, payload = mock.handle_business(path, body)
+        mock.count(path, "ok" if status == 200 else f"http_{status}")
+        self._send(status, payload)
+
+
+def main():
+    mock_config = load_config_from_env()['mock_server_config']
+    server = MockLingXingServer(
+        host=mock_config['host'],
+        port=mock_config['port'],
+        seed=mock_config['seed'],
+        counts=mock_config['counts'],
+        latency=mock_config['latency'],
+        rate_limit_prob=mock_config['rate_limit_prob'],
+        max_qps=mock_config['max_qps'],
+        error_prob=mock_config['error_prob'],
+        total_drift=mock_config['total_drift'],
+        archive_dir=mock_config['archive_dir'],
+        upstream=mock_config['upstream'],
+    )
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+原始分页响应归档
+功能：把每一页接口响应原样追加写入本地 gzip 压缩的 NDJSON 文件，按 接口/拉取日期 分区，
+每个进程写自己的文件（多个定时脚本并行时互不干扰）；入库逻辑出错需要重建数据时，
+由 archive_replay.py 直接从归档重放，不再重新调用零星接口。
+归档默认关闭（ARCHIVE_ENABLED），开启后只保留最近 ARCHIVE_RETENTION_DAYS 天的分区
+"""
+import os
+import gzip
+import json
+import time
+import heapq
+import atexit
+import shutil
+import socket
+import threading
+from datetime import datetime, timedelta
+
+from config import load_config_from_env
+from json_stream import RawPage, loads
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def endpoint_slug(endpoint):
+    """接口路径转为目录名，如 /pb/mp/order/v2/list -> pb_mp_order_v2_list"""
+    return endpoint.strip("/").replace("/", "_")
+
+
+class PageArchive:
+    """流式追加的分页归档写入器（线程安全）"""
+
+    def __init__(self, root_dir, retention_days=0):
+        """
+        Args:
+            root_dir: 归档根目录，文件路径为 root_dir/<接口>/<YYYY-MM-DD>/<主机>-<进程号>.ndjson.gz
+            retention_days: 每个接口保留最近多少天的分区，打开新一天的文件时清理更早的分区，0 为不清理
+        """
+        self.root_dir = root_dir
+        self.retention_days = retention_days
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def append(self, endpoint, body, index, result, group=None):
+        """
+        追加一页响应（一行一页）
+        Args:
+            endpoint: 接口路径
+            body: 本页请求体
+            index: 页序号（从0开始）
+            result: 接口响应（流式解码的 RawPage 直接写入原始字节，不重新编码）
+            group: 同一次查询拆成多个请求时的分组标识（如销量按日期分段），重放时按组合并
+        """
+        meta = {"endpoint": endpoint, "body": body, "page": index, "fetched_at": time.time()}
+        if group is not None:
+            meta["group"] = group
+        meta = json.dumps(meta, ensure_ascii=False, separators=(",", ":"), default=str)
+        if isinstance(result, RawPage):
+            # JSON 字符串内的换行已转义，原始响应中的换行只可能是空白，替换掉以保证一页一行
+            response = result.items.raw.strip().replace(b"\r", b" ").replace(b"\n", b" ")
+        else:
+            response = json.dumps(result, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        line = meta[:-1].encode("utf-8") + b',"response":' + response + b"}\n"
+
+        day = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            f = self._get_file(endpoint, day)
+            f.write(line)
+            # 每页刷新一次压缩缓冲，进程异常退出时最多丢失最后一页
+            f.flush()
+
+    def _get_file(self, endpoint, day):
+        key = (endpoint, day)
+        f = self._files.get(key)
+        if f is None:
+            # 跨天时关闭前一天的文件
+            for old_key in [k for k in self._files if k[0] == endpoint]:
+                self._files.pop(old_key).close()
+            directory = os.path.join(self.root_dir, endpoint_slug(endpoint), day)
+            os.makedirs(directory, exist_ok=True)
+            if self.retention_days:
+                prune_archive(self.root_dir, endpoint, self.retention_days)
+            path = os.path.join(directory, f"{socket.gethostname()}-{os.getpid()}.ndjson.gz")
+            # 追加模式写入新的 gzip 成员，读取时多个成员按顺序连续解压
+            f = self._files[key] = gzip.open(path, "ab")
+        return f
+
+    def close(self):
+        with self._lock:
+            for f in self._files.values():
+                try:
+                    f.close()
+                except OSError:
+                    pass
+            self._files = {}
+
+
+_shared_archive = None
+_shared_archive_lock = threading.Lock()
+
+
+def get_page_archive(archive_config=None):
+    """
+    获取进程内共享的归档写入器
+    Returns:
+        PageArchive: 未启用归档时返回 None
+    """
+    global _shared_archive
+    if archive_config is None:
+        archive_config = load_config_from_env()['archive_config']
+    if not archive_config.get('enabled'):
+        return None
+    with _shared_archive_lock:
+        if _shared_archive is None:
+            _shared_archive = PageArchive(archive_config['dir'], archive_config.get('retention_days', 0))
+            atexit.register(_shared_archive.close)
+        return _shared_archive
+
+
+def prune_archive(root_dir, endpoint, retention_days):
+    """
+    删除某接口超过保留天数的日期分区
+    Args:
+        root_dir: 归档根目录
+        endpoint: 接口路径
+        retention_days: 保留最近多少天（含今天）
+    Returns:
+        list: 被删除的日期
+    """
+    endpoint_dir = os.path.join(root_dir, endpoint_slug(endpoint))
+    if retention_days <= 0 or not os.path.isdir(endpoint_dir):
+        return []
+    cutoff = (datetime.now() - timedelta(days=retention_days - 1)).strftime("%Y-%m-%d")
+    removed = []
+    for day in sorted(os.listdir(endpoint_dir)):
+        if day >= cutoff:
+            break
+        # 其他进程可能同时在清理，目录已不存在时忽略
+        shutil.rmtree(os.path.join(endpoint_dir, day), ignore_errors=True)
+        removed.append(day)
+    return removed
+
+
+# ========= 读取 =========
+def list_archive_files(root_dir, endpoint, start_date=None, end_date=None):
+    """
+    列出某接口在日期范围内的归档文件
+    Args:
+        root_dir: 归档根目录
+        endpoint: 接口路径
+        start_date / end_date: YYYY-MM-DD，闭区间，为空表示不限
+    Returns:
+        list: [(日期, [文件路径, ...])]，按日期升序
+    """
+    endpoint_dir = os.path.join(root_dir, endpoint_slug(endpoint))
+    if not os.path.isdir(endpoint_dir):
+        return []
+    partitions = []
+    for day in sorted(os.listdir(endpoint_dir)):
+        if (start_date and day < start_date) or (end_date and day > end_date):
+            continue
+        day_dir = os.path.join(endpoint_dir, day)
+        files = sorted(os.path.join(day_dir, name) for name in os.listdir(day_dir) if name.endswith(".ndjson.gz"))
+        if files:
+            partitions.append((day, files))
+    return partitions
+
+
+def read_pages(path):
+    """逐页读取一个归档文件（末尾因进程中断而不完整的行会被跳过）"""
+    try:
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                try:
+                    yield loads(line)
+                except ValueError:
+                    continue
+    except (EOFError, OSError) as e:
+        logger.warning(f"归档文件读取中断（文件可能未正常关闭）: {path}, {e}")
+
+
+def iter_archived_pages(root_dir, endpoint, start_date=None, end_date=None):
+    """按拉取时间顺序逐页读取归档（同一天多个进程的文件按 fetched_at 归并）"""
+    for _, files in list_archive_files(root_dir, endpoint, start_date, end_date):
+        for record in heapq.merge(*[read_pages(path) for path in files], key=lambda r: r.get("fetched_at", 0)):
+            yield record
@@ -0,0 +1,604 @@
+"""
+通用分页引擎
+功能：用分页描述（PageSpec）统一零星各分页接口的差异（offset/page 翻页、列表位置、total 位置），
+由 Paginator 负责翻页、并发拉取、失败重试和统计，数据通过可插拔的 sink 写出，
+替代 api_use.py 中四份几乎相同的 fetch_and_process_* 循环
+"""
+import copy
+import json
+import logging
+import math
+import time
+import hashlib
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from dataoperator import DataOperator
+from json_stream import RawPage
+from log_utils import get_logger
+from retry_policy import RetryPolicy, ApiError, NETWORK, classify_error
+from page_archive import get_page_archive
+
+logger = get_logger(__name__)
+
+
+class EmptyPageError(RuntimeError):
+    """总量范围内的页重新拉取后仍没有数据"""
+
+
+class PageSpec:
+    """分页接口描述"""
+
+    def __init__(self, name, paging="offset", page_size=500, min_page_size=20,
+                 list_path=("data", "list"), total_path=("data", "total"),
+                 success_codes=("0", "200", "1000")):
+        """
+        Args:
+            name: 描述名称（用于日志）
+            paging: offset 表示 offset/length 翻页，page 表示 page/length 翻页（页码从1开始）
+            page_size: 每页条数
+            min_page_size: 接口允许的最小 length
+            list_path: 数据列表在响应中的路径
+            total_path: 数据总量在响应中的路径
+            success_codes: 视为成功的响应码
+        """
+        self.name = name
+        self.paging = paging
+        self.page_size = max(page_size, min_page_size)
+        self.min_page_size = min_page_size
+        self.list_path = list_path
+        self.total_path = total_path
+        self.success_codes = set(success_codes)
+
+    def with_page_size(self, page_size):
+        """复制一个只修改每页条数的分页描述"""
+        spec = copy.copy(self)
+        spec.page_size = max(page_size, self.min_page_size)
+        return spec
+
+    def page_body(self, base_biz_body, index, page_size=None):
+        """生成第 index 页（从0开始）的请求体"""
+        page_size = page_size or self.page_size
+        biz_body = base_biz_body.copy()
+        if self.paging == "page":
+            biz_body.update({"page": index + 1, "length": page_size})
+        else:
+            biz_body.update({"offset": index * page_size, "length": page_size})
+        return biz_body
+
+    def check(self, result):
+        """校验响应，失败时抛出异常"""
+        if not result:
+            # api_post 在请求异常、响应无法解析时返回 None
+            raise ApiError("API返回空响应", category=NETWORK)
+        code = result.get("code")
+        if str(code) not in self.success_codes:
+            error_msg = result.get("msg") or result.get("message") or "未知错误"
+            raise ApiError(f"API返回错误: {error_msg} (代码: {code})", code=code)
+
+    def extract_list(self, result):
+        if isinstance(result, RawPage):
+            # 流式解码的响应：返回按需逐条解码的列表
+            return result.items
+        return self._get_path(result, self.list_path) or []
+
+    def extract_total(self, result):
+        total = self._get_path(result, self.total_path)
+        try:
+            return int(total)
+        except (ValueError, TypeError):
+            logger.warning(f"{self.name}: 无法解析total字段，原始值: {total}")
+            return 0
+
+    @staticmethod
+    def _get_path(result, path):
+        value = result
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+
+# ========= 各接口分页描述 =========
+# 订单：offset 翻页，total 和 list 都在 data 下
+ORDER_PAGE_SPEC = PageSpec("订单", paging="offset", page_size=500)
+# 店铺：offset 翻页，total 和 list 都在 data 下
+STORE_PAGE_SPEC = PageSpec("店铺", paging="offset", page_size=50)
+# 库存：offset 翻页，total 在响应顶层，data 本身就是列表
+INVENTORY_PAGE_SPEC = PageSpec("库存", paging="offset", page_size=50,
+                               list_path=("data",), total_path=("total",))
+# 销量：page 翻页，total 在响应顶层，data 本身就是列表，只认 code == 0
+SALES_PAGE_SPEC = PageSpec("销量", paging="page", page_size=100,
+                           list_path=("data",), total_path=("total",), success_codes=("0",))
+
+
+class DataOperatorSink:
+    """把分页数据写入数据库的 sink，每个实例独占一个 DataOperator 连接"""
+
+    def __init__(self, db_config, writer, pool=None):
+        """
+        Args:
+            db_config: 数据库配置
+            writer: 写入函数 writer(data_operator, batch)，返回成功条数（返回None视为整页成功）
+            pool: 可选的 ConnectionPool，默认使用进程内共享的连接池
+        """
+        self.db_config = db_config
+        self.writer = writer
+        self.pool = pool
+        self.data_operator = None
+
+    def open(self):
+        self.data_operator = DataOperator(self.db_config, pool=self.pool)
+        self.data_operator.connect_db()
+
+    def write(self, batch):
+        try:
+            count = self.writer(self.data_operator, batch)
+        except Exception:
+            if self.data_operator.conn:
+                self.data_operator.conn.rollback()
+            raise
+        return len(batch) if count is None else count
+
+    def close(self):
+        if self.data_operator:
+            self.data_operator.disconnect_db()
+            self.data_operator = None
+
+    def clone(self):
+        """复制一个独立连接的 sink（流水线模式下每个写入线程各用一个）"""
+        return DataOperatorSink(self.db_config, self.writer, pool=self.pool)
+
+
+class ListSink:
+    """把分页数据收集到内存列表的 sink（需要先合并再写库的场景使用）"""
+
+    def __init__(self):
+        self.rows = []
+        self._lock = threading.Lock()
+
+    def write(self, batch):
+        with self._lock:
+            self.rows.extend(batch)
+        return len(batch)
+
+    def clone(self):
+        # 多个写入线程共用同一个列表
+        return self
+
+
+class SyncCheckpoint:
+    """
+    分页同步断点（sync_checkpoint 表）
+    按 接口路径 + 请求参数哈希 记录从第1页起连续提交成功的页数和数据总量，
+    任务中断后以相同参数重新运行时跳过已提交的页；并发模式下页面乱序完成，只有连续前缀推进时才写库
+    """
+
+    def __init__(self, db_config):
+        self.db_config = db_config
+        self.data_operator = None
+        self.endpoint = None
+        self.params = None
+        self.params_hash = None
+        self.page_size = 0
+        self.committed_pages = 0
+        self._done_pages = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_hash(base_biz_body, page_size):
+        raw = json.dumps({"body": base_biz_body, "page_size": page_size}, sort_keys=True, default=str)
+        return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+    def open(self, endpoint, base_biz_body, page_size):
+        """
+        连接数据库并读取断点
+        Returns:
+            int: 已连续提交、可以跳过的页数
+        """
+        self.endpoint = endpoint
+        self.params = base_biz_body
+        self.page_size = page_size
+        self.params_hash = self.make_hash(base_biz_body, page_size)
+        self.data_operator = DataOperator(self.db_config)
+        self.data_operator.connect_db()
+        self.data_operator.ensure_sync_checkpoint_table()
+
+        row = self.data_operator.get_sync_checkpoint(endpoint, self.params_hash)
+        if row and row['status'] != 'done' and row['committed_pages'] > 0:
+            self.committed_pages = row['committed_pages']
+            logger.info(f"发现同步断点: {endpoint} 已提交 {self.committed_pages} 页（总量 {row['total']}），"
+                        f"从第 {self.committed_pages + 1} 页继续")
+        return self.committed_pages
+
+    def mark_committed(self, index, total):
+        """记录第 index 页（从0开始）已提交，连续前缀推进时写入断点"""
+        with self._lock:
+            self._done_pages.add(index)
+            advanced = False
+            while self.committed_pages in self._done_pages:
+                self._done_pages.discard(self.committed_pages)
+                self.committed_pages += 1
+                advanced = True
+            if advanced:
+                self._save(total, 'running')
+
+    def complete(self, total):
+        """全部页提交完成，下次相同参数的任务从头开始"""
+        with self._lock:
+            self._save(total, 'done')
+
+    def _save(self, total, status):
+        try:
+            self.data_operator.save_sync_checkpoint(self.endpoint, self.params_hash, self.params, self.page_size,
+                                                    self.committed_pages, total, status)
+        except Exception as e:
+            # 断点写入失败不影响数据同步本身，最坏情况是重启后多拉取一部分页面
+            logger.warning(f"保存同步断点失败（不影响本次同步）: {e}")
+
+    def close(self):
+        if self.data_operator:
+            self.data_operator.disconnect_db()
+            self.data_operator = None
+
+
+class Paginator:
+    """通用分页拉取器"""
+
+    def __init__(self, client, spec, max_retries=3, delay=1, concurrency=1, writers=0, queue_size=None,
+                 stream=False, retry_policy=None, archive=None, archive_group=None):
+        """
+        Args:
+            client: LingXingAPI 实例（使用其 api_post 发送请求）
+            spec: PageSpec 分页描述
+            max_retries: 单页最多尝试次数（请求与写入）
+            delay: 失败重试的退避基数（正常翻页节奏由共享限流器控制）
+            concurrency: 并发拉取的页数，大于1时在获取total后并发请求剩余页
+            writers: 写入线程数，大于0时启用拉取/写入流水线模式（拉取线程数为 concurrency）
+            queue_size: 流水线模式下待写入页队列容量，队列满时拉取线程阻塞形成背压，默认 concurrency * 2
+            stream: 是否流式解码数据列表（在途页只保留原始字节，写入时逐条解码，需安装 ijson）
+            retry_policy: 请求重试策略，默认按 max_retries/delay 创建（指数退避、按接口熔断）
+            archive: 原始响应归档 PageArchive，默认按 archive_config 配置，传 False 不归档
+            archive_group: 归档分组标识，同一次查询拆成的多个分页任务传同一个值，重放时按组合并
+        """
+        self.client = client
+        self.spec = spec
+        self.max_retries = max_retries
+        self.delay = delay
+        self.concurrency = concurrency
+        self.writers = writers
+        self.queue_size = queue_size or max(2, concurrency * 2)
+        self.stream = stream
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_retries, base_delay=delay)
+        self.archive = get_page_archive() if archive is None else (archive or None)
+        self.archive_group = archive_group
+        self._stats_lock = threading.Lock()
+        self._checkpoint = None
+
+    def fetch_page(self, api_path, base_biz_body, index):
+        """
+        获取单页数据，失败时重试
+        Returns:
+            tuple: (响应, 数据列表)
+        """
+        biz_body = self.spec.page_body(base_biz_body, index)
+
+        def request():
+            if self.stream:
+                result = self.client.api_post(api_path, biz_body, stream_list_path=self.spec.list_path)
+            else:
+                result = self.client.api_post(api_path, biz_body)
+            self.spec.check(result)
+            if self.archive is not None:
+                self._archive_page(api_path, biz_body, index, result)
+            return result, self.spec.extract_list(result)
+
+        def on_retry(error, attempt, wait):
+            # 接口故障时每页都会重试，按接口采样输出
+            logger.sampled(f"{self.spec.name}_page_retry", logging.WARNING, f"{self.spec.name}页请求失败，准备重试",
+                           page=index + 1, attempt=attempt, category=classify_error(error),
+                           wait=f"{wait:.1f}s", error=error)
+
+        return self.retry_policy.call(api_path, request, on_retry)
+
+    def _fetch_rows(self, api_path, base_biz_body, index):
+        """
+        获取总量范围内的一页：返回空列表时按退避重新拉取，仍为空则抛出 EmptyPageError，由调用方记为失败页
+        （空页不能当作成功，否则断点和同步水位会越过这一页的数据）
+        Returns:
+            tuple: (响应, 数据列表)
+        """
+        for attempt in range(self.max_retries):
+            if attempt:
+                time.sleep(self.retry_policy.backoff(attempt))
+            result, batch = self.fetch_page(api_path, base_biz_body, index)
+            if batch:
+                return result, batch
+            logger.warning(f"{self.spec.name}页未返回数据，重新拉取", page=index + 1, attempt=attempt + 1)
+        raise EmptyPageError(f"第 {index + 1} 页未返回数据（已拉取 {self.max_retries} 次）")
+
+    def _archive_page(self, api_path, biz_body, index, result):
+        """归档失败只记录日志，不影响同步"""
+        try:
+            self.archive.append(api_path, biz_body, index, result, group=self.archive_group)
+        except Exception as e:
+            logger.sampled("archive_failed", logging.WARNING, "原始响应归档失败", api=api_path, error=e)
+
+    def probe_total(self, api_path, base_biz_body):
+        """只请求最小页大小的一页，获取数据总量（用于估算是否需要拆分查询范围）"""
+        biz_body = self.spec.page_body(base_biz_body, 0, page_size=self.spec.min_page_size)
+
+        def request():
+            result = self.client.api_post(api_path, biz_body)
+            self.spec.check(result)
+            return self.spec.extract_total(result)
+
+        def on_retry(error, attempt, wait):
+            logger.warning(f"{self.spec.name}数据总量请求失败，第 {attempt} 次重试", category=classify_error(error),
+                           wait=f"{wait:.1f}s", error=error)
+
+        return self.retry_policy.call(api_path, request, on_retry)
+
+    def run(self, api_path, base_biz_body, sink, checkpoint=None):
+        """
+        拉取全部分页并逐页写入 sink
+        Args:
+            api_path: API路径
+            base_biz_body: 基础请求体参数
+            sink: 数据写出对象，需实现 write(batch)，可选实现 open()/close()
+            checkpoint: SyncCheckpoint 断点对象，传入时每页提交后记录进度，重启后从断点继续
+        Returns:
+            dict: processed 成功条数, expected 预期总量, pages 成功页数, failed_pages 失败页码, elapsed 耗时,
+                  completed 是否全部页都已提交, resumed_from 从第几页续传（0为从头开始）,
+                  stages 流水线模式下各阶段（fetch/write）累计的忙碌与空闲秒数
+        """
+        stats = {"processed": 0, "expected": 0, "pages": 0, "failed_pages": [], "elapsed": 0.0,
+                 "completed": False, "resumed_from": 0}
+        start = time.time()
+        self._checkpoint = checkpoint
+        try:
+            start_index = 0
+            if checkpoint is not None:
+                try:
+                    start_index = checkpoint.open(api_path, base_biz_body, self.spec.page_size)
+                except Exception as e:
+                    logger.warning(f"读取同步断点失败，从第1页开始: {e}")
+                    self._checkpoint = checkpoint = None
+            stats["resumed_from"] = start_index
+
+            # 1. 请求起始页，同时得到数据总量（起始页数据直接写入，不再单独请求total）
+            try:
+                first_result, first_batch = self.fetch_page(api_path, base_biz_body, start_index)
+            except Exception as e:
+                logger.warning(f"获取{self.spec.name}数据总量失败: {e}")
+                stats["failed_pages"].append(start_index + 1)
+                return stats
+
+            stats["expected"] = self.spec.extract_total(first_result)
+            total_pages = math.ceil(stats["expected"] / self.spec.page_size) if stats["expected"] > 0 else 0
+            logger.info(f"{self.spec.name}数据总量为: {stats['expected']}，共需处理 {total_pages} 页，每页 {self.spec.page_size} 条")
+
+            # 起始页在总量范围内却没有数据时重新拉取，仍为空则本次同步不完整
+            if not first_batch and start_index < total_pages:
+                try:
+                    first_result, first_batch = self._fetch_rows(api_path, base_biz_body, start_index)
+                except Exception as e:
+                    logger.warning(f"获取{self.spec.name}第 {start_index + 1} 页失败: {e}")
+                    stats["failed_pages"].append(start_index + 1)
+
+            # 2. 逐页、并发或流水线拉取剩余页
+            if first_batch:
+                if self.writers > 0:
+                    self._run_pipeline(api_path, base_biz_body, sink, start_index, total_pages, first_batch, stats)
+                else:
+                    self._run_with_sink(api_path, base_biz_body, sink, start_index, total_pages, first_batch, stats)
+                logger.info(f"{self.spec.name}数据处理完成。预期数据量: {stats['expected']}，实际成功处理: {stats['processed']}")
+
+            stats["completed"] = not stats["failed_pages"]
+            if checkpoint is not None and stats["completed"]:
+                checkpoint.complete(stats["expected"])
+            return stats
+        finally:
+            stats["elapsed"] = time.time() - start
+            if checkpoint is not None:
+                checkpoint.close()
+            self._checkpoint = None
+
+    def _run_with_sink(self, api_path, base_biz_body, sink, start_index, total_pages, first_batch, stats):
+        """单个 sink 在当前线程写入（串行翻页或并发拉取）"""
+        if hasattr(sink, "open"):
+            sink.open()
+        try:
+            if self.concurrency > 1 and total_pages - start_index > 2:
+                if not self._write_with_retry(sink, start_index, total_pages, first_batch, stats):
+                    stats["failed_pages"].append(start_index + 1)
+                self._run_concurrently(api_path, base_biz_body, sink, start_index + 1, total_pages, stats)
+            else:
+                self._run_serially(api_path, base_biz_body, sink, start_index, total_pages, first_batch, stats)
+        finally:
+            if hasattr(sink, "close"):
+                sink.close()
+
+    def _write_page(self, sink, index, total_pages, batch, stats):
+        """写入单页数据，返回是否成功"""
+        write_start = time.time()
+        try:
+            count = sink.write(batch)
+        except Exception as e:
+            logger.warning(f"{self.spec.name}页写入失败", page=f"{index + 1}/{total_pages}", error=e)
+            return False
+        # 写入后再取条数：流式解码的列表在写入时已迭代过，条数不用再解码一遍
+        batch_size = len(batch)
+        with self._stats_lock:
+            stats["processed"] += count
+            stats["pages"] += 1
+        # 每页只输出一条汇总
+        level = logging.WARNING if count < batch_size else logging.INFO
+        logger.log(level, f"{self.spec.name}页写入完成", page=f"{index + 1}/{total_pages}", rows=batch_size,
+                   written=count, elapsed=f"{time.time() - write_start:.2f}s")
+        if self._checkpoint is not None:
+            self._checkpoint.mark_committed(index, stats["expected"])
+        return True
+
+    def _write_with_retry(self, sink, index, total_pages, batch, stats):
+        """写入失败时用同一批数据重试（并发/流水线模式下页面已在内存中，无需重新拉取）"""
+        for attempt in range(self.max_retries):
+            if attempt:
+                time.sleep(self.retry_policy.backoff(attempt))
+            if self._write_page(sink, index, total_pages, batch, stats):
+                return True
+        return False
+
+    def _run_serially(self, api_path, base_biz_body, sink, start_index, total_pages, first_batch, stats):
+        """串行翻页：逐页拉取并写入，写入失败时重新拉取同一页重试"""
+        index = start_index
+        batch = first_batch
+        while True:
+            attempt = 0
+            while not self._write_page(sink, index, total_pages, batch, stats):
+                attempt += 1
+                if attempt >= self.max_retries:
+                    logger.error("写入重试次数已达上限，停止处理。")
+                    stats["failed_pages"].append(index + 1)
+                    return
+                time.sleep(self.retry_policy.backoff(attempt))
+                try:
+                    _, batch = self._fetch_rows(api_path, base_biz_body, index)
+                except Exception as e:
+                    logger.error(f"重试次数已达上限，停止处理。错误信息: {e}")
+                    stats["failed_pages"].append(index + 1)
+                    return
+
+            index += 1
+            if index >= total_pages:
+                return
+
+            try:
+                _, batch = self._fetch_rows(api_path, base_biz_body, index)
+            except Exception as e:
+                logger.error(f"重试次数已达上限，停止处理。错误信息: {e}")
+                stats["failed_pages"].append(index + 1)
+                return
+
+    def _run_concurrently(self, api_path, base_biz_body, sink, first_index, total_pages, stats):
+        """
+        并发拉取剩余页并按到达顺序写入
+        工作线程只负责请求接口，写入在当前线程串行完成（sink 连接不跨线程共享）；
+        在途请求数量限制为 concurrency * 2，避免已拉取未写入的页面堆积占用内存
+        """
+        pending = list(range(first_index, total_pages))
+        max_in_flight = self.concurrency * 2
+        logger.info(f"启用并发拉取模式: {self.concurrency} 个线程，最多 {max_in_flight} 页在途")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            in_flight = {}
+            while pending or in_flight:
+                while pending and len(in_flight) < max_in_flight:
+                    index = pending.pop(0)
+                    in_flight[executor.submit(self._fetch_rows, api_path, base_biz_body, index)] = index
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        _, batch = future.result()
+                    except Exception as e:
+                        logger.warning(f"  ✗ 第 {index + 1}/{total_pages} 页拉取失败，已放弃: {e}")
+                        stats["failed_pages"].append(index + 1)
+                        continue
+                    if not self._write_with_retry(sink, index, total_pages, batch, stats):
+                        stats["failed_pages"].append(index + 1)
+
+        if stats["failed_pages"]:
+            logger.warning(f"以下页拉取或写入失败: {sorted(stats['failed_pages'])}")
+
+    def _run_pipeline(self, api_path, base_biz_body, sink, start_index, total_pages, first_batch, stats):
+        """
+        拉取/写入流水线：concurrency 个拉取线程把页面放入有界队列，writers 个写入线程各自持有独立连接取出写入，
+        网络请求与数据库事务互相重叠；队列满时拉取线程阻塞（背压），避免拉取远快于写入时页面堆积
+        """
+        stats["stages"] = {
+            "fetch": {"busy": 0.0, "idle": 0.0, "threads": self.concurrency},
+            "write": {"busy": 0.0, "idle": 0.0, "threads": self.writers},
+        }
+        page_queue = queue.Queue(maxsize=self.queue_size)
+        # 每个写入线程独占一个 sink（连接不跨线程共享），在当前线程打开以便连接失败时直接抛出
+        writer_sinks = [sink] + [sink.clone() for _ in range(self.writers - 1)]
+        opened_sinks = []
+
+        try:
+            for writer_sink in writer_sinks:
+                if hasattr(writer_sink, "open"):
+                    writer_sink.open()
+                opened_sinks.append(writer_sink)
+            logger.info(f"启用流水线模式: {self.concurrency} 个拉取线程，{self.writers} 个写入线程，队列容量 {self.queue_size} 页")
+
+            page_queue.put((start_index, first_batch))
+            pending = iter(range(start_index + 1, total_pages))
+            pending_lock = threading.Lock()
+
+            def fetcher():
+                busy = idle = 0.0
+                while True:
+                    with pending_lock:
+                        index = next(pending, None)
+                    if index is None:
+                        break
+                    t0 = time.time()
+                    try:
+                        _, batch = self._fetch_rows(api_path, base_biz_body, index)
+                    except Exception as e:
+                        logger.warning(f"  ✗ 第 {index + 1}/{total_pages} 页拉取失败，已放弃: {e}")
+                        with self._stats_lock:
+                            stats["failed_pages"].append(index + 1)
+                        continue
+                    finally:
+                        busy += time.time() - t0
+                    t0 = time.time()
+                    page_queue.put((index, batch))
+                    idle += time.time() - t0
+                with self._stats_lock:
+                    stats["stages"]["fetch"]["busy"] += busy
+                    stats["stages"]["fetch"]["idle"] += idle
+
+            def writer(writer_sink):
+                busy = idle = 0.0
+                while True:
+                    t0 = time.time()
+                    item = page_queue.get()
+                    idle += time.time() - t0
+                    if item is None:
+                        break
+                    index, batch = item
+                    t0 = time.time()
+                    if not self._write_with_retry(writer_sink, index, total_pages, batch, stats):
+                        with self._stats_lock:
+                            stats["failed_pages"].append(index + 1)
+                    busy += time.time() - t0
+                with self._stats_lock:
+                    stats["stages"]["write"]["busy"] += busy
+                    stats["stages"]["write"]["idle"] += idle
+
+            fetch_threads = [threading.Thread(target=fetcher, daemon=True) for _ in range(self.concurrency)]
+            write_threads = [threading.Thread(target=writer, args=(writer_sink,), daemon=True)
+                             for writer_sink in writer_sinks]
+            for t in write_threads + fetch_threads:
+                t.start()
+            for t in fetch_threads:
+                t.join()
+            for _ in write_threads:
+                page_queue.put(None)
+            for t in write_threads:
+                t.join()
+
+            if stats["failed_pages"]:
+                logger.warning(f"以下页拉取或写入失败: {sorted(stats['failed_pages'])}")
+            for stage, label in (("fetch", "拉取"), ("write", "写入")):
+                info = stats["stages"][stage]
+                logger.info(f"  {label}阶段（{info['threads']} 线程）: 忙碌 {info['busy']:.2f}s，空闲 {info['idle']:.2f}s")
+        finally:
+            for writer_sink in opened_sinks:
+                if hasattr(writer_sink, "close"):
+                    writer_sink.close()
@@ -0,0 +1,198 @@
+"""
+零星接口限流器
+功能：按接口路径配置令牌桶（每秒请求数 + 突发容量），同一进程内所有 LingXingAPI 实例共享，
+多个定时脚本之间通过锁文件共享桶状态；接口返回限流错误码时按 AIMD 策略
+乘性降低速率，之后每次成功请求加性恢复，替代固定的 time.sleep(delay)；
+桶按 服务地址 + 接口路径 区分，指向 mock 服务与正式环境的脚本互不影响
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from config import load_config_from_env
+from log_utils import get_logger
+
+try:
+    import fcntl  # 仅类Unix系统可用，Windows 下退化为进程内限流
+except ImportError:
+    fcntl = None
+
+logger = get_logger(__name__)
+
+
+class RateLimiter:
+    """按服务地址 + 接口路径限流的令牌桶（线程安全，跨进程共享状态）"""
+
+    # 零星返回的限流错误码：请求过于频繁
+    RATE_LIMIT_CODES = {'3001008'}
+
+    def __init__(self, endpoints=None, default=None, state_dir=None, min_rate=0.1,
+                 decrease_factor=0.5, recovery_ratio=0.05):
+        """
+        初始化限流器
+        Args:
+            endpoints: 各接口限流配置，如 {"/pb/mp/order/v2/list": {"rate": 2, "burst": 4}}
+            default: 未单独配置接口的默认限流参数
+            state_dir: 桶状态文件目录，为空时使用系统临时目录
+            min_rate: 速率下限（次/秒）
+            decrease_factor: 触发限流时速率乘以该系数
+            recovery_ratio: 每次成功请求恢复的速率占配置速率的比例
+        """
+        self.endpoints = endpoints or {}
+        self.default = default or {'rate': 1.0, 'burst': 1}
+        self.state_dir = state_dir or tempfile.gettempdir()
+        self.min_rate = min_rate
+        self.decrease_factor = decrease_factor
+        self.recovery_ratio = recovery_ratio
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._states = {}
+
+    # ========= 对外接口 =========
+    def acquire(self, api_path, base_url=None):
+        """
+        获取一个请求令牌，令牌不足时阻塞等待
+        Args:
+            api_path: 接口路径（决定限流参数）
+            base_url: 服务地址，不同服务地址的同名接口使用各自的桶
+        Returns:
+            float: 本次等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._locked_state(api_path, base_url) as state:
+                self._refill(state)
+                if state['tokens'] >= 1:
+                    state['tokens'] -= 1
+                    return waited
+                wait_time = (1 - state['tokens']) / state['rate']
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def on_rate_limited(self, api_path, base_url=None):
+        """接口返回限流：速率乘性下降并清空令牌"""
+        with self._locked_state(api_path, base_url) as state:
+            self._refill(state)
+            state['rate'] = max(self.min_rate, state['rate'] * self.decrease_factor)
+            state['tokens'] = 0.0
+            logger.warning(f"接口 {api_path} 触发限流，速率降至 {state['rate']:.2f} 次/秒")
+
+    def on_success(self, api_path, base_url=None):
+        """请求成功：速率加性恢复，直至配置速率"""
+        limit = self._limit(api_path)
+        with self._locked_state(api_path, base_url) as state:
+            if state['rate'] < limit['rate']:
+                state['rate'] = min(limit['rate'], state['rate'] + limit['rate'] * self.recovery_ratio)
+
+    def is_rate_limited(self, result) -> bool:
+        """判断接口响应是否为限流错误"""
+        return bool(result) and str(result.get("code")) in self.RATE_LIMIT_CODES
+
+    # ========= 令牌桶状态 =========
+    def _limit(self, api_path):
+        limit = self.endpoints.get(api_path, self.default)
+        return {'rate': float(limit.get('rate', 1.0)), 'burst': float(limit.get('burst', 1))}
+
+    def _refill(self, state):
+        now = time.time()
+        elapsed = max(0.0, now - state['updated_at'])
+        state['tokens'] = min(state['burst'], state['tokens'] + elapsed * state['rate'])
+        state['updated_at'] = now
+
+    @staticmethod
+    def _bucket_key(api_path, base_url):
+        """桶的标识：服务地址的 host[:port] + 接口路径，未指定服务地址时只用接口路径"""
+        if not base_url:
+            return api_path
+        return (urlsplit(base_url).netloc or base_url) + api_path
+
+    def _thread_lock(self, key):
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    @contextmanager
+    def _locked_state(self, api_path, base_url=None):
+        """加锁读取桶状态，退出时写回（跨进程时状态保存在锁文件同目录的状态文件中）"""
+        limit = self._limit(api_path)
+        key = self._bucket_key(api_path, base_url)
+        with self._thread_lock(key):
+            if fcntl is None:
+                state = self._states.get(key) or self._new_state(limit)
+                yield state
+                self._states[key] = state
+                return
+
+            state_path = self._state_path(key)
+            lock_file = open(state_path + ".lock", "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                state = self._load_state(state_path) or self._new_state(limit)
+                # 配置调整后以新的突发容量为准，速率不超过配置值
+                state['burst'] = limit['burst']
+                state['rate'] = min(state.get('rate', limit['rate']), limit['rate'])
+                yield state
+                self._save_state(state_path, state)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    @staticmethod
+    def _new_state(limit):
+        return {'tokens': limit['burst'], 'burst': limit['burst'], 'rate': limit['rate'], 'updated_at': time.time()}
+
+    def _state_path(self, key):
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.state_dir, f"lingxing_ratelimit_{digest}.json")
+
+    @staticmethod
+    def _load_state(state_path):
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _save_state(state_path, state):
+        try:
+            with open(state_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+        except OSError as e:
+            logger.warning(f"写入限流状态失败: {e}")
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter(rate_limit_config=None) -> RateLimiter:
+    """
+    获取进程内共享的限流器（所有 LingXingAPI 实例共用同一组令牌桶）
+    Args:
+        rate_limit_config: 限流配置，为空时从环境变量配置读取
+    """
+    global _shared_limiter
+    if _shared_limiter is not None:
+        return _shared_limiter
+
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            if rate_limit_config is None:
+                rate_limit_config = load_config_from_env()['rate_limit_config']
+            _shared_limiter = RateLimiter(
+                endpoints=rate_limit_config.get('endpoints'),
+                default=rate_limit_config.get('default'),
+                state_dir=rate_limit_config.get('state_dir'),
+                min_rate=rate_limit_config.get('min_rate', 0.1),
+                decrease_factor=rate_limit_config.get('decrease_factor', 0.5),
+                recovery_ratio=rate_limit_config.get('recovery_ratio', 0.05),
+            )
+        return _shared_limiter
@@ -0,0 +1,118 @@
+"""
+参考数据响应缓存
+功能：仓库、店铺这类很少变化的接口数据按 接口 + 请求体哈希 缓存到本地磁盘（带 TTL），
+TTL 内的重复拉取直接读缓存；同时记录每个数据库最近一次写入的数据哈希，
+数据没有变化时跳过入库，force_refresh 时忽略缓存和哈希强制拉取、写入
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+
+from config import load_config_from_env
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+    """磁盘响应缓存（线程安全，缓存文件原子替换，多个脚本可共享目录）"""
+
+    def __init__(self, cache_dir=None, ttl=21600):
+        """
+        初始化缓存
+        Args:
+            cache_dir: 缓存目录
+            ttl: 缓存有效秒数
+        """
+        self.cache_dir = cache_dir or "/tmp/lingxing_cache"
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    # ========= 哈希 =========
+    @staticmethod
+    def payload_hash(data):
+        """数据内容哈希（键排序后序列化，字段顺序不同不影响结果）"""
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def db_key(db_config):
+        """区分写入目标数据库（同一份缓存可能被写往不同环境）"""
+        return f"{db_config.get('host')}:{db_config.get('port', 3306)}/{db_config.get('database')}"
+
+    def _path(self, endpoint, body):
+        key = hashlib.md5(f"{endpoint}|{self.payload_hash(body)}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    # ========= 对外接口 =========
+    def get(self, endpoint, body):
+        """
+        读取未过期的缓存数据
+        Returns:
+            缓存的数据，不存在或已过期时返回 None
+        """
+        entry = self._load(endpoint, body)
+        if not entry or time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        return entry.get("data")
+
+    def put(self, endpoint, body, data):
+        """
+        写入缓存（保留已记录的入库哈希）
+        Returns:
+            str: 数据哈希
+        """
+        payload_hash = self.payload_hash(data)
+        with self._lock:
+            entry = self._load(endpoint, body) or {}
+            entry.update(endpoint=endpoint, body=body, fetched_at=time.time(), payload_hash=payload_hash, data=data)
+            entry.setdefault("applied", {})
+            self._save(endpoint, body, entry)
+        return payload_hash
+
+    def is_applied(self, endpoint, body, db_config, payload_hash):
+        """该数据库最近一次写入的是否就是这份数据"""
+        entry = self._load(endpoint, body)
+        return bool(entry) and entry.get("applied", {}).get(self.db_key(db_config)) == payload_hash
+
+    def mark_applied(self, endpoint, body, db_config, payload_hash):
+        """记录数据已写入该数据库"""
+        with self._lock:
+            entry = self._load(endpoint, body)
+            if not entry:
+                return
+            entry.setdefault("applied", {})[self.db_key(db_config)] = payload_hash
+            self._save(endpoint, body, entry)
+
+    # ========= 缓存文件 =========
+    def _load(self, endpoint, body):
+        try:
+            with open(self._path(endpoint, body), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, endpoint, body, entry):
+        """原子写入缓存文件（先写临时文件再替换），写入失败只影响缓存命中"""
+        path = self._path(endpoint, body)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入响应缓存失败: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def get_response_cache(cache_config=None) -> ResponseCache:
+    """按配置创建响应缓存"""
+    if cache_config is None:
+        cache_config = load_config_from_env()['cache_config']
+    return ResponseCache(cache_dir=cache_config.get('dir'), ttl=cache_config.get('ttl', 21600))
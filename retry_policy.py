@@ -0,0 +1,261 @@
+"""
+重试策略与熔断
+功能：统一各分页接口的失败重试：先把错误分为网络、限流、鉴权（token 失效）、业务四类，
+可重试的错误按指数退避 + 随机抖动等待，单次调用（含重试）有总耗时上限；
+按接口维护熔断器，连续失败达到阈值后一段时间内直接失败，避免对已经不可用的接口反复重试
+"""
+import asyncio
+import random
+import threading
+import time
+
+import requests
+
+from config import load_config_from_env
+from rate_limiter import RateLimiter
+from token_manager import TokenManager
+
+# 错误分类
+NETWORK = "network"
+RATE_LIMIT = "rate_limit"
+AUTH = "auth"
+BUSINESS = "business"
+
+
+class ApiError(RuntimeError):
+    """接口返回错误（携带响应码，便于分类）"""
+
+    def __init__(self, message, code=None, category=None):
+        super().__init__(message)
+        self.code = None if code is None else str(code)
+        self.category = category
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器打开时直接拒绝调用"""
+
+
+def classify_error(error):
+    """
+    判断错误类别
+    Returns:
+        str: NETWORK / RATE_LIMIT / AUTH / BUSINESS
+    """
+    if isinstance(error, ApiError):
+        if error.category:
+            return error.category
+        if error.code in RateLimiter.RATE_LIMIT_CODES:
+            return RATE_LIMIT
+        if error.code in TokenManager.TOKEN_INVALID_CODES:
+            return AUTH
+        return BUSINESS
+    if isinstance(error, (requests.exceptions.RequestException, ConnectionError, TimeoutError)):
+        return NETWORK
+    return BUSINESS
+
+
+class CircuitBreaker:
+    """单个接口的熔断器（线程安全）"""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        """
+        Args:
+            name: 接口名称（用于日志）
+            failure_threshold: 连续失败多少次后熔断
+            reset_timeout: 熔断持续秒数，到期后放行一次试探请求
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """调用前检查，熔断中抛出 CircuitOpenError；熔断到期后只放行一个试探请求"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.time()
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(f"接口 {self.name} 已熔断（连续失败 {self._failures} 次），"
+                                       f"{max(remaining, 0):.0f} 秒后重试")
+            self._probing = True
+
+    def on_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def on_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.time()
+            self._probing = False
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name, retry_config=None) -> CircuitBreaker:
+    """获取进程内按接口共享的熔断器"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            if retry_config is None:
+                retry_config = load_config_from_env()['retry_config']
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=retry_config.get('breaker_threshold', 5),
+                reset_timeout=retry_config.get('breaker_reset', 60),
+            )
+        return breaker
+
+
+class RetryPolicy:
+    """重试策略：错误分类 + 指数退避抖动 + 单次调用总时限 + 按接口熔断"""
+
+    def __init__(self, max_attempts=None, base_delay=None, max_delay=None, rate_limit_delay=None,
+                 deadline=None, retry_business=None, use_breaker=True):
+        """
+        未传入的参数取 retry_config 配置
+        Args:
+            max_attempts: 单次调用最多尝试次数（含第一次）
+            base_delay: 退避基数（秒），第 n 次重试最多等待 base_delay * 2^(n-1)
+            max_delay: 单次等待上限（秒）
+            rate_limit_delay: 限流错误的退避基数（秒），限流恢复通常比网络抖动慢
+            deadline: 单次调用（含所有重试与等待）的总时限（秒），0 为不限
+            retry_business: 业务错误是否重试（参数错误等重试也不会成功，默认不重试）
+            use_breaker: 是否启用按接口熔断
+        """
+        retry_config = load_config_from_env()['retry_config']
+        self.max_attempts = max(1, max_attempts if max_attempts is not None else retry_config['max_attempts'])
+        self.base_delay = base_delay if base_delay is not None else retry_config['base_delay']
+        self.max_delay = max_delay if max_delay is not None else retry_config['max_delay']
+        self.rate_limit_delay = rate_limit_delay if rate_limit_delay is not None else retry_config['rate_limit_delay']
+        self.deadline = deadline if deadline is not None else retry_config['deadline']
+        self.retry_business = retry_business if retry_business is not None else retry_config['retry_business']
+        self.use_breaker = use_breaker
+        self.retry_config = retry_config
+
+    def is_retryable(self, category):
+        return category != BUSINESS or self.retry_business
+
+    def backoff(self, attempt, category=NETWORK):
+        """
+        第 attempt 次重试（从1开始）前的等待秒数：指数增长，取 [0, 上限] 间的随机值（full jitter），
+        避免多个线程同时失败后又同时重试
+        """
+        base = self.rate_limit_delay if category == RATE_LIMIT else self.base_delay
+        return random.uniform(0, min(self.max_delay, base * (2 ** (attempt - 1))))
+
+    def next_delay(self, error, attempt, started):
+        """
+        计算失败后的下一次等待时间
+        Args:
+            error: 本次失败的异常
+            attempt: 已尝试次数
+            started: 本次调用开始时间
+        Returns:
+            float: 等待秒数，不应再重试时返回 None
+        """
+        if isinstance(error, CircuitOpenError):
+            return None
+        category = classify_error(error)
+        if not self.is_retryable(category) or attempt >= self.max_attempts:
+            return None
+        wait = self.backoff(attempt, category)
+        if self.deadline and time.time() - started + wait > self.deadline:
+            return None
+        return wait
+
+    def breaker(self, name):
+        if not self.use_breaker:
+            return None
+        return get_circuit_breaker(name, self.retry_config)
+
+    def record(self, breaker, error=None):
+        """记录一次调用结果到熔断器（业务错误说明接口本身可用，不计入失败）"""
+        if breaker is None:
+            return
+        if error is None or classify_error(error) == BUSINESS:
+            breaker.on_success()
+        else:
+            breaker.on_failure()
+
+    def _after_failure(self, breaker, error, attempt, started, on_retry):
+        """记录一次失败并计算等待时间（call 与 acall 共用），不应再重试时返回 None"""
+        self.record(breaker, error)
+        wait = self.next_delay(error, attempt, started)
+        if wait is not None and on_retry is not None:
+            on_retry(error, attempt, wait)
+        return wait
+
+    def call(self, name, func, on_retry=None):
+        """
+        按策略执行调用
+        Args:
+            name: 接口名称（熔断器按此区分）
+            func: 无参调用，失败时抛出异常
+            on_retry: 重试前回调 on_retry(error, attempt, wait)，用于输出日志
+        Returns:
+            func 的返回值；重试耗尽、超出时限或熔断时抛出最后一次的异常
+        """
+        breaker = self.breaker(name)
+        started = time.time()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if breaker is not None:
+                    breaker.before_call()
+                result = func()
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                wait = self._after_failure(breaker, e, attempt, started, on_retry)
+                if wait is None:
+                    raise
+                time.sleep(wait)
+                continue
+            self.record(breaker)
+            return result
+
+    async def acall(self, name, func, on_retry=None):
+        """
+        call 的异步版本：func 为无参协程函数，重试等待用 asyncio.sleep，不阻塞事件循环
+        Args:
+            name: 接口名称（与同步调用共用熔断器）
+            func: 无参协程函数，失败时抛出异常
+            on_retry: 重试前回调 on_retry(error, attempt, wait)
+        Returns:
+            func 的返回值；重试耗尽、超出时限或熔断时抛出最后一次的异常
+        """
+        breaker = self.breaker(name)
+        started = time.time()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if breaker is not None:
+                    breaker.before_call()
+                result = await func()
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                wait = self._after_failure(breaker, e, attempt, started, on_retry)
+                if wait is None:
+                    raise
+                await asyncio.sleep(wait)
+                continue
+            self.record(breaker)
+            return result
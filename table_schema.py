@@ -0,0 +1,572 @@
+"""
+数据表字段映射
+功能：以声明方式登记每张表的 字段 -> 数据来源（路径）、类型、默认值，
+首次使用时为每张表生成取值函数（平铺字段用 operator.itemgetter 整行一次取出，不再逐字段调用 serialize_value），
+同时由同一份登记生成 INSERT ... ON DUPLICATE KEY UPDATE 语句，字段顺序和占位符个数天然一致
+"""
+import json
+import hashlib
+from collections import namedtuple
+from itertools import chain
+from operator import itemgetter
+
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
+# 字段类型
+VALUE = "value"        # record.get(来源, 默认值)，字典/列表转为 JSON 字符串
+KEY = "key"            # record[来源]，缺失时抛出 KeyError（主键等必填字段）
+FLOAT = "float"        # 转为浮点数，None 或空字符串为 0.0
+PARENT = "parent"      # 取自上级记录（子表行取所属订单的 global_order_no）
+COMPUTED = "computed"  # 默认值为函数 func(record)，返回值直接入库
+
+Column = namedtuple("Column", ["name", "source", "kind", "default"])
+Column.__new__.__defaults__ = (None, VALUE, None)
+
+_PLAIN_TYPES = (str, int, float, bool)
+# 可直接入库、不需要序列化的值类型
+_RAW_TYPES = frozenset(_PLAIN_TYPES + (type(None),))
+
+
+def to_db_value(value):
+    """
+    序列化值以确保数据库兼容性
+    处理字典、列表等复杂类型，转换为JSON字符串
+    """
+    if value is None or type(value) in _PLAIN_TYPES:
+        return value
+    if isinstance(value, (dict, list)):
+        try:
+            return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        except Exception as e:
+            logger.warning("JSON序列化错误", error=e, value=value)
+            return str(value)
+    if isinstance(value, _PLAIN_TYPES):
+        return value
+    return str(value)
+
+
+def to_float(value):
+    """金额、重量等数值字段：None 或空字符串记为 0.0"""
+    if value is None or value == '':
+        return 0.0
+    return float(value)
+
+
+class TableSchema:
+    """一张表的字段登记（取值函数与 SQL 在首次使用时生成）"""
+
+    def __init__(self, table, columns, keys, touch_column=None, ignore=False,
+                 source=None, many=False, skip_empty=False):
+        """
+        Args:
+            table: 表名
+            columns: Column 列表（顺序即 INSERT 字段顺序）
+            keys: 唯一键字段，不出现在 ON DUPLICATE KEY UPDATE 中
+            touch_column: 更新时刷新为 CURRENT_TIMESTAMP 的字段
+            ignore: 是否生成 INSERT IGNORE
+            source: 子表数据在订单中的字段名，为空表示整条记录即一行
+            many: source 是否为列表（每个元素一行）
+            skip_empty: source 为空时不写入
+        """
+        self.table = table
+        self.columns = list(columns)
+        self.keys = tuple(keys)
+        self.touch_column = touch_column
+        self.ignore = ignore
+        self.source = source
+        self.many = many
+        self.skip_empty = skip_empty
+        self._build = None
+        self._sql = None
+
+    @property
+    def column_names(self):
+        return [column.name for column in self.columns]
+
+    @property
+    def sql(self):
+        if self._sql is None:
+            self._sql = self._compile_sql()
+        return self._sql
+
+    def build(self, record, parent=None):
+        """
+        取一行的参数元组
+        Args:
+            record: 本行数据
+            parent: 上级记录（PARENT 字段的来源），默认即 record
+        """
+        if self._build is None:
+            self._build = self._compile_builder()
+        return self._build(record, record if parent is None else parent)
+
+    def rows(self, record):
+        """
+        按 source 设置从一条（订单）记录取出本表的所有行
+        Returns:
+            list: 参数元组列表，可能为空
+        """
+        if self.source is None:
+            return [self.build(record, record)]
+        data = record.get(self.source) or ([] if self.many else {})
+        if self.many:
+            return [self.build(item, record) for item in data]
+        if self.skip_empty and not data:
+            return []
+        return [self.build(data, record)]
+
+    # ========= 编译 =========
+    def _update_clause(self):
+        updates = [f"{name} = VALUES({name})" for name in self.column_names if name not in self.keys]
+        if self.touch_column:
+            updates.append(f"{self.touch_column} = CURRENT_TIMESTAMP")
+        return f"ON DUPLICATE KEY UPDATE {', '.join(updates)}"
+
+    def _compile_sql(self):
+        names = self.column_names
+        return (f"INSERT {'IGNORE ' if self.ignore else ''}INTO {self.table} ({', '.join(names)}) "
+                f"VALUES ({', '.join(['%s'] * len(names))}) {self._update_clause()}")
+
+    def merge_sql(self, staging_table, order_by=None):
+        """
+        从临时表合并到正式表的 INSERT ... SELECT ... ON DUPLICATE KEY UPDATE 语句
+        Args:
+            staging_table: 临时表名（字段与本表登记的字段同名）
+            order_by: 合并顺序（同一主键出现多次时以最后一行为准）
+        """
+        columns = ', '.join(self.column_names)
+        order = f" ORDER BY {order_by}" if order_by else ""
+        return (f"INSERT {'IGNORE ' if self.ignore else ''}INTO {self.table} ({columns}) "
+                f"SELECT {columns} FROM {staging_table}{order} {self._update_clause()}")
+
+    def _compile_builder(self):
+        """
+        生成取值函数 build(r, p)：
+        字段按所在的字典分组（本记录、上级记录、嵌套路径如 third_inventory），每组用一个 itemgetter 整组取出，
+        缺字段时才把默认值合并进字典；取出的值都是基本类型时原样入库，含字典/列表时才逐个 to_db_value；
+        数值字段整组 float()，遇到 None/空字符串时才逐个 to_float；计算字段逐列调用；最后按登记顺序重排
+        """
+        groups = {}  # (是否上级记录, 嵌套路径) -> {"defaults", "plain", "floats"}
+        computed = []
+        for index, column in enumerate(self.columns):
+            if column.kind == COMPUTED:
+                computed.append((index, column.default))
+                continue
+            if column.kind not in (VALUE, KEY, FLOAT, PARENT):
+                raise ValueError(f"{self.table}.{column.name} 字段类型未知: {column.kind}")
+            parts = (column.source or column.name).split(".")
+            group = groups.setdefault((column.kind == PARENT, tuple(parts[:-1])),
+                                      {"defaults": {}, "plain": [], "floats": []})
+            key = parts[-1]
+            if column.kind in (VALUE, FLOAT):
+                default = None if column.kind == FLOAT else column.default
+                if group["defaults"].setdefault(key, default) != default:
+                    raise ValueError(f"{self.table}.{column.name}: 同一来源 {key} 登记了不同的默认值")
+            group["floats" if column.kind == FLOAT else "plain"].append((index, key))
+
+        readers = [(_dict_locator(from_parent, path), _tuple_getter([key for _, key in group["plain"]]),
+                    _tuple_getter([key for _, key in group["floats"]]), group["defaults"])
+                   for (from_parent, path), group in groups.items()]
+        # 取出顺序为 各组普通字段 + 各组数值字段 + 计算字段，按登记顺序重排
+        taken = ([index for group in groups.values() for index, _ in group["plain"]] +
+                 [index for group in groups.values() for index, _ in group["floats"]] +
+                 [index for index, _ in computed])
+        positions = {index: position for position, index in enumerate(taken)}
+        order = [positions[index] for index in range(len(self.columns))]
+        reorder = None if order == list(range(len(order))) else _tuple_getter(order)
+        funcs = [func for _, func in computed]
+        has_floats = any(group["floats"] for group in groups.values())
+
+        def build(record, parent):
+            values = floats = ()
+            for locate, get_plain, get_floats, defaults in readers:
+                data = locate(record, parent)
+                try:
+                    # 接口返回的记录通常包含全部字段，直接取值；缺字段时才合并默认值
+                    plain, numbers = get_plain(data), get_floats(data)
+                except KeyError:
+                    merged = defaults.copy()
+                    merged.update(data)
+                    plain, numbers = get_plain(merged), get_floats(merged)
+                values += plain
+                floats += numbers
+            if not _RAW_TYPES.issuperset(map(type, values)):
+                values = tuple([value if type(value) in _RAW_TYPES else to_db_value(value) for value in values])
+            if has_floats:
+                try:
+                    values += tuple(map(float, floats))
+                except (TypeError, ValueError):
+                    values += tuple(map(to_float, floats))
+            if funcs:
+                values += tuple([func(record) for func in funcs])
+            return values if reorder is None else reorder(values)
+
+        return build
+
+
+def _tuple_getter(keys):
+    """itemgetter 的元组版本（只有一个键时 itemgetter 返回单个值）"""
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda data: (data[key],)
+    if not keys:
+        return lambda data: ()
+    return itemgetter(*keys)
+
+
+def _dict_locator(from_parent, path):
+    """字段所在的字典：本记录或上级记录，path 非空时逐级取嵌套字典（缺失或为空时为 {}）"""
+    if not path:
+        return (lambda record, parent: parent) if from_parent else (lambda record, parent: record)
+
+    def locate(record, parent):
+        data = parent if from_parent else record
+        for part in path:
+            data = data.get(part) or {}
+        return data
+    return locate
+
+
+def _stock_age(name):
+    """库龄列表中指定档位的数量"""
+    def extract(record):
+        qty = 0
+        for age_item in record.get('stock_age_list') or []:
+            if age_item.get('name', '') == name:
+                qty = age_item.get('qty', 0)
+        return qty
+    return extract
+
+
+# 订单指纹中每张子表末尾的分隔标记
+_TABLE_END = "\x1e"
+
+
+def rows_content_hash(order_row, child_rows):
+    """
+    订单指纹：主订单表行（不含指纹列）与各子表行的 MD5，只覆盖实际入库的字段，入库数据不变时指纹不变
+    Args:
+        order_row: ORDERS_NO_HASH_SCHEMA 构造的行
+        child_rows: 各子表的行列表，顺序同 ORDER_TABLES[1:]
+    """
+    # 逐个值 repr（字符串带引号，None 与 'None' 可区分）后拼接；每张子表末尾加分隔标记，行宽固定无需再分行
+    values = chain(order_row, *[chain(*rows, (_TABLE_END,)) for rows in child_rows])
+    return hashlib.md5('\x1f'.join(map(repr, values)).encode('utf-8')).hexdigest()
+
+
+def order_content_hash(record):
+    """单条订单的指纹（写库时用 order_table_rows 直接由已构造的行计算，不重复取值）"""
+    return rows_content_hash(ORDERS_NO_HASH_SCHEMA.build(record),
+                             [schema.rows(record) for schema in ORDER_TABLES[1:]])
+
+
+def sales_code_of(record):
+    """销量数据的唯一编码：sku 字段 JSON（键排序）的 MD5"""
+    sku_json = json.dumps(record.get('sku', []), sort_keys=True, separators=(',', ':'))
+    return hashlib.md5(sku_json.encode('utf-8')).hexdigest()
+
+
+# ========= 订单相关表 =========
+ORDERS_COLUMNS = [
+    Column("global_order_no", kind=KEY),
+    Column("reference_no", kind=KEY),
+    Column("store_id", kind=KEY),
+    Column("order_from_name", kind=KEY),
+    Column("delivery_type", kind=KEY),
+    Column("split_type", kind=KEY),
+    Column("order_status", "status", KEY),
+    Column("global_purchase_time", kind=KEY),
+    Column("global_payment_time", kind=KEY),
+    Column("global_review_time", kind=KEY),
+    Column("global_distribution_time", kind=KEY),
+    Column("global_print_time", kind=KEY),
+    Column("global_mark_time", kind=KEY),
+    Column("global_delivery_time", kind=KEY),
+    Column("amount_currency", kind=KEY),
+    Column("remark", kind=KEY),
+    Column("global_latest_ship_time", kind=KEY),
+    Column("global_cancel_time", kind=KEY),
+    Column("update_time", kind=KEY),
+    Column("order_tag", kind=KEY),
+    Column("pending_order_tag", kind=KEY),
+    Column("exception_order_tag", kind=KEY),
+    Column("wid", kind=KEY),
+    Column("warehouse_name", kind=KEY),
+    Column("original_global_order_no", kind=KEY),
+    Column("supplier_id", kind=KEY),
+    Column("is_delete", kind=KEY),
+    Column("order_custom_fields"),
+    Column("global_create_time", kind=KEY),
+]
+
+# 订单指纹放在最后一列，写库前按块批量比对，未变化的订单整单跳过
+ORDERS_SCHEMA = TableSchema("orders", ORDERS_COLUMNS + [
+    Column("content_hash", kind=COMPUTED, default=order_content_hash),
+], keys=["global_order_no"], touch_column="data_updatetime")
+
+# 不含指纹列的主订单表（计算指纹用）
+ORDERS_NO_HASH_SCHEMA = TableSchema("orders", ORDERS_COLUMNS, keys=["global_order_no"],
+                                    touch_column="data_updatetime")
+
+BUYERS_INFO_SCHEMA = TableSchema("buyers_info", [
+    Column("global_order_no", kind=PARENT),
+    Column("buyer_no", default=''),
+    Column("buyer_email", default=''),
+    Column("buyer_name", default=''),
+    Column("buyer_note", default=''),
+], keys=["global_order_no"], touch_column="data_updatetime", ignore=True, source="buyers_info")
+
+ADDRESS_INFO_SCHEMA = TableSchema("address_info", [
+    Column("global_order_no", kind=PARENT),
+    Column("receiver_name", default=''),
+    Column("receiver_mobile", default=''),
+    Column("receiver_tel", default=''),
+    Column("receiver_country_code", default=''),
+    Column("city", default=''),
+    Column("state_or_region", default=''),
+    Column("address_line1", default=''),
+    Column("address_line2", default=''),
+    Column("address_line3", default=''),
+    Column("district", default=''),
+    Column("postal_code", default=''),
+    Column("doorplate_no", default=''),
+    Column("company_name"),
+], keys=["global_order_no"], touch_column="data_updatetime", source="address_info")
+
+ITEM_INFO_SCHEMA = TableSchema("item_info", [
+    Column("global_order_no", kind=PARENT),
+    Column("global_item_no", "globalItemNo"),
+    Column("item_id", "id"),
+    Column("platform_order_no"),
+    Column("order_item_no"),
+    Column("item_from_name"),
+    Column("msku"),
+    Column("local_sku"),
+    Column("product_no"),
+    Column("local_product_name"),
+    Column("is_bundled", default=0),
+    Column("title"),
+    Column("variant_attr"),
+    Column("unit_price_amount", kind=FLOAT),
+    Column("item_price_amount", kind=FLOAT),
+    Column("quantity", default=0),
+    Column("remark", default=''),
+    Column("platform_status"),
+    Column("item_type", "type"),
+    Column("stock_cost_amount", kind=FLOAT),
+    Column("wms_outbound_cost_amount", kind=FLOAT),
+    Column("stock_deduct_id"),
+    Column("stock_deduct_name"),
+    Column("cg_price_amount", kind=FLOAT),
+    Column("shipping_amount", kind=FLOAT),
+    Column("wms_shipping_price_amount", kind=FLOAT),
+    Column("customer_shipping_amount", kind=FLOAT),
+    Column("discount_amount", kind=FLOAT),
+    Column("customer_tip_amount", kind=FLOAT),
+    Column("tax_amount", kind=FLOAT),
+    Column("sales_revenue_amount", kind=FLOAT),
+    Column("transaction_fee_amount", kind=FLOAT),
+    Column("other_amount", kind=FLOAT),
+    Column("customized_url"),
+    Column("platform_subsidy_amount", kind=FLOAT),
+    Column("cod_amount", kind=FLOAT),
+    Column("gift_wrap_amount", kind=FLOAT),
+    Column("platform_tax_amount", kind=FLOAT),
+    Column("points_granted_amount", kind=FLOAT),
+    Column("other_fee", kind=FLOAT),
+    Column("delivery_time"),
+    Column("source_name"),
+    Column("data_json"),  # 可能包含字典
+    Column("item_custom_fields"),  # 可能包含字典
+    Column("is_delete", default=0),
+], keys=["global_order_no", "global_item_no"], touch_column="data_updatetime", source="item_info", many=True)
+
+PLATFORM_INFO_SCHEMA = TableSchema("platform_info", [
+    Column("global_order_no", kind=PARENT),
+    Column("order_from"),
+    Column("platform_order_no"),
+    Column("platform_order_name"),
+    Column("platform_code"),
+    Column("store_country_code", "store_Country_code"),
+    Column("order_status", "status"),
+    Column("payment_status"),
+    Column("shipping_status"),
+    Column("purchase_time"),
+    Column("payment_time"),
+    Column("latest_ship_time"),
+    Column("cancel_time"),
+    Column("delivery_time"),
+], keys=["global_order_no", "platform_order_no"], touch_column="data_updatetime", ignore=True,
+    source="platform_info", many=True)
+
+PAYMENT_INFO_SCHEMA = TableSchema("payment_info", [
+    Column("global_order_no", kind=PARENT),
+    Column("platform_order_no"),
+    Column("payment_method"),
+    Column("transaction_no"),
+    Column("currency"),
+    Column("payment_amount", kind=FLOAT),
+    Column("payment_time"),
+], keys=["global_order_no", "platform_order_no"], touch_column="data_updatetime",
+    source="payment_info", many=True)
+
+LOGISTICS_INFO_SCHEMA = TableSchema("logistics_info", [
+    Column("global_order_no", kind=PARENT),
+    Column("logistics_type_id"),
+    Column("logistics_type_name"),
+    Column("logistics_provider_id"),
+    Column("logistics_provider_name"),
+    Column("actual_carrier"),
+    Column("waybill_no"),
+    Column("pre_weight", kind=FLOAT),
+    Column("pre_fee_weight", kind=FLOAT),
+    Column("pre_fee_weight_unit"),
+    Column("pre_pkg_length", kind=FLOAT),
+    Column("pre_pkg_height", kind=FLOAT),
+    Column("pre_pkg_width", kind=FLOAT),
+    Column("weight", kind=FLOAT),
+    Column("pkg_fee_weight", kind=FLOAT),
+    Column("pkg_fee_weight_unit"),
+    Column("pkg_length", kind=FLOAT),
+    Column("pkg_width", kind=FLOAT),
+    Column("pkg_height", kind=FLOAT),
+    Column("weight_unit"),
+    Column("pkg_size_unit"),
+    Column("cost_currency_code"),
+    Column("pre_cost_amount"),
+    Column("cost_amount", kind=FLOAT),
+    Column("logistics_time"),
+    Column("tracking_no"),
+    Column("mark_no"),
+], keys=["global_order_no"], touch_column="data_updatetime", source="logistics_info", skip_empty=True)
+
+# 一个订单依次写入的表（顺序与原先逐表插入一致）
+ORDER_TABLES = [
+    ORDERS_SCHEMA,
+    BUYERS_INFO_SCHEMA,
+    ADDRESS_INFO_SCHEMA,
+    ITEM_INFO_SCHEMA,
+    PLATFORM_INFO_SCHEMA,
+    PAYMENT_INFO_SCHEMA,
+    LOGISTICS_INFO_SCHEMA,
+]
+
+
+def order_tables(with_hash=True):
+    """一个订单写入的表；库中还没有指纹列（未执行 migrations/001_orders_content_hash.sql）时主订单表不含指纹列"""
+    return ORDER_TABLES if with_hash else [ORDERS_NO_HASH_SCHEMA] + ORDER_TABLES[1:]
+
+
+def order_table_rows(record, with_hash=True):
+    """
+    一条订单拆成各表的行，顺序同 ORDER_TABLES；主订单表行末尾的指纹直接由本次构造的各表行计算
+    Args:
+        record: 订单
+        with_hash: 主订单表是否带指纹列，False 时不计算指纹
+    Returns:
+        list: [(TableSchema, 行列表), ...]
+    """
+    order_row = ORDERS_NO_HASH_SCHEMA.build(record)
+    children = [(schema, schema.rows(record)) for schema in ORDER_TABLES[1:]]
+    if not with_hash:
+        return [(ORDERS_NO_HASH_SCHEMA, [order_row])] + children
+    content_hash = rows_content_hash(order_row, [rows for _, rows in children])
+    return [(ORDERS_SCHEMA, [order_row + (content_hash,)])] + children
+
+# ========= 参考数据与统计表 =========
+STORE_INFO_SCHEMA = TableSchema("store_info", [
+    Column("store_id", kind=KEY),
+    Column("sid", default=''),
+    Column("store_name", kind=KEY),
+    Column("platform_code", kind=KEY),
+    Column("platform_name", kind=KEY),
+    Column("currency", default='USD'),  # 默认USD
+    Column("is_sync", default=1),  # 默认开启同步
+    Column("status", default=0),  # 默认状态正常
+    Column("country_code", default=''),
+], keys=["store_id"])
+
+WAREHOUSE_INFO_SCHEMA = TableSchema("warehouse_info", [
+    Column("wid"),
+    Column("w_type", "type"),
+    Column("w_sub_type", "sub_type"),
+    Column("w_name", "name"),
+    Column("is_delete", default=0),
+    Column("country_code", default=''),
+    Column("wp_id"),
+    Column("wp_name", default=''),
+    Column("t_warehouse_name", default=''),
+    Column("t_warehouse_code", default=''),
+    Column("t_country_area_name", default=''),
+    Column("t_status", default=1),
+], keys=["wid"], touch_column="data_updatime")
+
+INVENTORY_INFO_SCHEMA = TableSchema("inventory_info", [
+    Column("wid"),
+    Column("product_id"),
+    Column("sku"),
+    Column("seller_id", default='0'),
+    Column("fnsku", default=''),
+    Column("product_total", default=0),
+    Column("product_valid_num", default=0),
+    Column("product_bad_num", default=0),
+    Column("product_qc_num", default=0),
+    Column("product_lock_num", default=0),
+    Column("good_lock_num", default=0),
+    Column("bad_lock_num", default=0),
+    Column("stock_cost_total", kind=FLOAT),
+    Column("quantity_receive", kind=FLOAT),
+    Column("stock_cost", kind=FLOAT),
+    Column("product_onway", default=0),
+    Column("transit_head_cost", kind=FLOAT),
+    Column("average_age", default=0),
+    # third_inventory字段
+    Column("qty_sellable", "third_inventory.qty_sellable", default=0),
+    Column("qty_reserved", "third_inventory.qty_reserved", default=0),
+    Column("qty_onway", "third_inventory.qty_onway", default=0),
+    Column("qty_pending", "third_inventory.qty_pending", default=0),
+    Column("box_qty_sellable", "third_inventory.box_qty_sellable", default=0),
+    Column("box_qty_reserved", "third_inventory.box_qty_reserved", default=0),
+    Column("box_qty_onway", "third_inventory.box_qty_onway", default=0),
+    Column("box_qty_pending", "third_inventory.box_qty_pending", default=0),
+    # stock_age_list字段
+    Column("age_0_15_days", kind=COMPUTED, default=_stock_age('0-15天库龄')),
+    Column("age_16_30_days", kind=COMPUTED, default=_stock_age('16-30天库龄')),
+    Column("age_31_90_days", kind=COMPUTED, default=_stock_age('31-90天库龄')),
+    Column("age_above_91_days", kind=COMPUTED, default=_stock_age('91天以上库龄')),
+    # 其他字段
+    Column("available_inventory_box_qty", default=0),
+    Column("purchase_price", kind=FLOAT),
+    Column("price", kind=FLOAT),
+    Column("head_stock_price", kind=FLOAT),
+    Column("stock_price", kind=FLOAT),
+], keys=["wid", "sku"], touch_column="data_updatime")
+
+SALES_INFO_SCHEMA = TableSchema("sales_info", [
+    Column("sku", default=[]),
+    Column("spu", default=[]),
+    Column("spu_name", default=[]),
+    Column("msku", default=[]),
+    Column("mskuld", "mskuId", default=[]),
+    Column("sku_and_product_name", "skuAndProductName", default=[]),
+    Column("product_name", default=[]),
+    Column("develop_name", default=[]),
+    Column("sid", default=[]),
+    Column("platform_code", default=[]),
+    Column("platform_name", default=[]),
+    Column("site_code", default=[]),
+    Column("site_name", default=[]),
+    Column("store_name", default=[]),
+    Column("attribute", default=[]),
+    Column("parent_asin", "parentAsin", default=[]),
+    Column("platform_product_id", default=[]),
+    Column("platform_product_title", default=[]),
+    Column("currency_code", default=''),
+    Column("icon", default=''),
+    Column("pic_url", default=''),
+    Column("date_collect", default={}),
+    Column("volume_total", "volumeTotal", FLOAT),
+    Column("sales_code", kind=COMPUTED, default=sales_code_of),
+], keys=["sku", "sales_code"], touch_column="update_time")
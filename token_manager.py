@@ -0,0 +1,183 @@
+"""
+零星开放平台 access_token 管理
+功能：缓存 access_token，在 expires_in 到期前自动续期（优先走 refresh_token 流程）
+进程内用线程锁保证并发安全，进程间通过磁盘缓存文件 + 文件锁共享同一个 token，
+避免每个定时脚本启动时、每次业务请求前都重新获取 token
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import requests
+
+from http_session import get_session
+from log_utils import get_logger
+
+try:
+    import fcntl  # 仅类Unix系统可用，Windows 下退化为只用线程锁
+except ImportError:
+    fcntl = None
+
+logger = get_logger(__name__)
+
+
+class TokenManager:
+    """access_token 管理器（线程安全，支持跨进程磁盘缓存）"""
+
+    # 零星返回的 token 失效相关错误码：access_token 不存在或已过期 / access_token 不正确
+    TOKEN_INVALID_CODES = {'2001003', '2001005'}
+
+    def __init__(self, app_id, app_secret, base_url, cache_dir=None, refresh_ahead=300):
+        """
+        初始化token管理器
+        Args:
+            app_id: 零星平台APP_ID
+            app_secret: 零星平台APP_SECRET
+            base_url: 开放平台地址
+            cache_dir: 磁盘缓存目录，为空时使用系统临时目录
+            refresh_ahead: 提前多少秒刷新token
+        """
+        self.app_id = app_id
+        self.app_secret = app_secret
+        self.base_url = base_url
+        self.refresh_ahead = refresh_ahead
+        self._lock = threading.Lock()
+        self._token = None
+
+        # 缓存文件按 app_id + base_url 区分，避免不同环境的token互相覆盖
+        cache_key = hashlib.md5(f"{app_id}@{base_url}".encode("utf-8")).hexdigest()[:12]
+        cache_dir = cache_dir or tempfile.gettempdir()
+        self.cache_path = os.path.join(cache_dir, f"lingxing_token_{cache_key}.json")
+
+    # ========= 对外接口 =========
+    def get_token(self) -> str:
+        """获取可用的 access_token（必要时刷新）"""
+        token = self._token
+        if self._is_fresh(token):
+            return token["access_token"]
+
+        with self._lock:
+            # 双重检查：等锁期间可能已被其他线程刷新
+            if self._is_fresh(self._token):
+                return self._token["access_token"]
+
+            with self._file_lock():
+                cached = self._load_cache()
+                if self._is_fresh(cached):
+                    self._token = cached
+                    return cached["access_token"]
+
+                new_token = None
+                previous = self._token or cached
+                if previous and previous.get("refresh_token"):
+                    try:
+                        new_token = self._refresh_token(previous["refresh_token"])
+                    except RuntimeError as e:
+                        logger.warning(f"刷新token失败，改为重新获取: {e}")
+
+                if new_token is None:
+                    new_token = self._request_token()
+
+                self._save_cache(new_token)
+                self._token = new_token
+                return new_token["access_token"]
+
+    def invalidate(self, access_token=None):
+        """
+        使缓存的token失效（接口返回token过期时调用）
+        Args:
+            access_token: 已失效的token，只有缓存中仍是该token时才清除，避免误删其他进程刚刷新的token
+        """
+        with self._lock:
+            if self._token and (access_token is None or self._token["access_token"] == access_token):
+                self._token = None
+            with self._file_lock():
+                cached = self._load_cache()
+                if cached and (access_token is None or cached.get("access_token") == access_token):
+                    try:
+                        os.remove(self.cache_path)
+                    except OSError:
+                        pass
+
+    # ========= 零星认证接口 =========
+    def _request_token(self) -> dict:
+        """通过 appId + appSecret 获取新的token"""
+        url = f"{self.base_url}/api/auth-server/oauth/access-token"
+        data = {
+            "appId": self.app_id,
+            "appSecret": self.app_secret
+        }
+        return self._post_auth(url, data, "获取token失败")
+
+    def _refresh_token(self, refresh_token) -> dict:
+        """通过 refresh_token 续期token"""
+        url = f"{self.base_url}/api/auth-server/oauth/refresh"
+        data = {
+            "appId": self.app_id,
+            "refreshToken": refresh_token
+        }
+        return self._post_auth(url, data, "刷新token失败")
+
+    def _post_auth(self, url, data, error_prefix) -> dict:
+        try:
+            resp = get_session("lingxing").post(url, data=data, timeout=10)
+            resp.raise_for_status()
+            result = resp.json()
+
+            if (result.get("code") in [200, '200']) and result.get("data"):
+                token_data = result["data"]
+                expires_in = int(token_data.get("expires_in") or 7200)
+                return {
+                    "access_token": token_data["access_token"],
+                    "refresh_token": token_data.get("refresh_token"),
+                    "expires_at": time.time() + expires_in,
+                }
+            else:
+                raise RuntimeError(f"{error_prefix}: {result}")
+
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"网络请求失败: {e}")
+        except (KeyError, ValueError, TypeError) as e:
+            raise RuntimeError(f"响应数据解析失败: {e}")
+
+    # ========= 缓存工具 =========
+    def _is_fresh(self, token) -> bool:
+        if not token or not token.get("access_token"):
+            return False
+        return token.get("expires_at", 0) - self.refresh_ahead > time.time()
+
+    @contextmanager
+    def _file_lock(self):
+        """跨进程互斥锁，保证同一时间只有一个进程去请求新token"""
+        if fcntl is None:
+            yield
+            return
+        lock_file = open(self.cache_path + ".lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, token):
+        """原子写入缓存文件（先写临时文件再替换），权限仅限当前用户"""
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(token, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"写入token缓存失败（不影响本次请求）: {e}")
@@ -1,8 +1,9 @@
 import pymysql
-import requests
 import time
 import traceback
 from config import load_config_from_env
+from db_pool import get_shared_pool
+from http_session import get_session
 
 config = load_config_from_env()
 
@@ -13,6 +14,10 @@ APP_Token = config['warehouse_config']['APP_TOKEN']  # app_token
 WAREHOUSE_TABLE_ID = config['warehouse_config']['WAREHOUSE_TABLE_ID']  # 仓库信息表ID
 
 MYSQL_CONFIG = config['db_config']
+
+# 飞书接口共享连接池会话（keep-alive，统一超时配置）
+session = get_session('feishu')
+
 MYSQL_TABLE = "warehouse_info"
 
 # 仓库信息表字段定义 - 全部使用文本类型
@@ -72,7 +77,7 @@ WAREHOUSE_FIELDS = [
 def get_tenant_access_token():
     """获取访问令牌"""
     url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-    resp = requests.post(url, json={
+    resp = session.post(url, json={
         "app_id": APP_ID,
         "app_secret": APP_SECRET
     }).json()
@@ -89,7 +94,7 @@ def get_existing_fields_with_details(token, table_id):
     headers = {"Authorization": f"Bearer {token}"}
 
     try:
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers)
         result = response.json()
 
         if result.get("code") == 0:
@@ -165,7 +170,7 @@ def update_field_type(token, field_def, table_id, field_id):
 
     try:
         print(f"🔄🔄 正在更新字段类型: {field_def['field_name']} -> 类型 {field_def['type']}")
-        response = requests.put(url, headers=headers, json=payload, timeout=10)
+        response = session.put(url, headers=headers, json=payload, timeout=10)
         result = response.json()
 
         if result.get("code") == 0:
@@ -196,7 +201,7 @@ def create_field(token, field_def, table_id):
 
     try:
         print(f"🔄🔄 正在创建字段: {field_def['field_name']} (类型: {field_def['type']})")
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = session.post(url, headers=headers, json=payload, timeout=10)
         result = response.json()
 
         if result.get("code") == 0:
@@ -223,7 +228,7 @@ def clear_feishu_table(token, table_id):
             url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{APP_Token}/tables/{table_id}/records"
             headers = {"Authorization": f"Bearer {token}"}
             params = {"page_size": 100, "page_token": page_token} if page_token else {"page_size": 100}
-            response = requests.get(url, headers=headers, params=params)
+            response = session.get(url, headers=headers, params=params)
             result = response.json()
             if result.get("code") != 0:
                 print(f"❌❌ 获取记录失败: {result.get('msg')}")
@@ -266,7 +271,7 @@ def clear_feishu_table(token, table_id):
             payload = {
                 "records": batch_ids
             }
-            response = requests.post(url, headers=headers, json=payload)
+            response = session.post(url, headers=headers, json=payload)
             result = response.json()
 
             if result.get("code") == 0:
@@ -277,7 +282,7 @@ def clear_feishu_table(token, table_id):
                 # 尝试单条删除
                 for record_id in batch_ids:
                     single_url = f"https://open.feishu.cn/open-apis/bitable/v1/apps/{APP_Token}/tables/{table_id}/records/{record_id}"
-                    single_response = requests.delete(single_url, headers={"Authorization": f"Bearer {token}"})
+                    single_response = session.delete(single_url, headers={"Authorization": f"Bearer {token}"})
                     single_result = single_response.json()
                     if single_result.get("code") == 0:
                         deleted_count += 1
@@ -295,32 +300,32 @@ def clear_feishu_table(token, table_id):
 def fetch_warehouse_data():
     """从MySQL读取仓库数据"""
     try:
-        conn = pymysql.connect(**MYSQL_CONFIG)
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-
-        # 查询语句，排除data_creatime和data_updatetime字段
-        sql = """
-        SELECT 
-            wid,
-            w_type,
-            w_sub_type,
-            w_name,
-            is_delete,
-            country_code,
-            wp_id,
-            wp_name,
-            t_warehouse_name,
-            t_warehouse_code,
-            t_country_area_name,
-            t_status
-        FROM warehouse_info
-        WHERE wid IS NOT NULL
-        """
-
-        cursor.execute(sql)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        # 从进程内共享的连接池借用连接，读取完成后归还
+        with get_shared_pool(MYSQL_CONFIG).connection() as conn:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+
+            # 查询语句，排除data_creatime和data_updatetime字段
+            sql = """
+            SELECT 
+                wid,
+                w_type,
+                w_sub_type,
+                w_name,
+                is_delete,
+                country_code,
+                wp_id,
+                wp_name,
+                t_warehouse_name,
+                t_warehouse_code,
+                t_country_area_name,
+                t_status
+            FROM warehouse_info
+            WHERE wid IS NOT NULL
+            """
+
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+            cursor.close()
         print(f"✅ 读取到 {len(rows)} 条仓库信息记录")
         return rows
 
@@ -401,7 +406,7 @@ def batch_insert_warehouse(token, records, batch_size=50):
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = requests.post(url, headers=headers, json=payload, timeout=30)
+                response = session.post(url, headers=headers, json=payload, timeout=30)
                 result = response.json()
 
                 if result.get("code") == 0: